@@ -0,0 +1,52 @@
+"""Micro-benchmark de los decodificadores JSON sobre archivos crudos NDJSON.
+
+Compara json, orjson y msgspec decodificando el registro completo y el modo tipado de
+msgspec, que solo decodifica las claves que usa la transformación.
+
+Uso:
+    poetry run python benchmarks/bench_decode.py data/raw/pokemon [--repeat 5]
+"""
+import argparse
+import timeit
+from pathlib import Path
+
+from pokemon_etl.codec import Decoder, msgspec, orjson
+from pokemon_etl.fields import POKEMON_FIELDS, SPECIES_FIELDS
+from pokemon_etl.raw_store import RawStore, iter_lines
+
+
+def bench(label, decoder, lines, repeat):
+    """Mide el mejor tiempo por registro de `decoder` sobre `lines`."""
+    best = min(timeit.repeat(lambda: [decoder.decode(line) for line in lines], number=1, repeat=repeat))
+    per_record_us = best / len(lines) * 1e6
+    print(f"{label:<24} {per_record_us:8.2f} µs/registro")
+    return per_record_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("raw_path", type=Path, help="Directorio con archivos crudos NDJSON")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    files = [path for path in RawStore(args.raw_path).files() if ".ndjson" in path.name]
+    lines = [line for path in files for line in iter_lines(path)]
+    if not lines:
+        raise SystemExit(f"No hay archivos NDJSON en {args.raw_path}")
+    fields = POKEMON_FIELDS if files[0].name.startswith("pokemon_page_") else SPECIES_FIELDS
+    print(f"{len(lines)} registros, {sum(map(len, lines)) / len(lines) / 1024:.1f} KiB de media\n")
+
+    baseline = bench("json", Decoder("json"), lines, args.repeat)
+    candidates = []
+    if orjson:
+        candidates.append(("orjson", Decoder("orjson")))
+    if msgspec:
+        candidates.append(("msgspec", Decoder("msgspec")))
+        candidates.append(("msgspec (tipado)", Decoder("msgspec", fields)))
+    for label, decoder in candidates:
+        elapsed = bench(label, decoder, lines, args.repeat)
+        print(f"{'':<24} {baseline / elapsed:8.2f}x frente a json")
+
+
+if __name__ == "__main__":
+    main()
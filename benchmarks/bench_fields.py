@@ -0,0 +1,103 @@
+"""Micro-benchmark del extractor de campos compilado frente a la extracción manual anterior.
+
+Uso:
+    poetry run python benchmarks/bench_fields.py [--records 20000] [--repeat 5]
+"""
+import argparse
+import timeit
+
+from pokemon_etl.fields import POKEMON_FIELDS, SPECIES_FIELDS, compile_fields
+
+STATS = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+
+
+def synthetic_pokemon(i):
+    """Pokémon sintético con la forma de la respuesta de PokeAPI."""
+    return {
+        "id": i,
+        "name": f"pokemon-{i}",
+        "stats": [{"base_stat": 40 + (i + k) % 80, "effort": 0, "stat": {"name": stat, "url": ""}} for k, stat in enumerate(STATS)],
+        "types": [{"slot": 1, "type": {"name": "fire", "url": ""}}] + ([{"slot": 2, "type": {"name": "flying", "url": ""}}] if i % 2 else []),
+    }
+
+
+def synthetic_species(i):
+    """Especie sintética con la forma de la respuesta de PokeAPI."""
+    return {
+        "id": i,
+        "name": f"pokemon-{i}",
+        "color": {"name": "red"},
+        "habitat": {"name": "forest"} if i % 3 else None,
+        "generation": {"name": "generation-i"},
+        "evolves_from_species": {"name": f"pokemon-{i - 1}"} if i % 3 == 2 else None,
+        "is_mythical": False,
+        "is_baby": False,
+        "is_legendary": i % 50 == 0,
+        "pokedex_numbers": [{"entry_number": i, "pokedex": {"name": name}} for name in ("kanto", "johto", "hoenn", "national")],
+    }
+
+
+def legacy_pokemon(pokemon):
+    """Extracción manual anterior: recorre `stats` una vez por columna."""
+    return {
+        "pokemon_id": pokemon["id"],
+        "name": pokemon["name"],
+        "hp_base_stat": next((stats["base_stat"] for stats in pokemon["stats"] if stats["stat"]["name"] == "hp"), None),
+        "attack_base_stat": next((stats["base_stat"] for stats in pokemon["stats"] if stats["stat"]["name"] == "attack"), None),
+        "defense_base_stat": next((stats["base_stat"] for stats in pokemon["stats"] if stats["stat"]["name"] == "defense"), None),
+        "special_attack_base_stat": next((stats["base_stat"] for stats in pokemon["stats"] if stats["stat"]["name"] == "special-attack"), None),
+        "special_defense_base_stat": next((stats["base_stat"] for stats in pokemon["stats"] if stats["stat"]["name"] == "special-defense"), None),
+        "speed_base_stat": next((stats["base_stat"] for stats in pokemon["stats"] if stats["stat"]["name"] == "speed"), None),
+        "type_1": pokemon["types"][0]["type"]["name"] if pokemon["types"] else None,
+        "type_2": pokemon["types"][1]["type"]["name"] if len(pokemon["types"]) > 1 else None,
+    }
+
+
+def legacy_species(species):
+    """Extracción manual anterior de una especie."""
+    return {
+        "species_id": species["id"],
+        "name": species["name"],
+        "color": species["color"]["name"],
+        "habitat": species["habitat"]["name"] if species.get("habitat") else None,
+        "generation": species["generation"]["name"],
+        "previous_evolution": species["evolves_from_species"]["name"] if species.get("evolves_from_species") else None,
+        "is_mythical": species["is_mythical"],
+        "is_baby": species["is_baby"],
+        "is_legendary": species["is_legendary"],
+        "nat_pokedex_entry": next((entry["entry_number"] for entry in species["pokedex_numbers"] if entry["pokedex"]["name"] == "national"), None),
+    }
+
+
+def bench(label, func, records, repeat):
+    """Mide el mejor tiempo por registro de `func` sobre `records`."""
+    best = min(timeit.repeat(lambda: [func(record) for record in records], number=1, repeat=repeat))
+    per_record_us = best / len(records) * 1e6
+    print(f"{label:<28} {per_record_us:8.3f} µs/registro")
+    return per_record_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pokemons = [synthetic_pokemon(i) for i in range(1, args.records + 1)]
+    species = [synthetic_species(i) for i in range(1, args.records + 1)]
+    compiled_pokemon = compile_fields(POKEMON_FIELDS)
+    compiled_species = compile_fields(SPECIES_FIELDS)
+    assert [compiled_pokemon(p) for p in pokemons[:100]] == [legacy_pokemon(p) for p in pokemons[:100]]
+    assert [compiled_species(s) for s in species[:100]] == [legacy_species(s) for s in species[:100]]
+
+    for resource, legacy, compiled, records in (
+        ("pokemon", legacy_pokemon, compiled_pokemon, pokemons),
+        ("species", legacy_species, compiled_species, species),
+    ):
+        before = bench(f"{resource} (manual)", legacy, records, args.repeat)
+        after = bench(f"{resource} (compilado)", compiled, records, args.repeat)
+        print(f"{resource}: {before / after:.2f}x más rápido\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Presupuesto de tiempo de importación del paquete y de análisis del DAG.
+
+Cada medición se hace en un intérprete nuevo (importación en frío) y se toma la mediana de
+varias repeticiones. Además de los tiempos, comprueba que la raíz del paquete, la
+configuración y el archivo del DAG no cargan dependencias pesadas (aiohttp, pyarrow, pandas,
+SQLAlchemy, psycopg2). Termina con código 1 si se supera algún presupuesto.
+
+El análisis del DAG solo se mide si Airflow está instalado.
+
+Uso:
+    poetry run python benchmarks/bench_import.py [--repeat 7] [--budget-ms 50] [--dag-budget-ms 100]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DAG_FILE = ROOT / "dags" / "pokemon_dags.py"
+HEAVY_MODULES = ("aiohttp", "pyarrow", "pandas", "sqlalchemy", "psycopg2")
+# (etiqueta, módulo, si debe estar libre de dependencias pesadas)
+TARGETS = (
+    ("pokemon_etl", "pokemon_etl", True),
+    ("config_manager", "pokemon_etl.config_manager", True),
+    ("shards (tarea)", "pokemon_etl.shards", False),
+    ("cli", "pokemon_etl.cli", False),
+)
+
+PROBE = """
+import json, sys, time
+setup, code = sys.argv[1], sys.argv[2]
+exec(setup)
+before = set(sys.modules)
+start = time.perf_counter()
+exec(code)
+elapsed = time.perf_counter() - start
+heavy = sorted({name.split(".")[0] for name in set(sys.modules) - before} & set(json.loads(sys.argv[3])))
+print(json.dumps({"seconds": elapsed, "heavy": heavy}))
+"""
+
+DAG_CODE = """
+import importlib.util
+spec = importlib.util.spec_from_file_location("pokemon_dags", {path!r})
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+"""
+
+
+def probe(setup, code, repeat):
+    """Ejecuta `code` en `repeat` intérpretes nuevos tras `setup` y devuelve la mediana."""
+    env = {**os.environ, "PYTHONPATH": str(ROOT / "src")}
+    runs = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE, setup, code, json.dumps(HEAVY_MODULES)],
+            capture_output=True, text=True, cwd=ROOT, env=env, check=True,
+        )
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return statistics.median(run["seconds"] for run in runs), runs[-1]["heavy"]
+
+
+def airflow_available():
+    return subprocess.run([sys.executable, "-c", "import airflow"], capture_output=True).returncode == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="Presupuesto de importación de la raíz y la configuración.")
+    parser.add_argument("--dag-budget-ms", type=float, default=100.0, help="Presupuesto de análisis del DAG, sin contar la importación de Airflow.")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'objetivo':<18} {'mediana':>10}  dependencias pesadas")
+    for label, module, light in TARGETS:
+        seconds, heavy = probe("", f"import {module}", args.repeat)
+        print(f"{label:<18} {seconds * 1000:8.1f} ms  {', '.join(heavy) or '-'}")
+        if light and (heavy or seconds * 1000 > args.budget_ms):
+            failures.append(label)
+
+    if airflow_available():
+        seconds, heavy = probe("import airflow, airflow.decorators", DAG_CODE.format(path=str(DAG_FILE)), args.repeat)
+        print(f"{'DAG (análisis)':<18} {seconds * 1000:8.1f} ms  {', '.join(heavy) or '-'}")
+        if heavy or seconds * 1000 > args.dag_budget_ms:
+            failures.append("DAG")
+    else:
+        print("Airflow no está instalado: se omite el análisis del DAG.")
+
+    if failures:
+        print(f"\nPresupuesto superado: {', '.join(failures)}")
+        sys.exit(1)
+    print("\nDentro del presupuesto.")
+
+
+if __name__ == "__main__":
+    main()
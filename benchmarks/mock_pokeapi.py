@@ -0,0 +1,276 @@
+"""Servidor local que imita PokeAPI con datos sintéticos para medir el ETL sin red.
+
+Sirve `generation/`, `generation/{id}/`, `pokemon?limit=&offset=`, `pokemon/{id}/`,
+`pokemon-species/{id}/`, `evolution-chain/{id}/`, `type/{id}/` y `ability/{id}/` con la
+forma de las respuestas reales, con `ETag` y respuestas 304 a las solicitudes condicionales. Permite configurar el
+número de Pokémon, la latencia por respuesta, la proporción de errores transitorios
+(503 o 429 con `Retry-After`) y el tamaño aproximado de cada respuesta de detalle.
+
+Uso:
+    poetry run python benchmarks/mock_pokeapi.py --count 1000 --latency-ms 20 --error-rate 0.01
+"""
+import asyncio
+import argparse
+import hashlib
+import json
+import multiprocessing
+from collections import Counter
+from contextlib import contextmanager
+
+from aiohttp import web
+
+STATS = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+TYPES = ["normal", "fire", "water", "grass", "electric", "ice", "fighting", "poison", "ground", "flying"]
+COLORS = ["red", "blue", "green", "yellow", "brown", "purple", "pink", "gray", "black", "white"]
+HABITATS = ["forest", "cave", "sea", "mountain", "grassland", "urban", "rare", None]
+ROMAN = ["i", "ii", "iii", "iv", "v", "vi", "vii", "viii", "ix"]
+
+
+class MockPokeAPI:
+    """Imitación de PokeAPI con datos sintéticos y deterministas.
+    Args:
+        count (int): Número de Pokémon y de especies (ids 1..count).
+        generations (int): Número de generaciones entre las que se reparten las especies.
+        latency (float): Latencia añadida a cada respuesta, en segundos.
+        error_rate (float): Proporción de solicitudes de detalle que fallan la primera vez.
+        error_status (int): Código de los errores inyectados (503 o 429).
+        payload_kb (int): Tamaño aproximado de cada respuesta de detalle, en KiB.
+        seed (int): Semilla de la inyección de errores.
+        pokemon_count (int): Número de Pokémon (ids 1..pokemon_count) si difiere de `count`; con
+            menos Pokémon que especies, las especies restantes quedan sin pareja en la unión.
+    """
+    def __init__(self, count=1000, generations=4, latency=0.0, error_rate=0.0, error_status=503, payload_kb=8, seed=0, pokemon_count=None):
+        self.count = count
+        self.pokemon_count = count if pokemon_count is None else pokemon_count
+        self.generations = [f"generation-{ROMAN[i]}" for i in range(min(generations, len(ROMAN)))]
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.payload_kb = payload_kb
+        self.seed = seed
+        self.base_url = None
+        self.requests = 0
+        self.paths = Counter()
+        self.errors = 0
+        self.not_modified = 0
+        self._failed = set()
+
+    def generation_ids(self, number):
+        """Ids de las especies de la generación `number` (desde 1)."""
+        size = -(-self.count // len(self.generations))
+        return range((number - 1) * size + 1, min(number * size, self.count) + 1)
+
+    def _filler(self, item_size):
+        """Número de elementos de relleno para acercar la respuesta a `payload_kb`."""
+        return max(self.payload_kb * 1024 // item_size, 0)
+
+    def pokemon(self, i):
+        """Respuesta sintética de `pokemon/{i}/`."""
+        return {
+            "id": i,
+            "name": f"pokemon-{i}",
+            "height": 3 + i % 20,
+            "weight": 20 + i % 900,
+            "stats": [{"base_stat": 20 + (i * 7 + k * 13) % 140, "effort": 0, "stat": {"name": stat, "url": f"{self.base_url}stat/{k + 1}/"}}
+                      for k, stat in enumerate(STATS)],
+            "types": [{"slot": 1, "type": {"name": TYPES[i % len(TYPES)], "url": f"{self.base_url}type/{i % len(TYPES) + 1}/"}}]
+            + ([{"slot": 2, "type": {"name": TYPES[(i + 3) % len(TYPES)], "url": f"{self.base_url}type/{(i + 3) % len(TYPES) + 1}/"}}] if i % 2 else []),
+            "abilities": [{"slot": 1, "is_hidden": False, "ability": {"name": f"ability-{i % 30}", "url": f"{self.base_url}ability/{i % 30 + 1}/"}}],
+            "moves": [{"move": {"name": f"move-{k}", "url": f"{self.base_url}move/{k + 1}/"}, "version_group_details": []}
+                      for k in range(self._filler(130))],
+        }
+
+    def species(self, i):
+        """Respuesta sintética de `pokemon-species/{i}/`."""
+        generation = next(name for number, name in enumerate(self.generations, 1) if i in self.generation_ids(number))
+        habitat = HABITATS[i % len(HABITATS)]
+        return {
+            "id": i,
+            "name": f"pokemon-{i}",
+            "color": {"name": COLORS[i % len(COLORS)], "url": ""},
+            "habitat": {"name": habitat, "url": ""} if habitat else None,
+            "generation": {"name": generation, "url": ""},
+            "evolves_from_species": {"name": f"pokemon-{i - 1}", "url": f"{self.base_url}pokemon-species/{i - 1}/"} if i % 3 != 1 else None,
+            "evolution_chain": {"url": f"{self.base_url}evolution-chain/{(i + 2) // 3}/"},
+            "is_baby": i % 40 == 0,
+            "is_legendary": i % 50 == 0,
+            "is_mythical": i % 97 == 0,
+            "pokedex_numbers": [{"entry_number": i, "pokedex": {"name": "national", "url": ""}}],
+            "flavor_text_entries": [{"flavor_text": "Texto de relleno de la Pokédex. " * 3, "language": {"name": "es", "url": ""}}
+                                    for _ in range(self._filler(130))],
+        }
+
+    def _named(self, resource, i, name=None):
+        return {"name": name or f"pokemon-{i}", "url": f"{self.base_url}{resource}/{i}/"}
+
+    def evolution_chain(self, n):
+        """Respuesta sintética de `evolution-chain/{n}/`: las especies 3n-2 -> 3n-1 -> 3n."""
+        ids = [i for i in range(3 * n - 2, 3 * n + 1) if i <= self.count]
+        link = None
+        for i in reversed(ids):
+            link = {"is_baby": False, "species": self._named("pokemon-species", i), "evolution_details": [],
+                    "evolves_to": [link] if link else []}
+        return {"id": n, "baby_trigger_item": None, "chain": link}
+
+    def type(self, n):
+        """Respuesta sintética de `type/{n}/` con relaciones de daño deterministas."""
+        related = lambda *offsets: [self._named("type", (n + k - 1) % len(TYPES) + 1, TYPES[(n + k - 1) % len(TYPES)]) for k in offsets]
+        return {
+            "id": n,
+            "name": TYPES[n - 1],
+            "damage_relations": {
+                "double_damage_from": related(1, 4),
+                "half_damage_from": related(2),
+                "no_damage_from": related(7) if n % 4 == 0 else [],
+                "double_damage_to": related(3),
+                "half_damage_to": related(5),
+                "no_damage_to": [],
+            },
+            "move_damage_class": {"name": "physical" if n % 2 else "special", "url": ""},
+        }
+
+    def ability(self, n):
+        """Respuesta sintética de `ability/{n}/`."""
+        return {"id": n, "name": f"ability-{n - 1}", "is_main_series": n % 7 != 0, "generation": {"name": self.generations[n % len(self.generations)], "url": ""}}
+
+    def _should_fail(self, path):
+        """Decide de forma determinista si la primera solicitud a `path` falla."""
+        if not self.error_rate or path in self._failed:
+            return False
+        digest = hashlib.blake2b(f"{self.seed}:{path}".encode(), digest_size=8).digest()
+        if int.from_bytes(digest, "big") / 2 ** 64 >= self.error_rate:
+            return False
+        self._failed.add(path)
+        return True
+
+    def _respond(self, request, data):
+        """Respuesta JSON con `ETag`; 304 si la solicitud condicional coincide."""
+        body = json.dumps(data)
+        etag = '"' + hashlib.blake2b(body.encode(), digest_size=8).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(text=body, content_type="application/json", headers={"ETag": etag})
+
+    async def handle(self, request):
+        """Atiende cualquier ruta de la API imitada."""
+        self.requests += 1
+        self.paths[request.path] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        parts = request.path.strip("/").split("/")[2:]
+        resource = parts[0] if parts else ""
+        if resource == "generation" and len(parts) == 1:
+            return self._respond(request, {
+                "count": len(self.generations),
+                "results": [{"name": name, "url": f"{self.base_url}generation/{number}/"} for number, name in enumerate(self.generations, 1)],
+            })
+        if resource == "pokemon" and len(parts) == 1:
+            limit = int(request.query.get("limit", 20))
+            offset = int(request.query.get("offset", 0))
+            ids = range(offset + 1, min(offset + limit, self.pokemon_count) + 1)
+            return self._respond(request, {
+                "count": self.pokemon_count,
+                "results": [{"name": f"pokemon-{i}", "url": f"{self.base_url}pokemon/{i}/"} for i in ids],
+            })
+        if len(parts) != 2 or not parts[1].isdigit():
+            raise web.HTTPNotFound()
+        number = int(parts[1])
+        if resource == "generation" and 1 <= number <= len(self.generations):
+            return self._respond(request, {
+                "id": number,
+                "name": self.generations[number - 1],
+                "pokemon_species": [{"name": f"pokemon-{i}", "url": f"{self.base_url}pokemon-species/{i}/"} for i in self.generation_ids(number)],
+            })
+        if (resource == "pokemon" and 1 <= number <= self.pokemon_count) or (resource == "pokemon-species" and 1 <= number <= self.count):
+            if self._should_fail(request.path):
+                self.errors += 1
+                headers = {"Retry-After": "0"} if self.error_status == 429 else None
+                return web.Response(status=self.error_status, headers=headers)
+            return self._respond(request, self.pokemon(number) if resource == "pokemon" else self.species(number))
+        if resource == "evolution-chain" and 1 <= number <= -(-self.count // 3):
+            return self._respond(request, self.evolution_chain(number))
+        if resource == "type" and 1 <= number <= len(TYPES):
+            return self._respond(request, self.type(number))
+        if resource == "ability" and 1 <= number <= 30:
+            return self._respond(request, self.ability(number))
+        raise web.HTTPNotFound()
+
+    def app(self):
+        """Aplicación aiohttp del servidor."""
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", self.handle)
+        return app
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Arranca el servidor en el event loop actual y devuelve su URL base."""
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.base_url = f"http://{host}:{port}/api/v2/"
+        return self.base_url
+
+    async def stop(self):
+        """Detiene el servidor."""
+        await self._runner.cleanup()
+
+    def _run(self, host, port, connection):
+        """Proceso hijo: sirve la API hasta que el padre cierre la conexión."""
+        async def run():
+            connection.send(await self.start(host, port))
+            await asyncio.get_running_loop().run_in_executor(None, connection.recv_bytes)
+
+        try:
+            asyncio.run(run())
+        except EOFError:
+            pass
+
+    @contextmanager
+    def serve(self, host="127.0.0.1", port=0):
+        """Sirve la API en un proceso propio mientras dura el bloque.
+        El servidor no comparte el GIL ni el tiempo de CPU con el proceso que se mide.
+        Returns:
+            str: URL base de la API, por ejemplo `http://127.0.0.1:54321/api/v2/`.
+        """
+        parent, child = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=self._run, args=(host, port, child), daemon=True)
+        process.start()
+        try:
+            self.base_url = parent.recv()
+            yield self.base_url
+        finally:
+            parent.close()
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--generations", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503, choices=(429, 503))
+    parser.add_argument("--payload-kb", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    api = MockPokeAPI(args.count, args.generations, args.latency_ms / 1000, args.error_rate, args.error_status, args.payload_kb, args.seed)
+
+    async def run():
+        print(f"PokeAPI sintética en {await api.start(args.host, args.port)}")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
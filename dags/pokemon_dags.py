@@ -1,16 +1,13 @@
 from airflow import DAG
-from airflow.operators.python import PythonOperator
-from airflow.models import Variable
-from airflow.hooks.base import BaseHook
+from airflow.decorators import task
 from datetime import datetime, timedelta
-import asyncio
+from functools import lru_cache
 from pathlib import Path
+from types import SimpleNamespace
 
-# Importa tus módulos
-from pokemon_etl.config_manager import ConfigManager
-from pokemon_etl.extract import get_raw_species, get_raw_pokemons
-from pokemon_etl.transform import join_species_pokemons
-from pokemon_etl.load import load_pokemons_to_db
+# El scheduler analiza este archivo continuamente: aquí solo se importa Airflow y se declara
+# la estructura del DAG. La configuración, las Variables, la conexión y los módulos del ETL
+# (aiohttp, pyarrow, pandas, SQLAlchemy) se resuelven dentro de cada tarea al ejecutarse.
 
 # Configuración global del DAG
 default_args = {
@@ -22,70 +19,203 @@ default_args = {
     "retry_delay": timedelta(minutes=2),
 }
 
-# Definir variables predeterminadas para el DAG desde json
-config = ConfigManager(datetime.now())
-def_raw_species_path = config.raw_species_path
-def_raw_pokemon_path = config.raw_pokemon_path
-def_processed_path = config.processed_path
-def_parquet_name = config.parquet_name
-def_csv_name = config.csv_name
-def_generations = config.generations
-def_api_base_url = config.api_base_url
-
-# Leer Variables desde Airflow UI
-raw_species_path = Path(Variable.get("pokemon_raw_species_path", default_var=def_raw_species_path))
-raw_pokemon_path = Path(Variable.get("pokemon_raw_pokemon_path", default_var=def_raw_pokemon_path))
-processed_path = Path(Variable.get("pokemon_processed_path", default_var=def_processed_path))
-parquet_name = Variable.get("pokemon_parquet_name", default_var=def_parquet_name)
-csv_name = Variable.get("pokemon_csv_name", default_var=def_csv_name)
-raw_generations = Variable.get("pokemon_generations", default_var=None)
-if raw_generations:
-    generations = [g.strip() for g in raw_generations.split(",") if g.strip()]
-else:
-    generations = def_generations
-api_base_url = Variable.get("pokemon_api_base_url", default_var=def_api_base_url)
-
-# Leer conexión de Postgres desde Airflow UI
-postgres_conn = BaseHook.get_connection("postgres_pokemon")
-db_user = postgres_conn.login
-db_password = postgres_conn.password
-db_host = postgres_conn.host
-db_name = postgres_conn.schema
-db_port = postgres_conn.port
+@lru_cache(maxsize=None)
+def settings():
+    """Lee config.json, las Variables y la conexión de Postgres una vez por proceso de tarea.
+    Returns:
+        SimpleNamespace: Configuración del ETL (`config`) y parámetros sobrescritos desde Airflow.
+    """
+    from airflow.models import Variable
+    from airflow.hooks.base import BaseHook
+    from pokemon_etl.config_manager import ConfigManager
+
+    # Variables predeterminadas desde json
+    config = ConfigManager(datetime.now())
+    # Leer Variables desde Airflow UI
+    raw_generations = Variable.get("pokemon_generations", default_var=None)
+    if raw_generations:
+        generations = [g.strip() for g in raw_generations.split(",") if g.strip()]
+    else:
+        generations = config.generations
+    # Leer conexión de Postgres desde Airflow UI
+    postgres_conn = BaseHook.get_connection("postgres_pokemon")
+    return SimpleNamespace(
+        config=config,
+        raw_species_path=Path(Variable.get("pokemon_raw_species_path", default_var=config.raw_species_path)),
+        raw_pokemon_path=Path(Variable.get("pokemon_raw_pokemon_path", default_var=config.raw_pokemon_path)),
+        processed_path=Path(Variable.get("pokemon_processed_path", default_var=config.processed_path)),
+        parquet_name=Variable.get("pokemon_parquet_name", default_var=config.parquet_name),
+        csv_name=Variable.get("pokemon_csv_name", default_var=config.csv_name),
+        generations=generations,
+        api_base_url=Variable.get("pokemon_api_base_url", default_var=config.api_base_url),
+        concurrency=int(Variable.get("pokemon_concurrency", default_var=config.concurrency)),
+        page_size=int(Variable.get("pokemon_page_size", default_var=config.page_size)),
+        pages_per_shard=int(Variable.get("pokemon_pages_per_shard", default_var=config.pages_per_shard)),
+        db_user=postgres_conn.login,
+        db_password=postgres_conn.password,
+        db_host=postgres_conn.host,
+        db_name=postgres_conn.schema,
+        db_port=postgres_conn.port,
+    )
 
 # Wrappers para las funciones del ETL
+# La extracción y la transformación se dividen en fragmentos (una generación de especies o un
+# rango de páginas de Pokémon) mapeados dinámicamente: si un fragmento falla solo se reintenta
+# ese fragmento. Por XCom solo viajan manifiestos pequeños con rutas, nunca los datos.
+def report_metrics(task):
+    """Guarda las métricas de la tarea y las devuelve para publicarlas como XCom."""
+    from pokemon_etl.metrics import METRICS, task_path
+
+    config = settings().config
+    if config.metrics_enabled:
+        METRICS.write_report(task_path(config.metrics_report_path, task), task_path(config.metrics_textfile_path, task))
+    return METRICS.snapshot()
+
 def setup_dirs():
     """Crea los directorios necesarios para el ETL."""
-    raw_species_path.mkdir(parents=True, exist_ok=True)
-    raw_pokemon_path.mkdir(parents=True, exist_ok=True)
-    processed_path.mkdir(parents=True, exist_ok=True)
-
-def extract_data():
-
-    asyncio.run(get_raw_species(raw_species_path, api_base_url, generations))
-    asyncio.run(get_raw_pokemons(raw_pokemon_path, api_base_url))
-
-def transform_data():
-
-    join_species_pokemons(
-        raw_species_path,
-        raw_pokemon_path,
-        generations,
-        processed_path,
-        parquet_name,
-        csv_name
+    s = settings()
+    s.raw_species_path.mkdir(parents=True, exist_ok=True)
+    s.raw_pokemon_path.mkdir(parents=True, exist_ok=True)
+    s.processed_path.mkdir(parents=True, exist_ok=True)
+
+def plan_data():
+    """Divide la extracción en fragmentos."""
+    from pokemon_etl.shards import plan_shards
+
+    s = settings()
+    return plan_shards(s.api_base_url, s.generations, s.page_size, s.pages_per_shard)
+
+def extract_data(shard):
+    """Extrae un fragmento y devuelve su manifiesto."""
+    from pokemon_etl.cache import build_cache
+    from pokemon_etl.ratelimit import build_throttle
+    from pokemon_etl.shards import extract_shard, shard_manifest_path
+    from pokemon_etl.metrics import METRICS
+
+    s = settings()
+    METRICS.reset()
+    cache = build_cache(s.config)
+    throttle = build_throttle(s.config)
+    try:
+        with METRICS.phase("EXTRACT"):
+            manifest = extract_shard(shard, s.raw_species_path, s.raw_pokemon_path, s.api_base_url, s.concurrency, s.page_size,
+                                     cache, throttle, s.config.raw_format, s.config.raw_compression,
+                                     s.config.crawl_links if s.config.crawl_enabled else None, s.config.raw_linked_path,
+                                     shard_manifest_path(s.config.manifest_path, shard["id"]), force_run())
+    finally:
+        if cache:
+            cache.close()
+    report_metrics(f"extract_{shard['id']}")
+    return manifest
+
+def transform_data(manifest):
+    """Transforma un fragmento extraído y devuelve su manifiesto."""
+    from pokemon_etl.shards import transform_shard
+    from pokemon_etl.metrics import METRICS
+
+    s = settings()
+    METRICS.reset()
+    with METRICS.phase("TRANSFORM"):
+        manifest = transform_shard(
+            manifest,
+            s.processed_path,
+            s.config.batch_size,
+            s.config.extra_fields,
+            s.config.json_backend,
+            s.config.typed_decode
+        )
+    report_metrics(f"transform_{manifest['id']}")
+    return manifest
+
+def force_run():
+    """Indica si la ejecución pide `{"force": true}`: extracción completa y etapas forzadas."""
+    from airflow.operators.python import get_current_context
+
+    return bool((get_current_context()["dag_run"].conf or {}).get("force", False))
+
+def stage_cache():
+    """Caché de etapas; `{"force": true}` en la configuración de la ejecución fuerza las etapas."""
+    from pokemon_etl.stage_cache import StageCache
+
+    config = settings().config
+    return StageCache(config.stage_cache_path, force_run(), config.stage_cache_enabled)
+
+def merge_data(manifests):
+    """Une los fragmentos transformados y escribe las salidas, salvo que no hayan cambiado."""
+    from functools import partial
+    from pokemon_etl.shards import merge_shards
+    from pokemon_etl.sinks import output_paths
+    from pokemon_etl.stage_cache import transform_fingerprint
+    from pokemon_etl.metrics import METRICS
+
+    s = settings()
+    manifests = list(manifests)
+    linked_files = [file for manifest in manifests for file in manifest["linked"]]
+    merge_key = partial(
+        transform_fingerprint,
+        [manifest["path"] for manifest in manifests] + linked_files,
+        s.config.extra_fields,
+        outputs=s.config.outputs,
+        parquet_name=s.parquet_name,
+        csv_name=s.csv_name,
+        feather_name=s.config.feather_name,
+        dataset_name=s.config.dataset_name,
+        row_group_size=s.config.row_group_size,
+        partition_by=s.config.partition_by,
+        write_metadata=s.config.write_metadata,
     )
+    METRICS.reset()
+    with METRICS.phase("TRANSFORM"):
+        stage_cache().run(
+            "merge",
+            merge_key,
+            merge_shards,
+            manifests,
+            s.processed_path,
+            s.parquet_name,
+            s.csv_name,
+            s.config.extra_fields,
+            s.config.row_group_size,
+            s.config.dataset_name,
+            s.config.partition_by,
+            s.config.write_metadata,
+            s.config.outputs,
+            s.config.feather_name,
+            linked_files if s.config.crawl_enabled else None,
+            outputs=output_paths(s.processed_path, s.config.outputs, s.parquet_name, s.csv_name, s.config.feather_name, s.config.dataset_name)
+        )
+    return report_metrics("merge")
 
 def load_data():
-    load_pokemons_to_db(
-        processed_path,
-        parquet_name,
-        db_user,
-        db_password,
-        db_host,
-        db_name,
-        db_port
-    )
+    """Carga el Parquet en Postgres, salvo que ni el archivo ni la tabla destino hayan cambiado."""
+    from functools import partial
+    from pokemon_etl.load import load_pokemons_to_db, connect_to_postgresql
+    from pokemon_etl.stage_cache import load_fingerprint
+    from pokemon_etl.metrics import METRICS
+
+    s = settings()
+    METRICS.reset()
+    with METRICS.phase("LOAD"):
+        engine = connect_to_postgresql(s.db_user, s.db_password, s.db_host, s.db_name, s.db_port)
+        load_key = partial(load_fingerprint, engine, s.processed_path / s.parquet_name, s.config.load_mode, s.config.copy_format,
+                           columns=s.config.load_columns)
+        stage_cache().run(
+            "load",
+            load_key,
+            load_pokemons_to_db,
+            s.processed_path,
+            s.parquet_name,
+            s.db_user,
+            s.db_password,
+            s.db_host,
+            s.db_name,
+            s.db_port,
+            s.config.load_mode,
+            s.config.copy_format,
+            s.config.load_batch_size,
+            s.config.load_columns
+        )
+    return report_metrics("load")
 
 # Definir el DAG
 with DAG(
@@ -97,33 +227,13 @@ with DAG(
     catchup=False,
     tags=["etl", "pokeapi"],
 ) as dag:
-    
-    setup_task = PythonOperator(
-        task_id="setup_directories",
-        image="pokemon_etl:latest",
-        docker_url="unix://var/run/docker.sock",
-        python_callable=setup_dirs
-    )
-
-    extract_task = PythonOperator(
-        task_id="extract_data",
-        image="pokemon_etl:latest",
-        docker_url="unix://var/run/docker.sock",
-        python_callable=extract_data
-    )
 
-    transform_task = PythonOperator(
-        task_id="transform_data",
-        image="pokemon_etl:latest",
-        docker_url="unix://var/run/docker.sock",
-        python_callable=transform_data
-    )
-
-    load_task = PythonOperator(
-        task_id="load_data",
-        image="pokemon_etl:latest",
-        docker_url="unix://var/run/docker.sock",
-        python_callable=load_data
-    )
+    setup_task = task(task_id="setup_directories")(setup_dirs)()
+    shards = task(task_id="plan_shards")(plan_data)()
+    extracted = task(task_id="extract_shard")(extract_data).expand(shard=shards)
+    transformed = task(task_id="transform_shard")(transform_data).expand(manifest=extracted)
+    merge_task = task(task_id="merge_shards")(merge_data)(transformed)
+    load_task = task(task_id="load_data")(load_data)()
 
-    setup_task >> extract_task >> transform_task >> load_task
\ No newline at end of file
+    setup_task >> shards
+    merge_task >> load_task
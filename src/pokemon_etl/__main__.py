@@ -0,0 +1,3 @@
+from pokemon_etl.cli import main
+
+main()
@@ -0,0 +1,223 @@
+import time
+import zlib
+import sqlite3
+import logging
+from pathlib import Path
+
+CACHE_MODES = ("default", "cache_only")
+
+
+class CacheMissError(Exception):
+    """Se lanza cuando el modo 'cache_only' no encuentra una URL en la caché."""
+
+
+class ResponseCache:
+    """Caché persistente en disco de respuestas HTTP indexada por URL.
+    Guarda el cuerpo comprimido con zlib en una base SQLite junto a los validadores
+    ETag y Last-Modified para revalidar con solicitudes condicionales.
+    Las escrituras se acumulan en memoria y se confirman en una sola transacción cada
+    `commit_every` cambios, de modo que varios procesos (los fragmentos del DAG) comparten
+    el archivo reteniendo el bloqueo de escritura solo durante el volcado.
+    Args:
+        path (Path): Ruta del archivo SQLite de la caché.
+        ttl_seconds (int): Segundos durante los que una entrada se considera fresca.
+        max_size_mb (int): Tamaño máximo de los cuerpos almacenados antes de expulsar entradas.
+        mode (str): 'default' revalida las entradas vencidas, 'cache_only' nunca accede a la red.
+        purge_after_seconds (int): Antigüedad a partir de la cual una entrada vencida se borra al
+            abrir la caché. Las vencidas más recientes se conservan para revalidarlas con un 304.
+        commit_every (int): Cambios pendientes que provocan un volcado a disco.
+        lock_timeout (float): Segundos de espera si otro proceso tiene bloqueada la base.
+    """
+    def __init__(self, path, ttl_seconds=86400, max_size_mb=512, mode="default", purge_after_seconds=604800,
+                 commit_every=100, lock_timeout=30):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Modo de caché no soportado: {mode}. Opciones: {CACHE_MODES}")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.mode = mode
+        self.purge_after_seconds = purge_after_seconds
+        self.commit_every = commit_every
+        self._pending = {}
+        self._touched = {}
+        self._accessed = {}
+        self._conn = sqlite3.connect(self.path, timeout=lock_timeout)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+        if not self.offline:
+            self.purge_expired()
+        self._total_bytes = self._stored_bytes()
+
+    @property
+    def offline(self):
+        """Indica si la caché trabaja sin acceso a la red."""
+        return self.mode == "cache_only"
+
+    def _stored_bytes(self):
+        """Tamaño de los cuerpos guardados en la base, incluidos los de otros procesos."""
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, url):
+        """Obtiene una entrada de la caché.
+        Args:
+            url (str): URL de la solicitud.
+        Returns:
+            dict: Cuerpo descomprimido, validadores y fecha de descarga, o None si no existe.
+        """
+        now = time.time()
+        if url in self._pending:
+            body, _, etag, last_modified, fetched_at, _ = self._pending[url]
+            self._pending[url] = self._pending[url][:5] + (now,)
+        else:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            body, etag, last_modified, fetched_at = row
+            self._accessed[url] = now
+        return {
+            "body": zlib.decompress(body),
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": fetched_at,
+        }
+
+    def is_fresh(self, entry):
+        """Evalúa si una entrada sigue vigente según el TTL."""
+        return time.time() - entry["fetched_at"] < self.ttl_seconds
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Construye las cabeceras de una solicitud condicional a partir de una entrada."""
+        headers = {}
+        if entry is None:
+            return headers
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url, body, etag=None, last_modified=None):
+        """Guarda o reemplaza una respuesta en la caché.
+        Args:
+            url (str): URL de la solicitud.
+            body (bytes): Cuerpo de la respuesta.
+            etag (str): Cabecera ETag de la respuesta.
+            last_modified (str): Cabecera Last-Modified de la respuesta.
+        """
+        compressed = zlib.compress(body, 6)
+        now = time.time()
+        if url in self._pending:
+            previous = self._pending[url][1]
+        else:
+            row = self._conn.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            previous = row[0] if row else 0
+        self._pending[url] = (compressed, len(compressed), etag, last_modified, now, now)
+        self._total_bytes += len(compressed) - previous
+        self._changed()
+
+    def touch(self, url):
+        """Renueva la vigencia de una entrada revalidada con un 304."""
+        now = time.time()
+        if url in self._pending:
+            self._pending[url] = self._pending[url][:4] + (now, now)
+        else:
+            self._touched[url] = now
+        self._changed()
+
+    def _changed(self):
+        """Vuelca los cambios pendientes si alcanzan `commit_every`."""
+        if len(self._pending) + len(self._touched) >= self.commit_every:
+            self.flush()
+
+    def flush(self):
+        """Confirma en una sola transacción las respuestas, revalidaciones y accesos pendientes."""
+        if self._pending or self._touched or self._accessed:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO responses (url, body, size, etag, last_modified, fetched_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(url, *row) for url, row in self._pending.items()],
+                )
+                self._conn.executemany(
+                    "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                    [(now, now, url) for url, now in self._touched.items()],
+                )
+                self._conn.executemany(
+                    "UPDATE responses SET accessed_at = MAX(accessed_at, ?) WHERE url = ?",
+                    [(now, url) for url, now in self._accessed.items()],
+                )
+            self._pending.clear()
+            self._touched.clear()
+            self._accessed.clear()
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+
+    def purge_expired(self):
+        """Borra las entradas descargadas hace más de `purge_after_seconds`.
+        Returns:
+            int: Entradas borradas.
+        """
+        with self._conn:
+            purged = self._conn.execute(
+                "DELETE FROM responses WHERE fetched_at < ?", (time.time() - self.purge_after_seconds,)
+            ).rowcount
+        if purged:
+            logging.info(f"Caché HTTP: {purged} entradas vencidas borradas.", extra={"phase": "EXTRACT"})
+        return purged
+
+    def evict(self):
+        """Expulsa las entradas menos usadas hasta dejar la caché al 90% de su tamaño máximo."""
+        target = int(self.max_bytes * 0.9)
+        self._total_bytes = self._stored_bytes()
+        evicted = []
+        rows = self._conn.execute("SELECT url, size FROM responses ORDER BY accessed_at ASC").fetchall()
+        for url, size in rows:
+            if self._total_bytes <= target:
+                break
+            evicted.append((url,))
+            self._total_bytes -= size
+        with self._conn:
+            self._conn.executemany("DELETE FROM responses WHERE url = ?", evicted)
+        logging.info(f"Caché HTTP: {len(evicted)} entradas expulsadas por tamaño.", extra={"phase": "EXTRACT"})
+
+    def close(self):
+        """Confirma los cambios pendientes y cierra la caché."""
+        self.flush()
+        self._conn.close()
+
+
+def build_cache(configuracion):
+    """Crea la caché HTTP a partir de la configuración del ETL.
+    Args:
+        configuracion (ConfigManager): Configuración del ETL.
+    Returns:
+        ResponseCache: Caché configurada, o None si está deshabilitada.
+    """
+    if not configuracion.cache_enabled:
+        return None
+    return ResponseCache(
+        configuracion.cache_path,
+        configuracion.cache_ttl_seconds,
+        configuracion.cache_max_size_mb,
+        configuracion.cache_mode,
+        configuracion.cache_purge_after_seconds,
+        configuracion.cache_commit_every,
+        configuracion.cache_lock_timeout,
+    )
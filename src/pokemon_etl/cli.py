@@ -0,0 +1,173 @@
+import argparse
+import logging
+from datetime import datetime
+from functools import partial
+from pokemon_etl.config_manager import ConfigManager
+from pokemon_etl.extract import run_extraction
+from pokemon_etl.cache import build_cache
+from pokemon_etl.manifest import ExtractManifest
+from pokemon_etl.ratelimit import build_throttle
+from pokemon_etl.transform import join_species_pokemons, species_files
+from pokemon_etl.raw_store import RawStore
+from pokemon_etl.sinks import output_paths
+from pokemon_etl.stage_cache import StageCache, transform_fingerprint, load_fingerprint
+from pokemon_etl.load import load_pokemons_to_db, connect_to_postgresql
+from pokemon_etl.pipeline import PIPELINE_MODES, run_pipeline
+from pokemon_etl.metrics import METRICS
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="pokemon-etl", description="ETL de Pokémon: PokeAPI -> Parquet/CSV -> PostgreSQL.")
+    parser.add_argument("--config", default="config_file/config.json", help="Ruta del archivo de configuración.")
+    parser.add_argument("--mode", choices=PIPELINE_MODES, help="Modo de ejecución; por defecto el de pipeline_config.mode.")
+    parser.add_argument("--force", action="store_true", help="Descarga todas las páginas aunque un intento anterior las haya completado y ejecuta la transformación y la carga aunque sus entradas no hayan cambiado.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Ejecuta el ETL completo con la configuración indicada.
+    Args:
+        argv (list): Argumentos de la línea de comandos. None usa sys.argv.
+    Returns:
+        None
+    """
+    args = parse_args(argv)
+
+    # Cargar la configuración
+    # Se obtiene la hora de inicio
+    start_time = datetime.now()
+    # Se crea una instancia de ConfigManager para manejar la configuración del ETL, se le pasa la hora de ini
+    configuracion = ConfigManager(start_time, args.config)
+    if args.mode:
+        configuracion.pipeline_mode = args.mode
+    config_file_path = configuracion.config_file
+    # Se obtienen parametros de la API
+    base_url = configuracion.api_base_url
+    generations = configuracion.generations
+    concurrency = configuracion.concurrency
+    page_size = configuracion.page_size
+    # Se obtienen las rutas de los archivos
+    raw_pokemon_path = configuracion.raw_pokemon_path
+    raw_species_path = configuracion.raw_species_path
+    processed_path = configuracion.processed_path
+    logs_path = configuracion.logs_path
+    # Se obtienen los nombres de los archivos
+    parquet_name = configuracion.parquet_name
+    csv_name = configuracion.csv_name
+    # Se obtienen los parametros de la base de datos
+    db_user = configuracion.db_user
+    db_password = configuracion.db_password
+    db_host = 'localhost'#configuracion.db_host
+    db_name = configuracion.db_name
+    db_port = configuracion.db_port
+
+    logfilename = f"{logs_path}/{start_time.strftime('%m%Y')}/etl_{start_time.strftime('%d%m%Y_%H%M%S.log')}"
+
+    # Configuración del logger
+    logger = logging.getLogger()
+    logger.setLevel(logging.INFO)
+    formatter = logging.Formatter("%(asctime)s - %(levelname)s - [%(phase)s] - %(message)s")
+    # Handler para archivo
+    file_handler = logging.FileHandler(logfilename)
+    file_handler.setFormatter(formatter)
+    # Handler para consola
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    # Agregar handlers al logger
+    logger.addHandler(file_handler)
+    logger.addHandler(console_handler)
+
+    logging.info(f"Inicia proceso {start_time.strftime('%Y-%m-%d %H:%M:%S')}", extra={"phase": "ETL"})
+    logging.info(f"Directorio de logs: {logs_path}", extra={"phase": "ETL"})
+    logging.info(f"Directorio de especies crudas: {raw_species_path}", extra={"phase": "ETL"})
+    logging.info(f"Directorio de Pokemon crudos: {raw_pokemon_path}", extra={"phase": "ETL"})
+    logging.info(f"Directorio archivo config: {config_file_path}", extra={"phase": "ETL"})
+    logging.info(f"URL base de la API: {base_url}", extra={"phase": "ETL"})
+    logging.info(f"Generaciones a procesar: {generations}", extra={"phase": "ETL"})
+    logging.info(f"Solicitudes simultáneas: {concurrency}, Pokémon por página: {page_size}", extra={"phase": "ETL"})
+    logging.info(f"Caché HTTP: habilitada={configuracion.cache_enabled}, modo={configuracion.cache_mode}, ruta={configuracion.cache_path}", extra={"phase": "ETL"})
+    logging.info(f"Parámetros de conexión a la base de datos: user={db_user}, host={db_host}, dbname={db_name}, port={db_port}", extra={"phase": "ETL"})
+
+    if configuracion.pipeline_mode not in PIPELINE_MODES:
+        raise ValueError(f"Modo de pipeline no soportado: {configuracion.pipeline_mode}. Opciones: {PIPELINE_MODES}")
+    if configuracion.pipeline_mode == "fused":
+        logging.info("Inicia el pipeline en streaming: extracción, transformación y carga solapadas.", extra={"phase": "ETL"})
+        cache = build_cache(configuracion)
+        try:
+            with METRICS.phase("PIPELINE"):
+                run_pipeline(base_url, generations, processed_path, parquet_name, csv_name, concurrency, page_size, cache, build_throttle(configuracion),
+                             configuracion.batch_size, configuracion.extra_fields, configuracion.outputs, configuracion.feather_name,
+                             configuracion.dataset_name, configuracion.row_group_size, configuracion.partition_by, configuracion.write_metadata,
+                             connect_to_postgresql(db_user, db_password, db_host, db_name, db_port), configuracion.load_mode, configuracion.copy_format,
+                             raw_species_path if configuracion.archive_raw else None, raw_pokemon_path if configuracion.archive_raw else None,
+                             configuracion.raw_format, configuracion.raw_compression, configuracion.queue_size, configuracion.load_columns)
+        finally:
+            if cache:
+                cache.close()
+        logging.info(f"Finaliza pipeline en streaming {start_time.strftime('%Y-%m-%d %H:%M:%S')}", extra={"phase": "ETL"})
+    else:
+        logging.info("Inicia el proceso de extraccion de datos crudos.", extra={"phase": "ETL"})
+        crawl_links = configuracion.crawl_links if configuracion.crawl_enabled else None
+        raw_linked_path = configuracion.raw_linked_path if configuracion.crawl_enabled else None
+        cache = build_cache(configuracion)
+        manifest = ExtractManifest(configuracion.manifest_path)
+        if args.force:
+            manifest.reset_progress()
+        throttle = build_throttle(configuracion)
+        try:
+            with METRICS.phase("EXTRACT"):
+                linked_files = run_extraction(raw_species_path, raw_pokemon_path, base_url, generations, concurrency, page_size,
+                                              cache, manifest, throttle, configuracion.raw_format, configuracion.raw_compression,
+                                              crawl_links, raw_linked_path)
+        finally:
+            if cache:
+                cache.close()
+        logging.info(f"Finaliza proceso de extraccion {start_time.strftime('%Y-%m-%d %H:%M:%S')}", extra={"phase": "ETL"})
+
+        # Las etapas posteriores a la extracción se omiten si sus entradas y su configuración no cambiaron.
+        stages = StageCache(configuracion.stage_cache_path, args.force, configuracion.stage_cache_enabled)
+        transform_settings = {
+            "generations": generations,
+            "outputs": configuracion.outputs,
+            "parquet_name": parquet_name,
+            "csv_name": csv_name,
+            "feather_name": configuracion.feather_name,
+            "dataset_name": configuracion.dataset_name,
+            "row_group_size": configuracion.row_group_size,
+            "partition_by": configuracion.partition_by,
+            "write_metadata": configuracion.write_metadata,
+            "batch_size": configuracion.batch_size,
+        }
+
+        def transform_key():
+            files = species_files(raw_species_path, generations) + RawStore(raw_pokemon_path).files("pokemon_page_")
+            files += linked_files
+            return transform_fingerprint(files, configuracion.extra_fields, **transform_settings)
+
+        logging.info("Inicia el proceso de transformación de datos crudos.", extra={"phase": "ETL"})
+        with METRICS.phase("TRANSFORM"):
+            stages.run("transform", transform_key, join_species_pokemons,
+                       raw_species_path, raw_pokemon_path, generations, processed_path, parquet_name, csv_name, configuracion.batch_size, configuracion.extra_fields,
+                       configuracion.transform_workers, configuracion.json_backend, configuracion.typed_decode,
+                       configuracion.row_group_size, configuracion.dataset_name, configuracion.partition_by, configuracion.write_metadata,
+                       configuracion.outputs, configuracion.feather_name, linked_files,
+                       outputs=output_paths(processed_path, configuracion.outputs, parquet_name, csv_name, configuracion.feather_name, configuracion.dataset_name))
+        logging.info(f"Finaliza proceso de transformación {start_time.strftime('%Y-%m-%d %H:%M:%S')}", extra={"phase": "ETL"})
+
+        logging.info("Inicia el proceso de carga de datos a la base de datos.", extra={"phase": "ETL"})
+        with METRICS.phase("LOAD"):
+            engine = connect_to_postgresql(db_user, db_password, db_host, db_name, db_port)
+            load_key = partial(load_fingerprint, engine, processed_path / parquet_name, configuracion.load_mode, configuracion.copy_format,
+                               columns=configuracion.load_columns)
+            stages.run("load", load_key, load_pokemons_to_db,
+                       processed_path, parquet_name, db_user, db_password, db_host, db_name, db_port,
+                       configuracion.load_mode, configuracion.copy_format, configuracion.load_batch_size, configuracion.load_columns)
+        logging.info(f"Finaliza proceso de carga {start_time.strftime('%Y-%m-%d %H:%M:%S')}", extra={"phase": "ETL"})
+    logging.info(f"Tiempo total de ejecución: {datetime.now() - start_time}", extra={"phase": "ETL"})
+    if configuracion.metrics_enabled:
+        METRICS.write_report(configuracion.metrics_report_path, configuracion.metrics_textfile_path)
+        logging.info(f"Informe de métricas guardado en {configuracion.metrics_report_path}", extra={"phase": "ETL"})
+
+
+if __name__ == "__main__":
+    main()
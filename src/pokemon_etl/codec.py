@@ -0,0 +1,124 @@
+import json
+import logging
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+BACKENDS = ("auto", "orjson", "msgspec", "json")
+DECODE_ERRORS = (json.JSONDecodeError,) + ((msgspec.DecodeError,) if msgspec else ())
+# El aviso de modo tipado sin msgspec se registra una sola vez por proceso.
+_typed_fallback_warned = False
+
+
+def resolve_backend(backend="auto"):
+    """Elige el decodificador JSON disponible.
+    Args:
+        backend (str): 'auto', 'orjson', 'msgspec' o 'json'. 'auto' usa el más rápido instalado.
+    Returns:
+        str: Nombre del backend efectivo.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Decodificador JSON no soportado: {backend}. Opciones: {BACKENDS}")
+    if backend == "auto":
+        return "orjson" if orjson else "msgspec" if msgspec else "json"
+    if backend == "orjson" and orjson is None or backend == "msgspec" and msgspec is None:
+        raise ImportError(f"El decodificador '{backend}' no está instalado.")
+    return backend
+
+
+def get_loads(backend="auto"):
+    """Obtiene la función de decodificación de un backend.
+    Returns:
+        callable: Función que recibe bytes o str y devuelve objetos Python.
+    """
+    backend = resolve_backend(backend)
+    if backend == "orjson":
+        return orjson.loads
+    if backend == "msgspec":
+        return msgspec.json.decode
+    return json.loads
+
+
+loads = get_loads()
+
+
+def top_level_keys(fields):
+    """Obtiene las claves de primer nivel que usa una especificación de campos."""
+    keys = []
+    for field in fields:
+        key = field["path"].split(".", 1)[0].split("[", 1)[0]
+        if key not in keys:
+            keys.append(key)
+    return keys
+
+
+class Decoder:
+    """Decodificador de registros JSON crudos.
+    En modo tipado (`fields` y msgspec instalado) decodifica solo las claves de primer nivel
+    que usa la especificación de campos y omite el resto (moves, sprites, flavor texts...).
+    Sin msgspec decodifica el registro completo con el backend elegido y lo avisa una vez.
+    Args:
+        backend (str): 'auto', 'orjson', 'msgspec' o 'json'.
+        fields (list): Especificación de campos para el modo tipado. None decodifica todo.
+    """
+    def __init__(self, backend="auto", fields=None):
+        global _typed_fallback_warned
+        self.backend = resolve_backend(backend)
+        self._loads = get_loads(self.backend)
+        self._keys = None
+        if fields is not None and msgspec is None and not _typed_fallback_warned:
+            logging.warning(f"La decodificación tipada requiere msgspec, que no está instalado; se decodifican los "
+                            f"registros completos con '{self.backend}'.", extra={"phase": "TRANSFORM"})
+            _typed_fallback_warned = True
+        if fields is not None and msgspec is not None:
+            self._keys = top_level_keys(fields)
+            attributes = [f"f{position}" for position in range(len(self._keys))]
+            struct = msgspec.defstruct(
+                "RawRecord",
+                [(attribute, Any, None) for attribute in attributes],
+                rename=dict(zip(attributes, self._keys)),
+            )
+            self._record = msgspec.json.Decoder(struct)
+            self._array = msgspec.json.Decoder(list[struct])
+
+    @property
+    def typed(self):
+        """Indica si el decodificador omite las claves que no se usan."""
+        return self._keys is not None
+
+    @property
+    def mode(self):
+        """Modo efectivo: 'typed' (msgspec, solo las claves usadas) o el backend que decodifica todo."""
+        return "typed" if self.typed else self.backend
+
+    def decode(self, data):
+        """Decodifica un registro JSON.
+        Args:
+            data (bytes): Registro JSON.
+        Returns:
+            dict: Registro decodificado.
+        """
+        if self._keys is None:
+            return self._loads(data)
+        return dict(zip(self._keys, msgspec.structs.astuple(self._record.decode(data))))
+
+    def decode_array(self, data):
+        """Decodifica una lista JSON de registros.
+        Args:
+            data (bytes): Lista JSON.
+        Returns:
+            list: Registros decodificados.
+        """
+        if self._keys is None:
+            return self._loads(data)
+        keys = self._keys
+        astuple = msgspec.structs.astuple
+        return [dict(zip(keys, astuple(record))) for record in self._array.decode(data)]
@@ -7,6 +7,13 @@ class ConfigManager:
     Carga la configuración desde un archivo JSON y proporciona métodos para acceder a los parámetros de:
     - API
     - Rutas
+    - Transformación
+    - Control de tasa y reintentos
+    - Caché HTTP
+    - Rastreo de recursos enlazados
+    - Modo de ejecución del pipeline
+    - Caché de etapas
+    - Métricas
     - Base de datos.
     """
     def __init__(self, start_time, config_path: str = "config_file/config.json"):
@@ -15,20 +22,78 @@ class ConfigManager:
         self.api_config = self.config.get("api_config")
         self.path_config = self.config.get("path_config")
         self.db_config = self.config.get("db_config")
+        self.transform_config = self.config.get("transform_config", {})
+        self.rate_limit_config = self.config.get("rate_limit_config", {})
+        self.cache_config = self.config.get("cache_config", {})
+        self.crawl_config = self.config.get("crawl_config", {})
+        self.pipeline_config = self.config.get("pipeline_config", {})
+        self.stage_cache_config = self.config.get("stage_cache_config", {})
+        self.metrics_config = self.config.get("metrics_config", {})
         self._validate_and_create_dirs(start_time)
         self.api_base_url = self._get_api_param("api_base_url")
         self.generations = self._get_api_param("generations")
+        self.concurrency = self._get_api_param("concurrency")
+        self.page_size = self._get_api_param("page_size")
         self.raw_pokemon_path = self._get_part_path("raw_pokemon_path")
         self.raw_species_path = self._get_part_path("raw_species_path")
+        self.raw_linked_path = self._get_part_path("raw_linked_path")
         self.processed_path = self._get_part_path("processed_path")
         self.logs_path = self._get_part_path("logs_path")
+        self.manifest_path = self._get_part_path("manifest_path")
         self.db_user = self._get_db_param("user")
         self.db_password = self._get_db_param("password")
         self.db_host = self._get_db_param("host")
         self.db_name = self._get_db_param("db_name")
         self.db_port = self._get_db_param("port")
+        self.load_mode = self._get_db_param("load_mode")
+        self.copy_format = self._get_db_param("copy_format")
+        self.load_batch_size = self._get_db_param("batch_size")
+        self.load_columns = self._get_db_param("columns")
         self.parquet_name = self._get_file_param("parquet_name")
         self.csv_name = self._get_file_param("csv_name")
+        self.feather_name = self._get_file_param("feather_name")
+        self.outputs = self._get_file_param("outputs")
+        self.raw_format = self._get_file_param("raw_format")
+        self.raw_compression = self._get_file_param("raw_compression")
+        self.row_group_size = self._get_file_param("row_group_size")
+        self.dataset_name = self._get_file_param("dataset_name")
+        self.partition_by = self._get_file_param("partition_by")
+        self.write_metadata = self._get_file_param("write_metadata")
+        self.batch_size = self._get_transform_param("batch_size")
+        self.extra_fields = self._get_transform_param("extra_fields")
+        self.transform_workers = self._get_transform_param("workers")
+        self.json_backend = self._get_transform_param("json_backend")
+        self.typed_decode = self._get_transform_param("typed_decode")
+        self.requests_per_second = self._get_rate_limit_param("requests_per_second")
+        self.burst = self._get_rate_limit_param("burst")
+        self.min_concurrency = self._get_rate_limit_param("min_concurrency")
+        self.max_concurrency = self._get_rate_limit_param("max_concurrency")
+        self.max_retries = self._get_rate_limit_param("max_retries")
+        self.backoff_base = self._get_rate_limit_param("backoff_base")
+        self.backoff_max = self._get_rate_limit_param("backoff_max")
+        self.decrease_factor = self._get_rate_limit_param("decrease_factor")
+        self.latency_factor = self._get_rate_limit_param("latency_factor")
+        self.warmup_samples = self._get_rate_limit_param("warmup_samples")
+        self.min_latency_delta = self._get_rate_limit_param("min_latency_delta")
+        self.cache_enabled = self._get_cache_param("enabled")
+        self.cache_path = Path(self._get_cache_param("path"))
+        self.cache_ttl_seconds = self._get_cache_param("ttl_seconds")
+        self.cache_max_size_mb = self._get_cache_param("max_size_mb")
+        self.cache_mode = self._get_cache_param("mode")
+        self.cache_purge_after_seconds = self._get_cache_param("purge_after_seconds")
+        self.cache_commit_every = self._get_cache_param("commit_every")
+        self.cache_lock_timeout = self._get_cache_param("lock_timeout")
+        self.crawl_enabled = self._get_crawl_param("enabled")
+        self.crawl_links = self._get_crawl_param("links")
+        self.pipeline_mode = self._get_pipeline_param("mode")
+        self.archive_raw = self._get_pipeline_param("archive_raw")
+        self.queue_size = self._get_pipeline_param("queue_size")
+        self.pages_per_shard = self._get_pipeline_param("pages_per_shard")
+        self.stage_cache_enabled = self._get_stage_cache_param("enabled")
+        self.stage_cache_path = Path(self._get_stage_cache_param("path"))
+        self.metrics_enabled = self._get_metrics_param("enabled")
+        self.metrics_report_path = Path(self._get_metrics_param("report_path"))
+        self.metrics_textfile_path = Path(self._get_metrics_param("textfile_path"))
         
     def _load_config(self) -> dict:
         """
@@ -80,3 +145,45 @@ class ConfigManager:
         if param not in self.config.get("file_config", {}):
             raise KeyError(f"El parámetro '{param}' no se encuentra en la configuración de archivos.")
         return self.config.get("file_config").get(param)
+
+    def _get_transform_param(self, param: str):
+        """Obtiene un parámetro de la configuración de la transformación."""
+        if param not in self.transform_config:
+            raise KeyError(f"El parámetro '{param}' no se encuentra en la configuración de la transformación.")
+        return self.transform_config.get(param)
+
+    def _get_rate_limit_param(self, param: str):
+        """Obtiene un parámetro de la configuración de control de tasa y reintentos."""
+        if param not in self.rate_limit_config:
+            raise KeyError(f"El parámetro '{param}' no se encuentra en la configuración de control de tasa.")
+        return self.rate_limit_config.get(param)
+
+    def _get_cache_param(self, param: str):
+        """Obtiene un parámetro de la configuración de la caché HTTP."""
+        if param not in self.cache_config:
+            raise KeyError(f"El parámetro '{param}' no se encuentra en la configuración de la caché.")
+        return self.cache_config.get(param)
+
+    def _get_crawl_param(self, param: str):
+        """Obtiene un parámetro de la configuración del rastreo de recursos enlazados."""
+        if param not in self.crawl_config:
+            raise KeyError(f"El parámetro '{param}' no se encuentra en la configuración del rastreo.")
+        return self.crawl_config.get(param)
+
+    def _get_pipeline_param(self, param: str):
+        """Obtiene un parámetro de la configuración del modo de ejecución."""
+        if param not in self.pipeline_config:
+            raise KeyError(f"El parámetro '{param}' no se encuentra en la configuración del pipeline.")
+        return self.pipeline_config.get(param)
+
+    def _get_stage_cache_param(self, param: str):
+        """Obtiene un parámetro de la configuración de la caché de etapas."""
+        if param not in self.stage_cache_config:
+            raise KeyError(f"El parámetro '{param}' no se encuentra en la configuración de la caché de etapas.")
+        return self.stage_cache_config.get(param)
+
+    def _get_metrics_param(self, param: str):
+        """Obtiene un parámetro de la configuración de métricas."""
+        if param not in self.metrics_config:
+            raise KeyError(f"El parámetro '{param}' no se encuentra en la configuración de métricas.")
+        return self.metrics_config.get(param)
@@ -0,0 +1,154 @@
+import shutil
+import logging
+from pathlib import Path
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+METADATA_NAME = "_metadata"
+COMMON_METADATA_NAME = "_common_metadata"
+
+
+def dictionary_columns(table, max_ratio=0.5):
+    """Elige las columnas de texto de baja cardinalidad para codificarlas con diccionario.
+    Args:
+        table (pa.Table): Tabla a escribir.
+        max_ratio (float): Proporción máxima de valores distintos frente al número de filas.
+    Returns:
+        list: Nombres de las columnas.
+    """
+    columns = []
+    for field in table.schema:
+        if pa.types.is_dictionary(field.type):
+            columns.append(field.name)
+        elif pa.types.is_string(field.type) and table.num_rows:
+            if pc.count_distinct(table.column(field.name)).as_py() <= table.num_rows * max_ratio:
+                columns.append(field.name)
+    return columns
+
+
+def parquet_options(table, row_group_size=None):
+    """Opciones de escritura Parquet comunes al archivo único y al dataset.
+    Returns:
+        dict: Compresión, columnas con diccionario, estadísticas y tamaño del grupo de filas.
+    """
+    return {
+        "compression": "snappy",
+        "use_dictionary": dictionary_columns(table),
+        "write_statistics": True,
+        "row_group_size": row_group_size,
+    }
+
+
+def write_parquet(table, path, row_group_size=None):
+    """Escribe una tabla en un único archivo Parquet con grupos de filas y estadísticas.
+    Args:
+        table (pa.Table): Tabla a escribir.
+        path (Path): Ruta del archivo.
+        row_group_size (int): Filas por grupo. None usa el valor por defecto de pyarrow.
+    """
+    pq.write_table(table, path, **parquet_options(table, row_group_size))
+
+
+def write_dataset(table, path, partition_by=None, row_group_size=None, write_metadata=True):
+    """Escribe una tabla como dataset Parquet particionado al estilo Hive.
+    Cada partición (por ejemplo `generation=generation-i/`) contiene sus propios archivos, de
+    modo que un lector que filtra por la columna de partición no abre el resto. Las columnas
+    de texto de baja cardinalidad se codifican con diccionario y se guardan estadísticas por
+    grupo de filas para filtrar por predicado. Opcionalmente se escribe un resumen
+    `_metadata` con los pies de todos los archivos.
+    El dataset se escribe en un directorio temporal para que no queden particiones de
+    ejecuciones anteriores. Al terminar, el directorio anterior se aparta con un renombrado,
+    el nuevo ocupa su lugar con otro y solo entonces se borra el anterior: los lectores nunca
+    encuentran el directorio a medio borrar, y si la escritura falla el dataset anterior sigue intacto.
+    Args:
+        table (pa.Table): Tabla a escribir.
+        path (Path): Directorio del dataset.
+        partition_by (list): Columnas de partición.
+        row_group_size (int): Máximo de filas por grupo de filas.
+        write_metadata (bool): Escribe los archivos `_metadata` y `_common_metadata`.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    partition_by = list(partition_by or [])
+    options = parquet_options(table, row_group_size)
+    file_format = ds.ParquetFileFormat()
+    file_options = file_format.make_write_options(
+        compression=options["compression"],
+        use_dictionary=[column for column in options["use_dictionary"] if column not in partition_by],
+        write_statistics=True,
+    )
+    collector = []
+
+    def visit(written_file):
+        metadata = written_file.metadata
+        metadata.set_file_path(Path(written_file.path).relative_to(tmp_path).as_posix())
+        collector.append(metadata)
+
+    group_options = {"max_rows_per_group": row_group_size, "min_rows_per_group": 0} if row_group_size else {}
+    ds.write_dataset(
+        table,
+        tmp_path,
+        format=file_format,
+        file_options=file_options,
+        partitioning=ds.partitioning(pa.schema([table.schema.field(column) for column in partition_by]), flavor="hive") if partition_by else None,
+        basename_template="part-{i}.parquet",
+        file_visitor=visit,
+        **group_options,
+    )
+    if write_metadata:
+        file_schema = pa.schema([field for field in table.schema if field.name not in partition_by])
+        pq.write_metadata(file_schema, tmp_path / COMMON_METADATA_NAME)
+        pq.write_metadata(file_schema, tmp_path / METADATA_NAME, metadata_collector=collector)
+    old_path = path.with_name(path.name + ".old")
+    shutil.rmtree(old_path, ignore_errors=True)
+    if path.exists():
+        path.rename(old_path)
+    try:
+        tmp_path.rename(path)
+    except OSError:
+        if old_path.exists():
+            old_path.rename(path)
+        raise
+    shutil.rmtree(old_path, ignore_errors=True)
+    logging.info(
+        f"Dataset Parquet guardado en {path}: {table.num_rows} registros en {len(collector)} archivos, particionado por {partition_by}.",
+        extra={"phase": "TRANSFORM"},
+    )
+
+
+def open_dataset(path):
+    """Abre un dataset Parquet particionado, usando el resumen `_metadata` si existe.
+    Con `_metadata` no es necesario listar los directorios ni leer el pie de cada archivo
+    para conocer las estadísticas de sus grupos de filas.
+    Args:
+        path (Path): Directorio del dataset.
+    Returns:
+        pyarrow.dataset.Dataset: Dataset abierto.
+    """
+    path = Path(path)
+    if (path / METADATA_NAME).exists():
+        return ds.parquet_dataset(path / METADATA_NAME, partitioning="hive")
+    return ds.dataset(path, format="parquet", partitioning="hive")
+
+
+def read_dataset(path, filters=None, columns=None):
+    """Lee un dataset Parquet aplicando poda de particiones y de grupos de filas.
+    Args:
+        path (Path): Directorio del dataset.
+        filters (list | pyarrow.compute.Expression): Filtro como expresión o en forma DNF de
+            pyarrow, por ejemplo [("generation", "=", "generation-i"), ("type_1", "=", "fire")].
+        columns (list): Columnas a leer. None lee todas.
+    Returns:
+        pa.Table: Filas que cumplen el filtro.
+    """
+    dataset = open_dataset(path)
+    expression = filters
+    if isinstance(filters, (list, tuple)):
+        expression = pq.filters_to_expression(filters) if filters else None
+    fragments = list(dataset.get_fragments(filter=expression))
+    table = dataset.to_table(columns=columns, filter=expression)
+    logging.info(f"Lectura de {path}: {len(fragments)} archivos tras la poda, {table.num_rows} registros.", extra={"phase": "LOAD"})
+    return table
@@ -1,8 +1,13 @@
-import json
+import time
 import logging
 import asyncio
 import aiohttp
 from pathlib import Path
+from pokemon_etl.codec import loads
+from pokemon_etl.cache import ResponseCache, CacheMissError
+from pokemon_etl.raw_store import RawStore
+from pokemon_etl.metrics import METRICS
+from pokemon_etl.ratelimit import Throttle, RETRYABLE_STATUS, OVERLOAD_STATUS, parse_retry_after
 
 def create_directory(path):
     """Crea un directorio si no existe.
@@ -14,104 +19,533 @@ def create_directory(path):
     logging.info(f"Directorio creado: {path}", extra={"phase": "EXTRACT"})
 
 
-async def fetch(session, url):
+class HTTPStatusError(Exception):
+    """Respuesta HTTP con un código distinto de 200.
+    Args:
+        status (int): Código HTTP de la respuesta.
+        url (str): URL de la solicitud.
+        retry_after (float): Segundos indicados en la cabecera Retry-After, si existe.
+    """
+    def __init__(self, status, url, retry_after=None):
+        super().__init__(f"Error HTTP {status} al acceder a {url}")
+        self.status = status
+        self.url = url
+        self.retry_after = retry_after
+
+
+def read_cache(cache, url):
+    """Busca una URL en la caché.
+    Args:
+        cache (ResponseCache): Caché de respuestas HTTP, puede ser None.
+        url (str): URL de la solicitud.
+    Returns:
+        tuple: (datos, entrada). `datos` no es None si la respuesta puede servirse sin acceder
+        a la red; `entrada` se usa para revalidar con una solicitud condicional.
+    """
+    if not cache:
+        return None, None
+    entry = cache.get(url)
+    if entry and (cache.offline or cache.is_fresh(entry)):
+        METRICS.inc("cache_hits_total")
+        return loads(entry["body"]), entry
+    if cache.offline:
+        error_msg = f"URL no disponible en la caché (modo cache_only): {url}"
+        logging.error(error_msg, extra={"phase": "EXTRACT"})
+        raise CacheMissError(error_msg)
+    return None, entry
+
+async def request(session, url, cache=None, entry=None):
+    """Realiza una solicitud GET asíncrona contra la red.
+    Args:
+        session (aiohttp.ClientSession): Sesión HTTP asíncrona.
+        url (str): URL a la que se realiza la solicitud.
+        cache (ResponseCache): Caché donde se guarda la respuesta.
+        entry (dict): Entrada vencida de la caché para revalidar.
+    Returns:
+        dict: Respuesta JSON de la solicitud.
+    """
+    start = time.perf_counter()
+    try:
+        async with session.get(url, headers=ResponseCache.conditional_headers(entry)) as response:
+            body = await response.read()
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        METRICS.observe_request("error", 0, time.perf_counter() - start)
+        raise
+    METRICS.observe_request(response.status, len(body), time.perf_counter() - start)
+    if response.status == 304 and entry:
+        cache.touch(url)
+        return loads(entry["body"])
+    if response.status != 200:
+        raise HTTPStatusError(response.status, url, parse_retry_after(response.headers.get("Retry-After")))
+    if cache:
+        cache.put(url, body, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return loads(body)
+
+async def fetch(session, url, cache=None):
     """Realiza una solicitud GET asíncrona.
+    Si se entrega una caché, las entradas vigentes se sirven sin acceder a la red y las
+    vencidas se revalidan con una solicitud condicional (ETag / Last-Modified).
     Args:
         session (aiohttp.ClientSession): Sesión HTTP asíncrona.
         url (str): URL a la que se realiza la solicitud.
+        cache (ResponseCache): Caché de respuestas HTTP opcional.
     Returns:
         dict: Respuesta JSON de la solicitud.
     """
-    async with session.get(url) as response:
-        if response.status != 200:
-            error_msg = f"Error HTTP {response.status} al acceder a {url}"
-            logging.error(error_msg, extra={"phase": "EXTRACT"})
-            raise Exception(error_msg)
-        return await response.json()
-    
-async def get_pokemon_gens(session, base_url, generation_list): 
+    data, entry = read_cache(cache, url)
+    if data is not None:
+        return data
+    try:
+        return await request(session, url, cache, entry)
+    except HTTPStatusError as e:
+        logging.error(str(e), extra={"phase": "EXTRACT"})
+        raise
+
+class ExtractionEngine:
+    """Motor de extracción con una única sesión HTTP y una cola de trabajo acotada.
+    Un grupo fijo de workers consume la cola; cada solicitud pasa por el control de tasa
+    (cubo de tokens y concurrencia adaptativa AIMD) y se reintenta con backoff ante
+    errores transitorios.
+    Args:
+        concurrency (int): Número de solicitudes simultáneas si no se entrega `throttle`.
+        timeout (int): Tiempo máximo en segundos por solicitud.
+        cache (ResponseCache): Caché de respuestas HTTP opcional.
+        throttle (Throttle): Control de tasa, concurrencia y reintentos.
+    """
+    def __init__(self, concurrency=50, timeout=60, cache=None, throttle=None):
+        self.throttle = throttle or Throttle(initial_concurrency=concurrency)
+        self.concurrency = self.throttle.max_concurrency
+        self.timeout = timeout
+        self.cache = cache
+        self.session = None
+        self._queue = None
+        self._workers = []
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency,
+            limit_per_host=self.concurrency,
+            ttl_dns_cache=300,
+            keepalive_timeout=60,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        self._queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        await self.session.close()
+
+    async def _worker(self):
+        """Consume solicitudes de la cola mientras el motor esté activo."""
+        while True:
+            url, future = await self._queue.get()
+            try:
+                if not future.cancelled():
+                    future.set_result(await self._fetch(url))
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    async def _fetch(self, url):
+        """Obtiene una URL desde la caché o la red aplicando control de tasa y reintentos.
+        Args:
+            url (str): URL a la que se realiza la solicitud.
+        Returns:
+            dict: Respuesta JSON de la solicitud.
+        """
+        data, entry = read_cache(self.cache, url)
+        if data is not None:
+            return data
+        limiter = self.throttle.concurrency
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            await limiter.acquire()
+            try:
+                await self.throttle.bucket.acquire()
+                start = loop.time()
+                result = await request(self.session, url, self.cache, entry)
+                limiter.on_success(loop.time() - start)
+                return result
+            except HTTPStatusError as e:
+                if e.status not in RETRYABLE_STATUS or attempt >= self.throttle.max_retries:
+                    logging.error(str(e), extra={"phase": "EXTRACT"})
+                    raise
+                if e.status in OVERLOAD_STATUS:
+                    limiter.on_overload()
+                delay = self.throttle.delay(attempt, e.retry_after)
+                if e.retry_after is not None:
+                    self.throttle.bucket.pause(delay)
+                error = e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt >= self.throttle.max_retries:
+                    logging.error(f"Error de red al acceder a {url}: {e!r}", extra={"phase": "EXTRACT"})
+                    raise
+                delay = self.throttle.delay(attempt)
+                error = e
+            finally:
+                await limiter.release()
+            attempt += 1
+            logging.warning(f"Reintento {attempt}/{self.throttle.max_retries} de {url} en {delay:.2f}s ({error})", extra={"phase": "EXTRACT"})
+            await asyncio.sleep(delay)
+
+    async def get(self, url):
+        """Encola una solicitud GET y espera su resultado.
+        Args:
+            url (str): URL a la que se realiza la solicitud.
+        Returns:
+            dict: Respuesta JSON de la solicitud.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((url, future))
+        return await future
+
+
+async def get_pokemon_gens(engine, base_url, generation_list): 
     """Obtiene las generaciones de Pokémon desde la API.
     Args:
-        session (aiohttp.ClientSession): Sesión HTTP asíncrona.
+        engine (ExtractionEngine): Motor de extracción.
         base_url (str): URL base de la API.
         generation (list): lista de las generaciones a obtener.
     Returns:
         list: Lista de diccionarios con nombre y URLs de las generaciones a extraer.
     """
     url = f"{base_url}generation/"
-    data = await fetch(session, url)
+    data = await engine.get(url)
     return [{'nombre':generation['name'],'url':generation['url']} for generation in data['results'] if generation['name'] in generation_list]
 
-async def get_pokemon_list(session, base_url, limit=2000):
+async def get_pokemon_list(engine, base_url, limit=2000):
     """Obtiene la lista de Pokémon desde la API, aplica un limite de 2000 pokemones para asegurar que se obtienen todos.
     Args:
-        session (aiohttp.ClientSession): Sesión HTTP asíncrona.
+        engine (ExtractionEngine): Motor de extracción.
         base_url (str): URL base de la API.
         limit (int): Número máximo de Pokémon a obtener.
     Returns:
         list: Lista de URLs de los Pokémon.
     """
     url = f"{base_url}pokemon?limit={limit}"
-    data = await fetch(session, url)
+    data = await engine.get(url)
     return [pokemon['url'] for pokemon in data['results']]
 
-async def get_url_data(session, url):
+async def get_url_data(engine, url):
     """Obtiene el contenido de una URL.
     Args:
-        session (aiohttp.ClientSession): Sesión HTTP asíncrona.
+        engine (ExtractionEngine): Motor de extracción.
         url (str): URL.
     Returns:
         dict: Contenido de la URL.
     """
-    return await fetch(session, url)
+    return await engine.get(url)
 
-async def get_raw_pokemons(raw_path, base_url):
-    """Obtiene los datos crudos de los Pokémon y los guarda en archivos JSON.
+def raise_failures(results, unit):
+    """Registra las unidades fallidas y lanza un error que las resume.
     Args:
-        raw_path (Path): Ruta donde se guardarán los datos crudos.
+        results (list): Resultados de asyncio.gather con return_exceptions=True.
+        unit (str): Nombre de la unidad de trabajo para el mensaje.
+    Returns:
+        None
+    """
+    failures = [result for result in results if isinstance(result, BaseException)]
+    if not failures:
+        return
+    for failure in failures:
+        logging.error(f"Fallo en {unit}: {failure}", extra={"phase": "EXTRACT"})
+    raise RuntimeError(f"{len(failures)} de {len(results)} {unit} fallaron; un reintento descargará solo las faltantes.") from failures[0]
+
+def link_urls(record, path):
+    """Obtiene las URLs enlazadas desde un registro siguiendo una ruta de enlace.
+    La ruta son claves separadas por puntos; `[]` recorre todos los elementos de una lista,
+    por ejemplo `evolution_chain.url` o `types[].type.url`. Los valores nulos se ignoran.
+    Args:
+        record (dict): Registro JSON.
+        path (str): Ruta de enlace.
+    Returns:
+        list: URLs encontradas.
+    """
+    values = [record]
+    for segment in path.split("."):
+        key, each = (segment[:-2], True) if segment.endswith("[]") else (segment, False)
+        found = []
+        for value in values:
+            item = value.get(key) if isinstance(value, dict) else None
+            if item is None:
+                continue
+            if each:
+                found.extend(item if isinstance(item, list) else [])
+            else:
+                found.append(item)
+        values = found
+    return [value for value in values if isinstance(value, str) and value]
+
+def resource_name(url):
+    """Obtiene el tipo de recurso de una URL, por ejemplo 'evolution-chain'."""
+    return url.rstrip("/").rsplit("/", 2)[-2]
+
+class LinkCrawler:
+    """Sigue los enlaces configurados de los registros extraídos y descarga cada recurso enlazado una sola vez.
+    Cientos de especies apuntan a la misma cadena evolutiva y casi todos los Pokémon comparten
+    tipos: el diccionario de solicitudes hace de conjunto de visitados global y, a la vez, de
+    single-flight, porque quien pide una URL ya solicitada recibe la misma tarea en curso.
+    Args:
+        engine (ExtractionEngine): Motor de extracción.
+        links (dict): Rutas de enlace por tipo de registro ('species', 'pokemon'), por ejemplo
+            {"species": ["evolution_chain.url"], "pokemon": ["types[].type.url"]}.
+    """
+    def __init__(self, engine, links):
+        self.engine = engine
+        self.links = links
+        self._requests = {}
+
+    def fetch(self, url):
+        """Devuelve la tarea que descarga `url`, creándola solo la primera vez."""
+        task = self._requests.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self.engine.get(url))
+            self._requests[url] = task
+            METRICS.inc("crawl_requests_total", resource=resource_name(url))
+        else:
+            METRICS.inc("crawl_deduplicated_total", resource=resource_name(url))
+        return task
+
+    def follow(self, kind, records):
+        """Programa la descarga de los recursos enlazados desde `records` sin esperarla.
+        Args:
+            kind (str): Tipo de los registros ('species' o 'pokemon').
+            records (list): Registros extraídos.
+        Returns:
+            None
+        """
+        for record in records:
+            for path in self.links.get(kind, []):
+                for url in link_urls(record, path):
+                    self.fetch(url)
+
+    async def cancel(self):
+        """Cancela las descargas pendientes."""
+        for task in self._requests.values():
+            task.cancel()
+        await asyncio.gather(*self._requests.values(), return_exceptions=True)
+
+    async def save(self, store, suffix=""):
+        """Espera las descargas y guarda un archivo por tipo de recurso, ordenado por id.
+        Args:
+            store (RawStore): Almacén de los recursos enlazados.
+            suffix (str): Sufijo de los archivos, para que varios fragmentos no se sobrescriban.
+        Returns:
+            list: Stems de los archivos escritos.
+        """
+        results = await asyncio.gather(*self._requests.values(), return_exceptions=True)
+        raise_failures(results, "recursos enlazados")
+        grouped = {}
+        for url, record in zip(self._requests, results):
+            grouped.setdefault(resource_name(url), []).append(record)
+        for resource, records in grouped.items():
+            records.sort(key=lambda record: record["id"])
+            await asyncio.to_thread(store.write, f"{resource}{suffix}", records)
+            logging.info(f"{len(records)} recursos '{resource}' guardados en {store.path}", extra={"phase": "EXTRACT"})
+        return [f"{resource}{suffix}" for resource in grouped]
+
+async def save_pokemon_page(engine, store, page, urls, manifest=None, crawler=None):
+    """Descarga una página de Pokémon y la guarda en el almacén crudo.
+    Args:
+        engine (ExtractionEngine): Motor de extracción.
+        store (RawStore): Almacén donde se guardarán los datos crudos.
+        page (int): Número de página.
+        urls (list): URLs de los Pokémon de la página.
+        manifest (ExtractManifest): Manifiesto donde se registra la página completada.
+        crawler (LinkCrawler): Rastreador de recursos enlazados opcional.
+    Returns:
+        None
+    """
+    results = await asyncio.gather(*(get_url_data(engine, url) for url in urls))
+    if crawler:
+        crawler.follow("pokemon", results)
+    await asyncio.to_thread(store.write, f"pokemon_page_{page}", results)
+    if manifest:
+        manifest.record_page(page, urls, results)
+    METRICS.add_rows("EXTRACT", len(results))
+    logging.info(f"Lote {page} guardado ({len(results)} Pokémon).", extra={"phase": "EXTRACT"})
+
+async def save_pokemon_pages(engine, store, pages, manifest=None, crawler=None):
+    """Descarga y guarda varias páginas de Pokémon a la vez.
+    Con un manifiesto, las páginas ya completas se omiten; el rastreador sigue igualmente sus
+    enlaces, leyéndolas del almacén.
+    Args:
+        engine (ExtractionEngine): Motor de extracción.
+        store (RawStore): Almacén donde se guardarán los datos crudos.
+        pages (dict): URLs de los Pokémon por número de página.
+        manifest (ExtractManifest): Manifiesto de recursos ya extraídos.
+        crawler (LinkCrawler): Rastreador de recursos enlazados opcional.
+    Returns:
+        None
+    """
+    if manifest:
+        pending = {
+            page: page_urls for page, page_urls in pages.items()
+            if not manifest.page_complete(page, page_urls, store.exists(f"pokemon_page_{page}"))
+        }
+        logging.info(f"Páginas de Pokémon pendientes: {len(pending)} de {len(pages)}.", extra={"phase": "EXTRACT"})
+    else:
+        pending = pages
+    if crawler:
+        for page in pages.keys() - pending.keys():
+            crawler.follow("pokemon", await asyncio.to_thread(list, store.read(f"pokemon_page_{page}")))
+    results = await asyncio.gather(
+        *(save_pokemon_page(engine, store, page, page_urls, manifest, crawler) for page, page_urls in pending.items()),
+        return_exceptions=True,
+    )
+    raise_failures(results, "páginas de Pokémon")
+
+async def get_raw_pokemons(engine, store, base_url, page_size=50, manifest=None, crawler=None):
+    """Obtiene los datos crudos de los Pokémon y los guarda en el almacén crudo.
+    Todas las páginas se encolan a la vez en el motor; cada página se escribe en cuanto
+    terminan sus solicitudes. Con un manifiesto, las páginas ya completas se omiten.
+    Args:
+        engine (ExtractionEngine): Motor de extracción.
+        store (RawStore): Almacén donde se guardarán los datos crudos.
         base_url (str): URL base de la API.
+        page_size (int): Número de Pokémon por archivo.
+        manifest (ExtractManifest): Manifiesto de recursos ya extraídos.
+        crawler (LinkCrawler): Rastreador de recursos enlazados opcional; también sigue los
+            enlaces de las páginas omitidas, leyéndolas del almacén.
     Returns:
         None
     """
-    async with aiohttp.ClientSession() as session:
-        logging.info("Obteniendo lista de Pokémon...", extra={"phase": "EXTRACT"})
-        urls = await get_pokemon_list(session, base_url)
-
-        chunk_size = 50  # número de requests concurrentes
-        for i in range(0, len(urls), chunk_size):
-            chunk = urls[i:i + chunk_size]
-            tasks = [get_url_data(session, url) for url in chunk]
-            results = await asyncio.gather(*tasks)
-            
-            # Guardar cada lote en un archivo
-            page = i // chunk_size + 1
-            with open(f"{raw_path}/pokemon_page_{page}.json", "w", encoding="utf-8") as f:
-                json.dump(results, f, indent=4)
-            
-            logging.info(f"Lote {page} guardado ({len(results)} Pokémon).", extra={"phase": "EXTRACT"})
-
-async def get_raw_species(raw_path, base_url, generation_list):
-    """Obtiene los datos crudos de las especies de Pokémon por generación y los guarda en archivos JSON.
-    Args:
-        raw_path (Path): Ruta donde se guardarán los datos crudos.
+    logging.info("Obteniendo lista de Pokémon...", extra={"phase": "EXTRACT"})
+    urls = await get_pokemon_list(engine, base_url)
+    pages = {i // page_size + 1: urls[i:i + page_size] for i in range(0, len(urls), page_size)}
+    if manifest:
+        for page in manifest.drop_pages_after(len(pages)):
+            store.remove(f"pokemon_page_{page}")
+    await save_pokemon_pages(engine, store, pages, manifest, crawler)
+
+async def save_generation(engine, store, generation, manifest=None, crawler=None):
+    """Descarga las especies de una generación y las guarda en el almacén crudo.
+    Args:
+        engine (ExtractionEngine): Motor de extracción.
+        store (RawStore): Almacén donde se guardarán los datos crudos.
+        generation (dict): Nombre y URL de la generación.
+        manifest (ExtractManifest): Manifiesto de recursos ya extraídos.
+        crawler (LinkCrawler): Rastreador de recursos enlazados opcional.
+    Returns:
+        None
+    """
+    menu = await get_url_data(engine, generation['url'])
+    urls = [pokemon["url"] for pokemon in menu["pokemon_species"]]
+    if manifest and manifest.generation_complete(generation['nombre'], urls, store.exists(generation['nombre'])):
+        logging.info(f"Generación {generation['nombre']} ya extraída, se omite.", extra={"phase": "EXTRACT"})
+        if crawler:
+            crawler.follow("species", await asyncio.to_thread(list, store.read(generation['nombre'])))
+        return
+    logging.info(f"Descargando {generation['nombre']} desde: {generation['url']}", extra={"phase": "EXTRACT"})
+    pokemones = await asyncio.gather(*(get_url_data(engine, url) for url in urls))
+    if crawler:
+        crawler.follow("species", pokemones)
+    await asyncio.to_thread(store.write, generation['nombre'], pokemones)
+    if manifest:
+        manifest.record_generation(generation['nombre'], urls, pokemones)
+    METRICS.add_rows("EXTRACT", len(pokemones))
+    logging.info(f"Generación {generation['nombre']} guardada en {store.path}", extra={"phase": "EXTRACT"})
+
+async def get_raw_species(engine, store, base_url, generation_list, manifest=None, crawler=None):
+    """Obtiene los datos crudos de las especies de Pokémon por generación y los guarda en el almacén crudo.
+    Args:
+        engine (ExtractionEngine): Motor de extracción.
+        store (RawStore): Almacén donde se guardarán los datos crudos.
         base_url (str): URL base de la API.
         generation_list (list): Lista de generaciones a obtener.
+        manifest (ExtractManifest): Manifiesto de recursos ya extraídos.
+        crawler (LinkCrawler): Rastreador de recursos enlazados opcional.
     Returns:
         None
     """
-    async with aiohttp.ClientSession() as session:
-        logging.info("Obteniendo lista de generaciones...", extra={"phase": "EXTRACT"})
-        generations = await get_pokemon_gens(session, base_url, generation_list)
-        for generation in generations:
-            logging.info(f"Descargando {generation['nombre']} desde: {generation['url']}", extra={"phase": "EXTRACT"})
-            menu = await get_url_data(session, generation['url'])
+    logging.info("Obteniendo lista de generaciones...", extra={"phase": "EXTRACT"})
+    generations = await get_pokemon_gens(engine, base_url, generation_list)
+    results = await asyncio.gather(
+        *(save_generation(engine, store, generation, manifest, crawler) for generation in generations),
+        return_exceptions=True,
+    )
+    raise_failures(results, "generaciones")
 
-            pokemones = []
-            for pokemon in menu["pokemon_species"]:
-                details = await get_url_data(session, pokemon["url"])
-                pokemones.append(details)
-
-            with open(raw_path / f"{generation['nombre']}.json", "w", encoding="utf-8") as fout:
-                json.dump(pokemones, fout, indent=4)
-            logging.info(f"Generación {generation['nombre']} guardada en {raw_path}", extra={"phase": "EXTRACT"})
+async def extract_all(raw_species_path, raw_pokemon_path, base_url, generation_list, concurrency=50, page_size=50, cache=None, manifest=None, throttle=None, raw_format="ndjson", compression="gzip",
+                      crawl_links=None, raw_linked_path=None):
+    """Extrae especies y Pokémon de forma simultánea compartiendo un único motor de extracción.
+    Si una de las dos extracciones falla, la otra termina igualmente para que su avance
+    quede registrado en el manifiesto; si ambas terminan bien, el avance del manifiesto se
+    descarta para que la siguiente ejecución revise de nuevo todas las páginas. Con
+    `crawl_links`, los recursos enlazados se descargan en el mismo motor mientras avanza la
+    extracción y se guardan al terminar.
+    Args:
+        raw_species_path (Path): Ruta donde se guardarán las especies crudas.
+        raw_pokemon_path (Path): Ruta donde se guardarán los Pokémon crudos.
+        base_url (str): URL base de la API.
+        generation_list (list): Lista de generaciones a obtener.
+        concurrency (int): Número de solicitudes simultáneas.
+        page_size (int): Número de Pokémon por archivo.
+        cache (ResponseCache): Caché de respuestas HTTP opcional.
+        manifest (ExtractManifest): Manifiesto de recursos ya extraídos.
+        throttle (Throttle): Control de tasa, concurrencia y reintentos.
+        raw_format (str): Formato de los archivos crudos ('ndjson' o 'json').
+        compression (str): Compresión de los archivos NDJSON ('gzip', 'zstd' o 'none').
+        crawl_links (dict): Rutas de enlace a seguir por tipo de registro (ver `LinkCrawler`).
+        raw_linked_path (Path): Ruta donde se guardarán los recursos enlazados.
+    Returns:
+        list: Rutas de los archivos de recursos enlazados escritos; vacía sin `crawl_links`.
+    """
+    species_store = RawStore(raw_species_path, raw_format, compression)
+    pokemon_store = RawStore(raw_pokemon_path, raw_format, compression)
+    async with ExtractionEngine(concurrency, cache=cache, throttle=throttle) as engine:
+        crawler = LinkCrawler(engine, crawl_links) if crawl_links else None
+        results = await asyncio.gather(
+            get_raw_species(engine, species_store, base_url, generation_list, manifest, crawler),
+            get_raw_pokemons(engine, pokemon_store, base_url, page_size, manifest, crawler),
+            return_exceptions=True,
+        )
+        linked_files = []
+        if crawler and any(isinstance(result, BaseException) for result in results):
+            await crawler.cancel()
+        elif crawler:
+            linked_store = RawStore(raw_linked_path, raw_format, compression)
+            linked_files = [linked_store.find(stem) for stem in await crawler.save(linked_store)]
+    if manifest:
+        logging.info(f"Recursos nuevos o modificados: {manifest.changed}", extra={"phase": "EXTRACT"})
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    if manifest:
+        manifest.reset_progress()
+    return linked_files
 
+def run_extraction(raw_species_path, raw_pokemon_path, base_url, generation_list, concurrency=50, page_size=50, cache=None, manifest=None, throttle=None, raw_format="ndjson", compression="gzip",
+                   crawl_links=None, raw_linked_path=None):
+    """Ejecuta la extracción completa en un único event loop.
+    Args:
+        raw_species_path (Path): Ruta donde se guardarán las especies crudas.
+        raw_pokemon_path (Path): Ruta donde se guardarán los Pokémon crudos.
+        base_url (str): URL base de la API.
+        generation_list (list): Lista de generaciones a obtener.
+        concurrency (int): Número de solicitudes simultáneas.
+        page_size (int): Número de Pokémon por archivo.
+        cache (ResponseCache): Caché de respuestas HTTP opcional.
+        manifest (ExtractManifest): Manifiesto de recursos ya extraídos.
+        throttle (Throttle): Control de tasa, concurrencia y reintentos.
+        raw_format (str): Formato de los archivos crudos ('ndjson' o 'json').
+        compression (str): Compresión de los archivos NDJSON ('gzip', 'zstd' o 'none').
+        crawl_links (dict): Rutas de enlace a seguir por tipo de registro (ver `LinkCrawler`).
+        raw_linked_path (Path): Ruta donde se guardarán los recursos enlazados.
+    Returns:
+        list: Rutas de los archivos de recursos enlazados escritos; vacía sin `crawl_links`.
+    """
+    return asyncio.run(extract_all(
+        raw_species_path, raw_pokemon_path, base_url, generation_list, concurrency, page_size,
+        cache, manifest, throttle, raw_format, compression, crawl_links, raw_linked_path,
+    ))
@@ -0,0 +1,236 @@
+import re
+from functools import lru_cache
+import pyarrow as pa
+
+DTYPES = {
+    "int16": pa.int16(),
+    "int32": pa.int32(),
+    "int64": pa.int64(),
+    "float64": pa.float64(),
+    "bool": pa.bool_(),
+    "string": pa.string(),
+    "category": pa.dictionary(pa.int16(), pa.string()),
+}
+
+# Especificación declarativa de las columnas de cada recurso.
+# Los identificadores y estadísticas usan int16 y los textos de baja cardinalidad `category`
+# (diccionario Arrow, categórico en pandas).
+# `path` admite claves separadas por puntos, índices (`types[0]`) y búsquedas por clave
+# dentro de listas (`stats[stat.name=hp]`): se toma el primer elemento cuyo subcampo
+# coincide con el valor.
+POKEMON_FIELDS = [
+    {"name": "pokemon_id", "path": "id", "dtype": "int16"},
+    {"name": "name", "path": "name", "dtype": "string"},
+    {"name": "hp_base_stat", "path": "stats[stat.name=hp].base_stat", "dtype": "int16"},
+    {"name": "attack_base_stat", "path": "stats[stat.name=attack].base_stat", "dtype": "int16"},
+    {"name": "defense_base_stat", "path": "stats[stat.name=defense].base_stat", "dtype": "int16"},
+    {"name": "special_attack_base_stat", "path": "stats[stat.name=special-attack].base_stat", "dtype": "int16"},
+    {"name": "special_defense_base_stat", "path": "stats[stat.name=special-defense].base_stat", "dtype": "int16"},
+    {"name": "speed_base_stat", "path": "stats[stat.name=speed].base_stat", "dtype": "int16"},
+    {"name": "type_1", "path": "types[0].type.name", "dtype": "category"},
+    {"name": "type_2", "path": "types[1].type.name", "dtype": "category"},
+]
+
+SPECIES_FIELDS = [
+    {"name": "species_id", "path": "id", "dtype": "int16"},
+    {"name": "name", "path": "name", "dtype": "string"},
+    {"name": "color", "path": "color.name", "dtype": "category"},
+    {"name": "habitat", "path": "habitat.name", "dtype": "category"},
+    {"name": "generation", "path": "generation.name", "dtype": "category"},
+    {"name": "previous_evolution", "path": "evolves_from_species.name", "dtype": "string"},
+    {"name": "is_mythical", "path": "is_mythical", "dtype": "bool"},
+    {"name": "is_baby", "path": "is_baby", "dtype": "bool"},
+    {"name": "is_legendary", "path": "is_legendary", "dtype": "bool"},
+    {"name": "nat_pokedex_entry", "path": "pokedex_numbers[pokedex.name=national].entry_number", "dtype": "int16"},
+]
+
+_KEY = r"[A-Za-z_][A-Za-z0-9_\-]*"
+_SEGMENT = re.compile(rf"^({_KEY})(?:\[(?:(\d+)|({_KEY}(?:\.{_KEY})*)=([^\]]+))\])?$")
+_ERRORS = "(AttributeError, KeyError, IndexError, TypeError)"
+
+
+def parse_path(path):
+    """Descompone una ruta declarativa en pasos.
+    Args:
+        path (str): Ruta, por ejemplo 'stats[stat.name=hp].base_stat'.
+    Returns:
+        list: Pasos ('key', clave), ('index', n) o ('lookup', lista de claves, valor).
+    """
+    steps = []
+    for segment in _split(path):
+        match = _SEGMENT.match(segment)
+        if not match:
+            raise ValueError(f"Segmento de ruta no válido '{segment}' en '{path}'")
+        key, index, lookup_key, lookup_value = match.groups()
+        steps.append(("key", key))
+        if index is not None:
+            steps.append(("index", int(index)))
+        elif lookup_key is not None:
+            steps.append(("lookup", lookup_key.split("."), lookup_value))
+    return steps
+
+
+def _split(path):
+    """Separa una ruta por puntos sin cortar dentro de los corchetes."""
+    segments, depth, current = [], 0, ""
+    for char in path:
+        if char == "." and depth == 0:
+            segments.append(current)
+            current = ""
+            continue
+        depth += char == "["
+        depth -= char == "]"
+        current += char
+    segments.append(current)
+    return segments
+
+
+def _walk(var, source, steps):
+    """Genera las sentencias que recorren `steps` (claves e índices) desde `source`.
+    Cada paso se detiene si el valor anterior es nulo, de modo que los campos opcionales
+    con valor null (por ejemplo `habitat`) no lanzan excepciones.
+    """
+    statements = []
+    current = source
+    for step in steps:
+        if step[0] == "key":
+            statements.append(f"{var} = {current}[{step[1]!r}]")
+        else:
+            statements.append(f"{var} = {current}[{step[1]}] if len({current}) > {step[1]} else None")
+        current = var
+    return statements
+
+
+def _guarded(var, statements, indent):
+    """Encadena sentencias deteniéndose cuando `var` es nulo."""
+    lines = []
+    for position, statement in enumerate(statements):
+        prefix = f"if {var} is not None: " if position else ""
+        lines.append(f"{indent}{prefix}{statement}")
+    return lines
+
+
+def _try(var, statements, fallback, indent="    "):
+    """Envuelve las sentencias de un campo para que un dato mal formado deje `fallback`."""
+    return (
+        [f"{indent}try:"]
+        + _guarded(var, statements, indent + "    ")
+        + [f"{indent}except {_ERRORS}:", f"{indent}    {var} = {fallback}"]
+    )
+
+
+def compile_fields(fields):
+    """Compila una especificación de campos en un extractor de una sola pasada.
+    Genera una función especializada con accesos directos por columna. Cada lista anidada
+    se recorre una única vez por registro: si varias columnas buscan en ella (por ejemplo
+    las seis estadísticas) se indexa por la clave de búsqueda; si solo una, se busca el
+    primer elemento que coincide. Un campo ausente o nulo toma su valor `default`.
+    Args:
+        fields (list): Especificación de campos (name, path, dtype y default opcional).
+    Returns:
+        callable: Función que recibe un registro crudo y devuelve un diccionario de columnas,
+        o None si el registro no es un diccionario.
+    """
+    names = [field["name"] for field in fields]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Nombres de columna duplicados en la especificación: {names}")
+    parsed = []
+    lookups = {}
+    for field in fields:
+        if field.get("dtype", "string") not in DTYPES:
+            raise ValueError(f"Tipo no soportado '{field.get('dtype')}' en la columna {field['name']}")
+        steps = parse_path(field["path"])
+        positions = [i for i, step in enumerate(steps) if step[0] == "lookup"]
+        if len(positions) > 1:
+            raise ValueError(f"Solo se admite una búsqueda por ruta: {field['path']}")
+        if positions:
+            cut = positions[0]
+            group = (tuple(steps[:cut]), tuple(steps[cut][1]))
+            lookups.setdefault(group, []).append(steps[cut][2])
+            parsed.append((steps[cut + 1:], group, steps[cut][2]))
+        else:
+            parsed.append((steps, None, None))
+
+    lines = ["def _extract(r):", "    if not isinstance(r, dict):", "        return None"]
+    sources = {}
+    for number, ((prefix, keys), values) in enumerate(lookups.items()):
+        name = f"_l{number}"
+        key_expr = "e" + "".join(f"[{key!r}]" for key in keys)
+        lines += _try(name, _walk(name, "r", prefix), "None")
+        # Un elemento mal formado (por ejemplo con un subcampo nulo) se salta sin descartar el resto.
+        if len(values) > 1:
+            sources[(prefix, keys)] = (f"_ix{number}", None)
+            lines += [
+                f"    _ix{number} = {{}}",
+                "    try:",
+                f"        for e in reversed({name}) if {name} else ():",
+                "            try:",
+                f"                _ix{number}[{key_expr}] = e",
+                f"            except {_ERRORS}:",
+                "                pass",
+                f"    except {_ERRORS}:",
+                f"        _ix{number} = {{}}",
+            ]
+        else:
+            sources[(prefix, keys)] = (f"_m{number}", values[0])
+            lines += [
+                f"    _m{number} = None",
+                "    try:",
+                f"        for e in {name} or ():",
+                "            try:",
+                f"                if {key_expr} != {_coerce(values[0])!r}:",
+                "                    continue",
+                f"            except {_ERRORS}:",
+                "                continue",
+                f"            _m{number} = e",
+                "            break",
+                f"    except {_ERRORS}:",
+                "        pass",
+            ]
+    for position, (field, (steps, group, value)) in enumerate(zip(fields, parsed)):
+        var = f"v{position}"
+        if group is None:
+            statements = _walk(var, "r", steps)
+        else:
+            source, single = sources[group]
+            first = f"{var} = {source}" if single is not None else f"{var} = {source}.get({_coerce(value)!r})"
+            statements = [first] + _walk(var, var, steps)
+        lines += _try(var, statements, "None")
+        if field.get("default") is not None:
+            lines.append(f"    if {var} is None: {var} = {field['default']!r}")
+    lines.append("    return {" + ", ".join(f"{name!r}: v{i}" for i, name in enumerate(names)) + "}")
+    source = "\n".join(lines)
+    namespace = {}
+    exec(compile(source, "<compile_fields>", "exec"), namespace)
+    extractor = namespace["_extract"]
+    extractor.source = source
+    return extractor
+
+
+def _coerce(value):
+    """Convierte el valor de una búsqueda en entero si corresponde."""
+    return int(value) if value.lstrip("-").isdigit() else value
+
+
+def fields_schema(fields):
+    """Construye el esquema Arrow de una especificación de campos."""
+    return pa.schema([(field["name"], DTYPES[field.get("dtype", "string")]) for field in fields])
+
+
+@lru_cache(maxsize=None)
+def pandas_dtypes():
+    """Tipos pandas nulables: conservan int16 y bool cuando hay nulos en lugar de pasar a float64/object.
+    pandas se importa al primer uso: la transformación trabaja solo con Arrow y no lo necesita.
+    """
+    import pandas as pd
+    return {
+        pa.int16(): pd.Int16Dtype(),
+        pa.int32(): pd.Int32Dtype(),
+        pa.int64(): pd.Int64Dtype(),
+        pa.bool_(): pd.BooleanDtype(),
+    }
+
+
+def to_pandas(table):
+    """Convierte una tabla o lote Arrow a pandas con tipos nulables y categóricos."""
+    return table.to_pandas(types_mapper=pandas_dtypes().get)
@@ -0,0 +1,118 @@
+import logging
+from pathlib import Path
+from math import prod
+import pyarrow as pa
+import pyarrow.compute as pc
+from pokemon_etl.raw_store import iter_records
+from pokemon_etl.manifest import resource_id
+
+EVOLUTION_SCHEMA = pa.schema([
+    ("species_id", pa.int16()),
+    ("evolution_chain_id", pa.int16()),
+    ("evolution_stage", pa.int8()),
+    ("chain_base", pa.string()),
+    ("evolves_to", pa.string()),
+])
+DAMAGE_FACTORS = {"double_damage_from": 2.0, "half_damage_from": 0.5, "no_damage_from": 0.0}
+
+
+def linked_records(linked_files, resource):
+    """Lee los recursos enlazados de un tipo, sin repetir ids.
+    Solo se leen los archivos indicados, los que escribió la extracción de esta ejecución:
+    los archivos que quedan de ejecuciones anteriores en el mismo directorio se ignoran.
+    Cada fragmento del DAG guarda su propio archivo (`type_<fragmento>`), de modo que un mismo
+    recurso puede aparecer varias veces; se conserva la primera aparición.
+    Args:
+        linked_files (list): Rutas de los archivos de recursos enlazados.
+        resource (str): Tipo de recurso, por ejemplo 'evolution-chain' o 'type'.
+    Returns:
+        list: Registros ordenados por id.
+    """
+    records = {}
+    for path in linked_files:
+        if Path(path).name.split(".")[0].split("_")[0] != resource:
+            continue
+        for record in iter_records(path):
+            records.setdefault(record["id"], record)
+    return [records[key] for key in sorted(records)]
+
+
+def evolution_table(chains):
+    """Aplana las cadenas evolutivas en una fila por especie.
+    Args:
+        chains (list): Registros de `evolution-chain`.
+    Returns:
+        pa.Table: species_id, evolution_chain_id, evolution_stage (1 para la forma base),
+            chain_base (nombre de la forma base) y evolves_to (siguientes formas separadas por comas).
+    """
+    rows = []
+    for chain in chains:
+        base = chain["chain"]["species"]["name"]
+        pending = [(chain["chain"], 1)]
+        while pending:
+            link, stage = pending.pop()
+            next_names = [child["species"]["name"] for child in link["evolves_to"]]
+            rows.append((int(resource_id(link["species"]["url"])), chain["id"], stage, base, ",".join(next_names) or None))
+            pending.extend((child, stage + 1) for child in link["evolves_to"])
+    columns = list(zip(*rows)) if rows else [[] for _ in EVOLUTION_SCHEMA]
+    return pa.Table.from_arrays([pa.array(column, field.type) for column, field in zip(columns, EVOLUTION_SCHEMA)], schema=EVOLUTION_SCHEMA)
+
+
+def weaknesses(type_1, type_2, types):
+    """Calcula los tipos atacantes que hacen más daño del normal a cada combinación de tipos.
+    El multiplicador de cada atacante es el producto de las relaciones de daño de los dos tipos
+    del Pokémon, así una debilidad anulada por una resistencia del otro tipo no cuenta.
+    Args:
+        type_1 (pa.ChunkedArray): Tipo principal.
+        type_2 (pa.ChunkedArray): Tipo secundario, nulo si no hay.
+        types (list): Registros de `type`.
+    Returns:
+        pa.Array: Atacantes con multiplicador mayor que 1, separados por comas; nulo si falta algún tipo.
+    """
+    relations = {
+        record["name"]: {
+            related["name"]: factor
+            for relation, factor in DAMAGE_FACTORS.items()
+            for related in record["damage_relations"][relation]
+        }
+        for record in types
+    }
+    cache = {}
+    values = []
+    for pair in zip(type_1.to_pylist(), type_2.to_pylist()):
+        if pair not in cache:
+            defending = [name for name in pair if name is not None]
+            if not defending or any(name not in relations for name in defending):
+                cache[pair] = None
+            else:
+                attackers = sorted(set().union(*(relations[name] for name in defending)))
+                weak = [attacker for attacker in attackers if prod(relations[name].get(attacker, 1.0) for name in defending) > 1]
+                cache[pair] = ",".join(weak) or None
+        values.append(cache[pair])
+    return pa.array(values, pa.string())
+
+
+def join_linked(table, linked_files):
+    """Añade a la tabla unida las columnas derivadas de los recursos enlazados descargados.
+    Con cadenas evolutivas añade `evolution_chain_id`, `evolution_stage`, `chain_base` y
+    `evolves_to` (por `species_id`); con tipos añade `weak_to`. Si no hay recursos de un tipo
+    sus columnas no se añaden.
+    Args:
+        table (pa.Table): Tabla unida de Pokémon y especies.
+        linked_files (list): Rutas de los archivos de recursos enlazados de esta ejecución.
+    Returns:
+        pa.Table: Tabla con las columnas añadidas.
+    """
+    chains = linked_records(linked_files, "evolution-chain")
+    if chains:
+        evolutions = evolution_table(chains)
+        positions = pc.index_in(table.column("species_id"), value_set=evolutions.column("species_id"))
+        matched = evolutions.take(positions)
+        for name in EVOLUTION_SCHEMA.names[1:]:
+            table = table.append_column(EVOLUTION_SCHEMA.field(name), matched.column(name))
+        logging.info(f"Cadenas evolutivas unidas: {len(chains)} cadenas, {positions.null_count} especies sin cadena.", extra={"phase": "TRANSFORM"})
+    types = linked_records(linked_files, "type")
+    if types:
+        table = table.append_column(pa.field("weak_to", pa.string()), weaknesses(table.column("type_1"), table.column("type_2"), types))
+        logging.info(f"Debilidades calculadas a partir de {len(types)} tipos.", extra={"phase": "TRANSFORM"})
+    return table
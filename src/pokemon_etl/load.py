@@ -1,12 +1,29 @@
+import io
+import struct
 import psycopg2
 import pandas as pd
 import pyarrow as pa
+import pyarrow.csv as pa_csv
 import pyarrow.parquet as pq
 from sqlalchemy import create_engine, text
 import logging
+from pokemon_etl.fields import to_pandas
+from pokemon_etl.metrics import METRICS
+
+TABLE_NAME = "pokemons"
+LOAD_MODES = ("replace", "copy", "upsert")
+COPY_FORMATS = ("csv", "binary")
+INDEX_COLUMNS = ("pokemon_id", "species_id")
+ROW_KEY = "species_id"
+HASH_COLUMN = "row_hash"
+_PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+_PGCOPY_TRAILER = struct.pack(">h", -1)
+_ENGINES = {}
 
 def connect_to_postgresql(user, psw, host, dbname, port):
     """Conecta a una base de datos PostgreSQL.
+    El motor se crea una sola vez por cadena de conexión y se reutiliza en llamadas
+    posteriores, con su pool de conexiones.
     Args:
         user (str): Usuario de la base de datos.
         psw (str): Contraseña del usuario.
@@ -16,35 +33,388 @@ def connect_to_postgresql(user, psw, host, dbname, port):
     Returns:
         sqlalchemy.engine.Engine: Motor de conexión a la base de datos.
     """
-    logging.info("Intentando conectar a la base de datos PostgreSQL...", extra={"phase": "LOAD"})
     conn_str = f"postgresql+psycopg2://{user}:{psw}@{host}:{port}/{dbname}"
+    if conn_str in _ENGINES:
+        return _ENGINES[conn_str]
+    logging.info("Intentando conectar a la base de datos PostgreSQL...", extra={"phase": "LOAD"})
     try:
-        engine = create_engine(conn_str)
+        engine = create_engine(conn_str, pool_pre_ping=True)
         with engine.connect() as conn:
             conn.execute(text("SELECT 1;"))
             logging.info("Conexión exitosa a la base de datos PostgreSQL.", extra={"phase": "LOAD"})
+        _ENGINES[conn_str] = engine
         return engine
     except Exception as e:
         logging.info(f"Error al conectar a la base de datos: {str(e)}", extra={"phase": "LOAD"})
         raise
 
-def read_pokemon_parquet(processed_path, parquet_name):
-    """Lee los datos de Pokémon desde un archivo Parquet.
+def open_pokemon_parquet(processed_path, parquet_name):
+    """Abre el archivo Parquet de Pokémon con memory map para leerlo por lotes.
     Args:
         processed_path (Path): Ruta del archivo Parquet.
     Returns:
-        pd.DataFrame: DataFrame con los datos de Pokémon.
+        pq.ParquetFile: Archivo Parquet abierto.
     """
     try:
-        df_pokemons = pd.read_parquet(processed_path / parquet_name)
-        logging.info("Datos de Pokémon leídos exitosamente desde Parquet.", extra={"phase": "LOAD"})
-        return df_pokemons
+        parquet_file = pq.ParquetFile(processed_path / parquet_name, memory_map=True)
+        logging.info(
+            f"Archivo Parquet abierto: {parquet_file.metadata.num_rows} filas en {parquet_file.num_row_groups} grupos de filas.",
+            extra={"phase": "LOAD"},
+        )
+        return parquet_file
     except Exception as e:
         logging.error(f"Error al leer el archivo Parquet: {str(e)}", extra={"phase": "LOAD"})
         raise
 
-def load_pokemons_to_db(processed_path, parquet_name, db_user, db_password, db_host, db_name, db_port):
+def load_schema(schema, columns=None):
+    """Esquema de la tabla destino: las columnas del Parquet que se cargan, en el orden indicado.
+    Args:
+        schema (pa.Schema): Esquema del Parquet o de la tabla unida.
+        columns (list): Columnas a cargar. None carga todas.
+    Returns:
+        pa.Schema: Esquema de las columnas cargadas.
+    """
+    if columns is None:
+        return schema
+    missing = [name for name in columns if name not in schema.names]
+    if missing:
+        raise ValueError(f"Columnas de carga inexistentes en el Parquet: {missing}")
+    return pa.schema([schema.field(name) for name in columns])
+
+def iter_pokemon_batches(parquet_file, batch_size=10000, columns=None):
+    """Recorre el archivo Parquet de Pokémon por lotes sin cargarlo completo.
+    Solo se decodifican las columnas indicadas; el resto no se lee del archivo.
+    Args:
+        parquet_file (pq.ParquetFile): Archivo Parquet abierto.
+        batch_size (int): Número máximo de filas por lote.
+        columns (list): Columnas a leer. None lee todas.
+    Returns:
+        generator: Lotes pa.RecordBatch.
+    """
+    return parquet_file.iter_batches(batch_size=batch_size, columns=columns, use_pandas_metadata=False)
+
+def quote_ident(name):
+    """Entrecomilla un identificador de PostgreSQL."""
+    return '"' + name.replace('"', '""') + '"'
+
+def pg_type(arrow_type):
+    """Obtiene el tipo de PostgreSQL equivalente a un tipo Arrow.
+    Args:
+        arrow_type (pa.DataType): Tipo Arrow de la columna.
+    Returns:
+        str: Tipo de PostgreSQL.
+    """
+    if pa.types.is_dictionary(arrow_type):
+        arrow_type = arrow_type.value_type
+    if pa.types.is_int16(arrow_type) or pa.types.is_int8(arrow_type):
+        return "smallint"
+    if pa.types.is_int32(arrow_type):
+        return "integer"
+    if pa.types.is_integer(arrow_type):
+        return "bigint"
+    if pa.types.is_floating(arrow_type):
+        return "double precision"
+    if pa.types.is_boolean(arrow_type):
+        return "boolean"
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return "text"
+    raise TypeError(f"Tipo de columna no soportado para la carga: {arrow_type}")
+
+def create_table_sql(table_name, schema):
+    """Genera la sentencia CREATE TABLE de un esquema Arrow."""
+    columns = ", ".join(f"{quote_ident(field.name)} {pg_type(field.type)}" for field in schema)
+    return f"CREATE TABLE {quote_ident(table_name)} ({columns})"
+
+def csv_chunks(batches):
+    """Serializa lotes Arrow en CSV para COPY.
+    Los nulos se escriben como campos vacíos sin comillas y las cadenas van siempre entre
+    comillas, de modo que COPY distingue NULL de la cadena vacía.
+    Returns:
+        generator: Bloques de bytes CSV sin cabecera.
+    """
+    options = pa_csv.WriteOptions(include_header=False)
+    for batch in batches:
+        buffer = io.BytesIO()
+        pa_csv.write_csv(batch, buffer, options)
+        yield buffer.getvalue()
+
+def _binary_encoder(pg_column_type):
+    """Obtiene la función que codifica un valor en el formato binario de COPY."""
+    if pg_column_type == "smallint":
+        return struct.Struct(">ih").pack, 2
+    if pg_column_type == "integer":
+        return struct.Struct(">ii").pack, 4
+    if pg_column_type == "bigint":
+        return struct.Struct(">iq").pack, 8
+    if pg_column_type == "double precision":
+        return struct.Struct(">id").pack, 8
+    if pg_column_type == "boolean":
+        return struct.Struct(">i?").pack, 1
+    return None, None
+
+def binary_chunks(batches, schema):
+    """Serializa lotes Arrow en el formato binario de COPY.
+    Returns:
+        generator: Bloques de bytes, empezando por la cabecera PGCOPY y terminando con el trailer.
+    """
+    encoders = [_binary_encoder(pg_type(field.type)) for field in schema]
+    null = struct.pack(">i", -1)
+    row_header = struct.pack(">h", len(schema))
+    yield _PGCOPY_HEADER
+    for batch in batches:
+        parts = []
+        columns = [column.to_pylist() for column in batch.columns]
+        for row in zip(*columns):
+            parts.append(row_header)
+            for value, (pack, size) in zip(row, encoders):
+                if value is None:
+                    parts.append(null)
+                elif pack is None:
+                    data = value.encode("utf-8")
+                    parts.append(struct.pack(">i", len(data)) + data)
+                else:
+                    parts.append(pack(size, value))
+        yield b"".join(parts)
+    yield _PGCOPY_TRAILER
+
+class ChunkStream(io.RawIOBase):
+    """Archivo de solo lectura sobre un iterador de bloques de bytes.
+    Permite a `copy_expert` consumir los datos en streaming sin materializarlos completos.
+    """
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._chunk = b""
+        self._offset = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            data = self._chunk[self._offset:] + b"".join(self._chunks)
+            self._chunk, self._offset = b"", 0
+            return data
+        while self._offset >= len(self._chunk):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return b""
+            self._chunk, self._offset = chunk, 0
+        data = self._chunk[self._offset:self._offset + size]
+        self._offset += len(data)
+        return data
+
+def copy_into(cursor, table_name, batches, schema, copy_format="csv"):
+    """Copia lotes Arrow a PostgreSQL con COPY ... FROM STDIN en streaming.
+    Args:
+        cursor: Cursor de psycopg2.
+        table_name (str): Tabla de destino, ya creada.
+        batches (iterable): Lotes pa.RecordBatch a copiar.
+        schema (pa.Schema): Esquema de los lotes.
+        copy_format (str): 'csv' o 'binary'.
+    Returns:
+        int: Número de filas copiadas.
+    """
+    if copy_format not in COPY_FORMATS:
+        raise ValueError(f"Formato de COPY no soportado: {copy_format}. Opciones: {COPY_FORMATS}")
+    columns = ", ".join(quote_ident(name) for name in schema.names)
+    if copy_format == "binary":
+        chunks = binary_chunks(batches, schema)
+        options = "FORMAT binary"
+    else:
+        chunks = csv_chunks(batches)
+        options = "FORMAT csv"
+    sql = f"COPY {quote_ident(table_name)} ({columns}) FROM STDIN WITH ({options})"
+    cursor.copy_expert(sql, ChunkStream(chunks))
+    return cursor.rowcount
+
+def swap_load(engine, batches, schema, table_name=TABLE_NAME, copy_format="csv"):
+    """Carga lotes mediante COPY en una tabla de staging y la intercambia con la tabla viva.
+    Todo ocurre en una única transacción: la tabla de staging se crea, se llena con COPY, se
+    indexa (con un índice único sobre `species_id`; `join_tables` garantiza que no se repite) y se analiza, y al final se elimina la
+    tabla anterior y se renombra la de staging.
+    Los lectores siguen viendo la versión anterior completa hasta el COMMIT y el bloqueo
+    exclusivo solo se mantiene durante el intercambio final.
+    Args:
+        engine (sqlalchemy.engine.Engine): Motor de conexión a la base de datos.
+        batches (iterable): Lotes pa.RecordBatch a cargar.
+        schema (pa.Schema): Esquema de los lotes.
+        table_name (str): Nombre de la tabla viva.
+        copy_format (str): 'csv' o 'binary'.
+    Returns:
+        int: Número de filas cargadas.
+    """
+    staging = f"{table_name}__staging"
+    index_columns = [column for column in INDEX_COLUMNS if column in schema.names]
+    with engine.begin() as conn:
+        cursor = conn.connection.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {quote_ident(staging)}")
+        cursor.execute(create_table_sql(staging, schema))
+        rows = copy_into(cursor, staging, batches, schema, copy_format)
+        for column in index_columns:
+            unique = "UNIQUE " if column == ROW_KEY else ""
+            cursor.execute(f"CREATE {unique}INDEX {quote_ident(f'{staging}_{column}_idx')} ON {quote_ident(staging)} ({quote_ident(column)})")
+        cursor.execute(f"ANALYZE {quote_ident(staging)}")
+        cursor.execute(f"DROP TABLE IF EXISTS {quote_ident(table_name)}")
+        cursor.execute(f"ALTER TABLE {quote_ident(staging)} RENAME TO {quote_ident(table_name)}")
+        for column in index_columns:
+            cursor.execute(f"ALTER INDEX {quote_ident(f'{staging}_{column}_idx')} RENAME TO {quote_ident(f'{table_name}_{column}_idx')}")
+    logging.info(f"Se han copiado {rows} filas en {table_name} mediante COPY ({copy_format}).", extra={"phase": "LOAD"})
+    return rows
+
+def with_row_hash(batch):
+    """Añade a un lote la columna `row_hash` con el hash del contenido de cada fila.
+    El hash se calcula de forma vectorizada y determinista con `pd.util.hash_pandas_object`
+    sobre tipos nulables, de modo que no depende de qué filas con nulos caen en cada lote.
+    Args:
+        batch (pa.RecordBatch): Lote de datos a cargar.
+    Returns:
+        pa.RecordBatch: Lote con la columna `row_hash` (int64) al final.
+    """
+    hashes = pd.util.hash_pandas_object(to_pandas(batch), index=False).to_numpy().view("int64")
+    return batch.append_column(HASH_COLUMN, pa.array(hashes, pa.int64()))
+
+def table_columns(cursor, table_name):
+    """Obtiene las columnas de una tabla del esquema actual, o una lista vacía si no existe."""
+    cursor.execute(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = %s ORDER BY ordinal_position",
+        (table_name,),
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+def table_state(engine, table_name=TABLE_NAME):
+    """Estado de la tabla destino para la huella de la carga: OID, columnas y número de filas.
+    El OID cambia con cada intercambio de tablas del modo 'copy' y al recrear la tabla.
+    Args:
+        engine (sqlalchemy.engine.Engine): Motor de conexión a la base de datos.
+        table_name (str): Tabla destino.
+    Returns:
+        dict: Estado de la tabla, o None si no existe.
+    """
+    with engine.connect() as conn:
+        oid = conn.execute(text("SELECT to_regclass(:name)::oid"), {"name": quote_ident(table_name)}).scalar()
+        if oid is None:
+            return None
+        columns = conn.execute(
+            text("SELECT column_name, data_type FROM information_schema.columns "
+                 "WHERE table_schema = current_schema() AND table_name = :name ORDER BY ordinal_position"),
+            {"name": table_name},
+        ).fetchall()
+        rows = conn.execute(text(f"SELECT count(*) FROM {quote_ident(table_name)}")).scalar()
+    return {"oid": oid, "columns": [list(column) for column in columns], "rows": rows}
+
+def _changed_rows(batches, stored, counts, seen):
+    """Filtra de cada lote las filas nuevas o modificadas y actualiza los contadores."""
+    for batch in batches:
+        batch = with_row_hash(batch)
+        keys = batch.column(ROW_KEY).to_pylist()
+        hashes = batch.column(HASH_COLUMN).to_pylist()
+        changed = []
+        for position, (key, digest) in enumerate(zip(keys, hashes)):
+            seen.add(key)
+            previous = stored.get(key)
+            if previous == digest:
+                counts["unchanged"] += 1
+                continue
+            counts["inserted" if previous is None else "updated"] += 1
+            changed.append(position)
+        if changed:
+            yield batch.take(pa.array(changed, pa.int64()))
+
+def upsert_load(engine, batches, schema, table_name=TABLE_NAME, copy_format="csv"):
+    """Aplica solo los cambios de unos lotes frente a la tabla viva.
+    Compara el hash de cada fila, identificada por `species_id`, con el hash guardado en la
+    base de datos y escribe únicamente las filas nuevas o modificadas (COPY a una tabla
+    temporal e `INSERT ... ON CONFLICT DO UPDATE`) y borra las filas que ya no existen, en una
+    única transacción. Si la tabla viva no existe o sus columnas no coinciden, se hace una
+    carga completa con `swap_load`.
+    Args:
+        engine (sqlalchemy.engine.Engine): Motor de conexión a la base de datos.
+        batches (iterable): Lotes pa.RecordBatch a cargar.
+        schema (pa.Schema): Esquema de los lotes.
+        table_name (str): Nombre de la tabla viva.
+        copy_format (str): 'csv' o 'binary'.
+    Returns:
+        dict: Número de filas insertadas, actualizadas, eliminadas y sin cambios.
+    """
+    schema = schema.append(pa.field(HASH_COLUMN, pa.int64()))
+    counts = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    with engine.begin() as conn:
+        cursor = conn.connection.cursor()
+        full_load = table_columns(cursor, table_name) != schema.names
+        if not full_load:
+            cursor.execute(f"SELECT {quote_ident(ROW_KEY)}, {quote_ident(HASH_COLUMN)} FROM {quote_ident(table_name)}")
+            stored = dict(cursor.fetchall())
+            seen = set()
+            temp = f"{table_name}__changes"
+            names = ", ".join(quote_ident(name) for name in schema.names)
+            updates = ", ".join(f"{quote_ident(name)} = EXCLUDED.{quote_ident(name)}" for name in schema.names if name != ROW_KEY)
+            cursor.execute(f"CREATE TEMP TABLE {quote_ident(temp)} (LIKE {quote_ident(table_name)}) ON COMMIT DROP")
+            copy_into(cursor, temp, _changed_rows(batches, stored, counts, seen), schema, copy_format)
+            if counts["inserted"] or counts["updated"]:
+                cursor.execute(
+                    f"INSERT INTO {quote_ident(table_name)} ({names}) SELECT {names} FROM {quote_ident(temp)} "
+                    f"ON CONFLICT ({quote_ident(ROW_KEY)}) DO UPDATE SET {updates}"
+                )
+            deleted = list(stored.keys() - seen)
+            if deleted:
+                cursor.execute(f"DELETE FROM {quote_ident(table_name)} WHERE {quote_ident(ROW_KEY)} = ANY(%s)", (deleted,))
+            counts["deleted"] = len(deleted)
+    if full_load:
+        logging.info(f"La tabla {table_name} no existe o su esquema cambió; se realiza una carga completa.", extra={"phase": "LOAD"})
+        counts["inserted"] = swap_load(engine, map(with_row_hash, batches), schema, table_name, copy_format)
+    logging.info(
+        f"Carga incremental en {table_name}: {counts['inserted']} insertadas, {counts['updated']} actualizadas, "
+        f"{counts['deleted']} eliminadas, {counts['unchanged']} sin cambios.",
+        extra={"phase": "LOAD"},
+    )
+    return counts
+
+def replace_load(engine, batches, schema, table_name=TABLE_NAME):
+    """Reemplaza la tabla con `to_sql`, lote a lote, en una única transacción."""
+    rows = 0
+    with engine.begin() as conn:
+        for batch in batches:
+            to_pandas(batch).to_sql(table_name, conn, if_exists="replace" if rows == 0 else "append", index=False)
+            rows += batch.num_rows
+        if rows == 0:
+            to_pandas(schema.empty_table()).to_sql(table_name, conn, if_exists="replace", index=False)
+    return rows
+
+def load_batches(engine, batches, schema, load_mode="replace", copy_format="csv", table_name=TABLE_NAME):
+    """Carga un flujo de lotes Arrow en PostgreSQL con el modo indicado.
+    Args:
+        engine (sqlalchemy.engine.Engine): Motor de conexión.
+        batches (iterable): Lotes Arrow con el esquema `schema`.
+        schema (pa.Schema): Esquema de la tabla.
+        load_mode (str): 'replace' (to_sql), 'copy' (COPY a staging e intercambio atómico) o
+            'upsert' (solo filas nuevas, modificadas o eliminadas).
+        copy_format (str): Formato de COPY en los modos 'copy' y 'upsert': 'csv' o 'binary'.
+        table_name (str): Tabla de destino.
+    Returns:
+        dict: En el modo 'upsert', número de filas insertadas, actualizadas, eliminadas y sin cambios.
+    """
+    if load_mode not in LOAD_MODES:
+        raise ValueError(f"Modo de carga no soportado: {load_mode}. Opciones: {LOAD_MODES}")
+    counts = None
+    if load_mode == "upsert":
+        counts = upsert_load(engine, batches, schema, table_name, copy_format)
+        rows = counts["inserted"] + counts["updated"] + counts["unchanged"]
+        for action, value in counts.items():
+            METRICS.inc("load_rows_total", value, action=action)
+    elif load_mode == "copy":
+        rows = swap_load(engine, batches, schema, table_name, copy_format)
+    else:
+        rows = replace_load(engine, batches, schema, table_name)
+    METRICS.add_rows("LOAD", rows)
+    logging.info("Datos de Pokémon cargados exitosamente en la base de datos.", extra={"phase": "LOAD"})
+    return counts
+
+def load_pokemons_to_db(processed_path, parquet_name, db_user, db_password, db_host, db_name, db_port, load_mode="replace",
+                        copy_format="csv", batch_size=10000, columns=None):
     """Carga los datos de Pokémon desde un archivo Parquet a la base de datos PostgreSQL.
+    El archivo se lee por lotes con memory map y cada lote se escribe por la misma conexión
+    del pool, de modo que la memoria máxima depende de `batch_size` y no del tamaño del archivo.
     Args:
         processed_path (Path): Ruta del archivo Parquet con los datos de Pokémon.
         db_user (str): Usuario de la base de datos.
@@ -52,16 +422,22 @@ def load_pokemons_to_db(processed_path, parquet_name, db_user, db_password, db_h
         db_host (str): Host de la base de datos.
         db_name (str): Nombre de la base de datos.
         db_port (int): Puerto de conexión a la base de datos.
+        load_mode (str): 'replace' (to_sql), 'copy' (COPY a staging e intercambio atómico) o
+            'upsert' (solo filas nuevas, modificadas o eliminadas).
+        copy_format (str): Formato de COPY en los modos 'copy' y 'upsert': 'csv' o 'binary'.
+        batch_size (int): Número máximo de filas por lote leído del Parquet.
+        columns (list): Columnas de la tabla destino; solo estas se leen del Parquet. None carga todas.
     Returns:
-        None
+        dict: En el modo 'upsert', número de filas insertadas, actualizadas, eliminadas y sin cambios.
     """
-    df_pokemons = read_pokemon_parquet(processed_path, parquet_name)
+    if load_mode not in LOAD_MODES:
+        raise ValueError(f"Modo de carga no soportado: {load_mode}. Opciones: {LOAD_MODES}")
+    parquet_file = open_pokemon_parquet(processed_path, parquet_name)
+    schema = load_schema(parquet_file.schema_arrow, columns)
+    batches = iter_pokemon_batches(parquet_file, batch_size, schema.names)
     engine = connect_to_postgresql(db_user, db_password, db_host, db_name, db_port)
     try:
-        with engine.connect() as conn:
-            df_pokemons.to_sql('pokemons', conn, if_exists='replace', index=False)
-            logging.info("Datos de Pokémon cargados exitosamente en la base de datos.", extra={"phase": "LOAD"})
+        return load_batches(engine, batches, schema, load_mode, copy_format, TABLE_NAME)
     except Exception as e:
         logging.error(f"Error al cargar los datos de Pokémon en la base de datos: {str(e)}", extra={"phase": "LOAD"})
         raise
-    
\ No newline at end of file
@@ -0,0 +1,111 @@
+import os
+import json
+import hashlib
+import logging
+from pathlib import Path
+
+
+def resource_id(url):
+    """Obtiene el identificador de un recurso a partir de su URL.
+    Args:
+        url (str): URL del recurso, por ejemplo https://pokeapi.co/api/v2/pokemon/25/.
+    Returns:
+        str: Identificador del recurso.
+    """
+    return url.rstrip("/").rsplit("/", 1)[-1]
+
+
+def content_hash(record):
+    """Calcula el hash SHA-256 del contenido canónico de un registro JSON."""
+    payload = json.dumps(record, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ExtractManifest:
+    """Manifiesto de los recursos ya extraídos.
+    Registra, por cada página de Pokémon y por cada generación de especies, los
+    identificadores descargados y el hash del contenido de cada recurso. Permite que un
+    reintento descargue solo las unidades faltantes o nuevas. El avance vale para una sola
+    ejecución: al terminar con éxito (o al forzar una ejecución completa) se descarta con
+    `reset_progress`, de modo que la siguiente vuelve a consultar todas las páginas a través
+    de la caché HTTP; los hashes de los recursos se conservan para contar los cambios.
+    Args:
+        path (Path): Ruta del archivo JSON del manifiesto.
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        self.data = self._load()
+        self.changed = 0
+
+    def _load(self) -> dict:
+        """Carga el manifiesto si existe; en caso contrario, crea uno vacío."""
+        empty = {"pokemon": {"pages": {}, "resources": {}}, "species": {"generations": {}, "resources": {}}}
+        if not self.path.exists():
+            return empty
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            logging.error(f"Manifiesto corrupto, se ignora: {self.path}", extra={"phase": "EXTRACT"})
+            return empty
+
+    def save(self) -> None:
+        """Guarda el manifiesto de forma atómica."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f)
+        os.replace(tmp_path, self.path)
+
+    def _record_resources(self, section, records) -> None:
+        """Registra el hash de cada recurso y cuenta los nuevos o modificados."""
+        resources = self.data[section]["resources"]
+        for record in records:
+            key = str(record["id"])
+            digest = content_hash(record)
+            if resources.get(key) != digest:
+                self.changed += 1
+            resources[key] = digest
+
+    def page_complete(self, page, urls, file_exists) -> bool:
+        """Indica si una página ya fue descargada con los mismos recursos y su archivo existe."""
+        entry = self.data["pokemon"]["pages"].get(str(page))
+        return bool(entry) and file_exists and entry["ids"] == [resource_id(url) for url in urls]
+
+    def record_page(self, page, urls, records) -> None:
+        """Registra una página de Pokémon completada y guarda el manifiesto."""
+        self._record_resources("pokemon", records)
+        self.data["pokemon"]["pages"][str(page)] = {"ids": [resource_id(url) for url in urls]}
+        self.save()
+
+    def drop_pages_after(self, last_page) -> list:
+        """Elimina del manifiesto las páginas posteriores a `last_page`.
+        Returns:
+            list: Números de las páginas eliminadas.
+        """
+        pages = self.data["pokemon"]["pages"]
+        stale = [int(page) for page in pages if int(page) > last_page]
+        for page in stale:
+            del pages[str(page)]
+        if stale:
+            self.save()
+        return stale
+
+    def generation_complete(self, name, urls, file_exists) -> bool:
+        """Indica si una generación ya fue descargada con las mismas especies y su archivo existe."""
+        entry = self.data["species"]["generations"].get(name)
+        return bool(entry) and file_exists and entry["ids"] == [resource_id(url) for url in urls]
+
+    def record_generation(self, name, urls, records) -> None:
+        """Registra una generación completada y guarda el manifiesto."""
+        self._record_resources("species", records)
+        self.data["species"]["generations"][name] = {"ids": [resource_id(url) for url in urls]}
+        self.save()
+
+    def reset_progress(self) -> None:
+        """Olvida las páginas y generaciones completadas y guarda el manifiesto.
+        Los hashes de los recursos se conservan para seguir contando los nuevos o modificados.
+        """
+        self.data["pokemon"]["pages"] = {}
+        self.data["species"]["generations"] = {}
+        self.save()
@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import resource
+import threading
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PREFIX = "pokemon_etl"
+DESCRIPTIONS = {
+    "phase_wall_seconds": "Tiempo real de la fase en segundos.",
+    "phase_cpu_seconds": "Tiempo de CPU de la fase en segundos, incluidos los procesos hijos.",
+    "phase_peak_rss_bytes": "Memoria residente máxima del proceso al terminar la fase.",
+    "phase_rows_per_second": "Filas procesadas por segundo en la fase.",
+    "rows_total": "Filas procesadas por fase.",
+    "http_requests_total": "Solicitudes HTTP por código de estado.",
+    "http_response_bytes_total": "Bytes recibidos en las respuestas HTTP.",
+    "http_request_duration_seconds": "Latencia de las solicitudes HTTP.",
+    "cache_hits_total": "Respuestas servidas desde la caché sin acceder a la red.",
+    "stage_skipped": "1 si la etapa se omitió porque su huella no cambió.",
+}
+
+
+def _labels_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class Histogram:
+    """Histograma acumulativo con cubetas fijas, al estilo de Prometheus."""
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[position] += 1
+                break
+
+    def cumulative(self):
+        """Cuenta acumulada por cubeta, como espera Prometheus."""
+        total, result = 0, []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+
+class Metrics:
+    """Registro de métricas de una ejecución del ETL.
+    Acumula contadores, gauges e histogramas con etiquetas y mide cada fase (tiempo real,
+    tiempo de CPU, memoria máxima y filas por segundo). Se exporta como informe JSON y como
+    archivo de texto para el textfile collector de Prometheus.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Descarta todas las métricas registradas."""
+        with self._lock:
+            self.started_at = datetime.now().isoformat(timespec="seconds")
+            self.counters = {}
+            self.gauges = {}
+            self.histograms = {}
+            self.phases = {}
+
+    def inc(self, name, value=1, **labels):
+        """Incrementa un contador."""
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        """Fija el valor de un gauge."""
+        with self._lock:
+            self.gauges[(name, _labels_key(labels))] = value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        """Registra una observación en un histograma."""
+        key = (name, _labels_key(labels))
+        with self._lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram(buckets)
+            self.histograms[key].observe(value)
+
+    def add_rows(self, phase, rows):
+        """Suma filas procesadas a una fase."""
+        self.inc("rows_total", rows, phase=phase)
+
+    def observe_request(self, status, size, latency):
+        """Registra una solicitud HTTP: código de estado, bytes recibidos y latencia."""
+        self.inc("http_requests_total", status=status)
+        self.inc("http_response_bytes_total", size)
+        self.observe("http_request_duration_seconds", latency)
+
+    @contextmanager
+    def phase(self, name):
+        """Mide una fase del ETL: tiempo real, CPU (incluidos los procesos hijos) y memoria máxima."""
+        start_wall = time.perf_counter()
+        start_cpu = _cpu_seconds()
+        try:
+            yield self
+        finally:
+            wall = time.perf_counter() - start_wall
+            with self._lock:
+                self.phases[name] = {
+                    "wall_seconds": round(wall, 6),
+                    "cpu_seconds": round(_cpu_seconds() - start_cpu, 6),
+                    "peak_rss_bytes": _peak_rss_bytes(),
+                }
+
+    def snapshot(self):
+        """Devuelve las métricas como un diccionario serializable en JSON."""
+        with self._lock:
+            rows = {dict(key).get("phase"): value for (name, key), value in self.counters.items() if name == "rows_total"}
+            phases = {}
+            for name, values in self.phases.items():
+                phase = dict(values)
+                if name in rows:
+                    phase["rows"] = rows[name]
+                    phase["rows_per_second"] = round(rows[name] / values["wall_seconds"], 3) if values["wall_seconds"] else None
+                phases[name] = phase
+            return {
+                "started_at": self.started_at,
+                "phases": phases,
+                "counters": [{"name": name, "labels": dict(key), "value": value} for (name, key), value in self.counters.items()],
+                "gauges": [{"name": name, "labels": dict(key), "value": value} for (name, key), value in self.gauges.items()],
+                "histograms": [
+                    {"name": name, "labels": dict(key), "buckets": list(h.buckets), "counts": h.counts, "sum": h.sum, "count": h.count}
+                    for (name, key), h in self.histograms.items()
+                ],
+            }
+
+    def to_prometheus(self):
+        """Genera las métricas en el formato de texto de Prometheus."""
+        snapshot = self.snapshot()
+        lines = []
+
+        def header(name, kind):
+            full = f"{PREFIX}_{name}"
+            if name in DESCRIPTIONS:
+                lines.append(f"# HELP {full} {DESCRIPTIONS[name]}")
+            lines.append(f"# TYPE {full} {kind}")
+            return full
+
+        for metric in ("wall_seconds", "cpu_seconds", "peak_rss_bytes", "rows_per_second"):
+            values = [(phase, data[metric]) for phase, data in snapshot["phases"].items() if data.get(metric) is not None]
+            if values:
+                full = header(f"phase_{metric}", "gauge")
+                lines += [f'{full}{{phase="{phase}"}} {value}' for phase, value in values]
+        with self._lock:
+            counters, gauges, histograms = dict(self.counters), dict(self.gauges), dict(self.histograms)
+        for kind, items in (("counter", counters), ("gauge", gauges)):
+            for name in sorted({name for name, _ in items}):
+                full = header(name, kind)
+                lines += [f"{full}{_format_labels(key)} {value}" for (other, key), value in items.items() if other == name]
+        for name in sorted({name for name, _ in histograms}):
+            full = header(name, "histogram")
+            for (other, key), histogram in histograms.items():
+                if other != name:
+                    continue
+                for bound, count in zip(histogram.buckets, histogram.cumulative()):
+                    lines.append(f"{full}_bucket{_format_labels(key, [('le', bound)])} {count}")
+                lines.append(f"{full}_bucket{_format_labels(key, [('le', '+Inf')])} {histogram.count}")
+                lines.append(f"{full}_sum{_format_labels(key)} {histogram.sum}")
+                lines.append(f"{full}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, report_path=None, textfile_path=None):
+        """Escribe el informe JSON y el archivo de Prometheus de forma atómica.
+        Args:
+            report_path (Path): Ruta del informe JSON. None no lo escribe.
+            textfile_path (Path): Ruta del archivo .prom. None no lo escribe.
+        """
+        for path, content in ((report_path, lambda: json.dumps(self.snapshot(), indent=2)), (textfile_path, self.to_prometheus)):
+            if not path:
+                continue
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content())
+            os.replace(tmp_path, path)
+
+
+def _cpu_seconds():
+    """Tiempo de CPU de usuario y sistema del proceso y de sus hijos ya terminados."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def _peak_rss_bytes():
+    """Memoria residente máxima del proceso o de sus hijos, en bytes (Linux informa en KiB)."""
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak * 1024
+
+
+def task_path(path, task):
+    """Ruta de un informe para una tarea concreta, por ejemplo run_report_extract.json."""
+    if not path:
+        return None
+    path = Path(path)
+    return path.with_name(f"{path.stem}_{task}{path.suffix}")
+
+
+METRICS = Metrics()
@@ -0,0 +1,417 @@
+import queue
+import asyncio
+import logging
+import threading
+from pokemon_etl.extract import ExtractionEngine, get_pokemon_gens, get_pokemon_list, get_url_data, raise_failures
+from pokemon_etl.raw_store import RawStore
+from pokemon_etl.metrics import METRICS
+from pokemon_etl.sinks import DEFAULT_OUTPUTS, build_sinks
+from pokemon_etl.load import TABLE_NAME, load_batches, load_schema
+from pokemon_etl.transform import build_batches, joined_schema
+from pokemon_etl.fields import POKEMON_FIELDS, SPECIES_FIELDS, compile_fields, fields_schema
+
+PIPELINE_MODES = ("staged", "fused")
+# Lotes Arrow en cola por consumidor (salidas y base de datos).
+BATCH_QUEUE_SIZE = 8
+
+
+class PipelineAborted(RuntimeError):
+    """Otra etapa del pipeline falló y el flujo se interrumpió."""
+
+
+class _Closed:
+    """Marca el final de una cola; `error` indica que el productor falló."""
+    def __init__(self, error=None):
+        self.error = error
+
+
+class StageQueue:
+    """Cola acotada entre etapas del pipeline.
+    El productor llama a `put` y al terminar a `close`; el consumidor la recorre como un
+    iterable. Si el consumidor falla llama a `abandon`: la cola se vacía y descarta lo que
+    llegue después, de modo que el productor nunca queda bloqueado.
+    Args:
+        maxsize (int): Elementos máximos en la cola.
+    """
+    def __init__(self, maxsize):
+        self._queue = queue.Queue(maxsize)
+        self.abandoned = False
+
+    def put(self, item):
+        if not self.abandoned:
+            self._queue.put(item)
+
+    def put_nowait(self, item):
+        """Encola sin esperar. Lanza `queue.Full` si la cola está llena."""
+        if not self.abandoned:
+            self._queue.put_nowait(item)
+
+    def close(self, error=None):
+        """Termina el flujo; con `error` el consumidor recibe `PipelineAborted`."""
+        self.put(_Closed(error))
+
+    def abandon(self):
+        """El consumidor deja de leer: se descartan los elementos pendientes y futuros."""
+        self.abandoned = True
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if isinstance(item, _Closed):
+                if item.error is not None:
+                    raise PipelineAborted("El pipeline se interrumpió por un error en otra etapa.") from item.error
+                return
+            yield item
+
+
+class StreamingJoin:
+    """Hash join incremental de Pokémon y especies (left outer join sobre `species_id` = `pokemon_id`).
+    Emite cada fila unida en cuanto llegan sus dos lados, en el orden en que se completan.
+    Los Pokémon se guardan indexados por id; las especies cuyo Pokémon aún no ha llegado
+    esperan hasta que llegue o hasta `finish`, donde se emiten con las columnas de Pokémon
+    nulas. Igual que `join_tables`, un `pokemon_id` o un `species_id` repetido usa su primera
+    aparición.
+    Args:
+        pokemon_fields (list): Especificación de campos de Pokémon.
+        species_fields (list): Especificación de campos de especies.
+    """
+    def __init__(self, pokemon_fields, species_fields):
+        self.schema = joined_schema(pokemon_fields, species_fields)
+        left, right = fields_schema(pokemon_fields).names, fields_schema(species_fields).names
+        self._left = list(zip(left, self.schema.names[:len(left)]))
+        self._right = list(zip(right, self.schema.names[len(left):]))
+        self._pokemons = {}
+        self._pending = {}
+        self._matched = set()
+        self._species = set()
+        self.duplicated = 0
+        self.duplicated_species = 0
+        self.species_without_pokemon = 0
+
+    def _join(self, pokemon, species):
+        row = {joined: pokemon[name] if pokemon else None for name, joined in self._left}
+        row.update((joined, species[name]) for name, joined in self._right)
+        return row
+
+    def add_pokemon(self, row):
+        """Registra un Pokémon y devuelve las filas de las especies que lo esperaban."""
+        key = row["pokemon_id"]
+        if key is None:
+            return []
+        if key in self._pokemons:
+            self.duplicated += 1
+            return []
+        self._pokemons[key] = row
+        waiting = self._pending.pop(key, [])
+        if waiting:
+            self._matched.add(key)
+        return [self._join(row, species) for species in waiting]
+
+    def add_species(self, row):
+        """Registra una especie y devuelve su fila unida si su Pokémon ya llegó."""
+        key = row["species_id"]
+        if key is not None:
+            if key in self._species:
+                self.duplicated_species += 1
+                return []
+            self._species.add(key)
+        pokemon = self._pokemons.get(key)
+        if pokemon is None:
+            self._pending.setdefault(key, []).append(row)
+            return []
+        self._matched.add(key)
+        return [self._join(pokemon, row)]
+
+    def finish(self):
+        """Emite las especies sin Pokémon al terminar el flujo."""
+        rows = [self._join(None, species) for waiting in self._pending.values() for species in waiting]
+        self._pending = {}
+        self.species_without_pokemon += len(rows)
+        return rows
+
+    def quality(self, rows):
+        """Filas emitidas y claves sin pareja de cada lado, como en `join_tables`."""
+        return {
+            "rows": rows,
+            "species_without_pokemon": self.species_without_pokemon,
+            "pokemon_without_species": len(self._pokemons) - len(self._matched),
+        }
+
+
+def join_records(records, join, pokemon_extractor, species_extractor):
+    """Aplica los extractores compilados a los registros crudos y los une en streaming.
+    Args:
+        records (iterable): Tuplas (tipo, registro) con tipo 'pokemon' o 'species'.
+        join (StreamingJoin): Unión incremental.
+        pokemon_extractor (callable): Extractor compilado de Pokémon.
+        species_extractor (callable): Extractor compilado de especies.
+    Returns:
+        generator: Filas unidas como diccionarios con las columnas de `join.schema`.
+    """
+    handlers = {"pokemon": (pokemon_extractor, join.add_pokemon), "species": (species_extractor, join.add_species)}
+    for kind, record in records:
+        extractor, add = handlers[kind]
+        row = extractor(record)
+        if row is None:
+            logging.error("Error al procesar el registro: El objeto no es un diccionario.", extra={"phase": "TRANSFORM"})
+            continue
+        yield from add(row)
+    yield from join.finish()
+
+
+def _row(row):
+    return row
+
+
+async def _fetch_and_emit(engine, url, kind, emit, keep):
+    """Descarga un recurso y lo envía a la transformación en cuanto llega."""
+    record = await get_url_data(engine, url)
+    await emit((kind, record))
+    return record if keep else None
+
+
+async def _stream_generation(engine, generation, emit, store=None):
+    menu = await get_url_data(engine, generation["url"])
+    urls = [species["url"] for species in menu["pokemon_species"]]
+    records = await asyncio.gather(*(_fetch_and_emit(engine, url, "species", emit, store is not None) for url in urls))
+    if store is not None:
+        await asyncio.to_thread(store.write, generation["nombre"], records)
+    logging.info(f"Generación {generation['nombre']} descargada ({len(records)} especies).", extra={"phase": "EXTRACT"})
+
+
+async def _stream_page(engine, page, urls, emit, store=None):
+    records = await asyncio.gather(*(_fetch_and_emit(engine, url, "pokemon", emit, store is not None) for url in urls))
+    if store is not None:
+        await asyncio.to_thread(store.write, f"pokemon_page_{page}", records)
+    logging.info(f"Lote {page} descargado ({len(records)} Pokémon).", extra={"phase": "EXTRACT"})
+
+
+async def stream_species(engine, base_url, generation_list, emit, store=None):
+    """Descarga las especies de las generaciones indicadas y las emite una a una.
+    Args:
+        engine (ExtractionEngine): Motor de extracción.
+        base_url (str): URL base de la API.
+        generation_list (list): Lista de generaciones a obtener.
+        emit (coroutine function): Recibe cada tupla ('species', registro).
+        store (RawStore): Almacén crudo donde archivar cada generación. None no archiva.
+    Returns:
+        None
+    """
+    generations = await get_pokemon_gens(engine, base_url, generation_list)
+    results = await asyncio.gather(*(_stream_generation(engine, generation, emit, store) for generation in generations), return_exceptions=True)
+    raise_failures(results, "generaciones")
+
+
+async def stream_pokemons(engine, base_url, emit, page_size=50, store=None):
+    """Descarga todos los Pokémon y los emite uno a uno.
+    Args:
+        engine (ExtractionEngine): Motor de extracción.
+        base_url (str): URL base de la API.
+        emit (coroutine function): Recibe cada tupla ('pokemon', registro).
+        page_size (int): Número de Pokémon por archivo archivado.
+        store (RawStore): Almacén crudo donde archivar cada página. None no archiva.
+    Returns:
+        None
+    """
+    urls = await get_pokemon_list(engine, base_url)
+    pages = {i // page_size + 1: urls[i:i + page_size] for i in range(0, len(urls), page_size)}
+    results = await asyncio.gather(*(_stream_page(engine, page, page_urls, emit, store) for page, page_urls in pages.items()), return_exceptions=True)
+    raise_failures(results, "páginas de Pokémon")
+
+
+async def stream_extract(records, base_url, generation_list, concurrency=50, page_size=50, cache=None, throttle=None,
+                         raw_species_path=None, raw_pokemon_path=None, raw_format="ndjson", compression="gzip"):
+    """Extrae especies y Pokémon y envía cada registro a la cola `records` mientras descarga.
+    Si la cola está llena la espera se hace en un hilo, sin bloquear el event loop.
+    Args:
+        records (StageQueue): Cola hacia la transformación.
+        base_url (str): URL base de la API.
+        generation_list (list): Lista de generaciones a obtener.
+        concurrency (int): Número de solicitudes simultáneas.
+        page_size (int): Número de Pokémon por archivo archivado.
+        cache (ResponseCache): Caché de respuestas HTTP opcional.
+        throttle (Throttle): Control de tasa, concurrencia y reintentos.
+        raw_species_path (Path): Ruta donde archivar las especies crudas. None no archiva.
+        raw_pokemon_path (Path): Ruta donde archivar los Pokémon crudos. None no archiva.
+        raw_format (str): Formato de los archivos crudos ('ndjson' o 'json').
+        compression (str): Compresión de los archivos NDJSON ('gzip', 'zstd' o 'none').
+    Returns:
+        int: Registros extraídos.
+    """
+    count = 0
+
+    async def emit(item):
+        nonlocal count
+        if records.abandoned:
+            raise PipelineAborted("La transformación se detuvo; se cancela la extracción.")
+        try:
+            records.put_nowait(item)
+        except queue.Full:
+            await asyncio.to_thread(records.put, item)
+        count += 1
+
+    species_store = RawStore(raw_species_path, raw_format, compression) if raw_species_path else None
+    pokemon_store = RawStore(raw_pokemon_path, raw_format, compression) if raw_pokemon_path else None
+    async with ExtractionEngine(concurrency, cache=cache, throttle=throttle) as engine:
+        results = await asyncio.gather(
+            stream_species(engine, base_url, generation_list, emit, species_store),
+            stream_pokemons(engine, base_url, emit, page_size, pokemon_store),
+            return_exceptions=True,
+        )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return count
+
+
+def _until_failed(records, failed):
+    """Recorre la cola de registros y se interrumpe si otra etapa falló."""
+    for item in records:
+        if failed.is_set():
+            raise PipelineAborted("Una salida falló; se interrumpe la transformación.")
+        yield item
+
+
+def _transform_stage(records, join, pokemon_fields, species_fields, batch_size, outputs, state):
+    """Hilo de transformación: extractores, unión y lotes Arrow hacia cada consumidor."""
+    rows = 0
+    try:
+        joined = join_records(_until_failed(records, state["failed"]), join, compile_fields(pokemon_fields), compile_fields(species_fields))
+        for batch in build_batches(joined, _row, join.schema, batch_size):
+            rows += batch.num_rows
+            for output in outputs:
+                output.put(batch)
+    except BaseException as e:
+        if not isinstance(e, PipelineAborted):
+            state["errors"].append(("TRANSFORM", e))
+        state["failed"].set()
+        records.abandon()
+        for output in outputs:
+            output.close(e)
+        return
+    state["rows"] = rows
+    for output in outputs:
+        output.close()
+
+
+def _consumer_stage(name, consume, stream, state):
+    """Hilo consumidor: una salida o la carga en la base de datos."""
+    try:
+        state["results"][name] = consume(stream)
+    except BaseException as e:
+        if not isinstance(e, PipelineAborted):
+            state["errors"].append((name, e))
+        state["failed"].set()
+        stream.abandon()
+
+
+def run_pipeline(base_url, generations, processed_path, parquet_name, csv_name, concurrency=50, page_size=50, cache=None, throttle=None,
+                 batch_size=1000, extra_fields=None, outputs=DEFAULT_OUTPUTS, feather_name=None, dataset_name=None, row_group_size=None,
+                 partition_by=None, write_metadata=True, engine=None, load_mode="copy", copy_format="csv",
+                 raw_species_path=None, raw_pokemon_path=None, raw_format="ndjson", compression="gzip", queue_size=1000,
+                 load_columns=None):
+    """Ejecuta extracción, transformación y carga solapadas en un único flujo.
+    Los registros descargados pasan por una cola acotada a un hilo que aplica los extractores
+    compilados, los une en streaming y los agrupa en lotes Arrow; cada lote se reparte a la
+    vez entre las salidas y la base de datos, cada una en su propio hilo, mientras siguen las
+    descargas. La espera de red y el trabajo de CPU se solapan y el tiempo total se acerca al
+    de la etapa más lenta. Las colas acotadas limitan la memoria y frenan la descarga si la
+    transformación o la carga se quedan atrás.
+    A diferencia del modo por etapas, las filas salen en el orden en que se completan sus dos
+    lados y no en el de las especies. Si una etapa falla las demás se interrumpen: las salidas
+    no reemplazan los archivos anteriores y la carga no confirma su transacción.
+    Args:
+        base_url (str): URL base de la API.
+        generations (list): Lista de generaciones a obtener.
+        processed_path (Path): Directorio de las salidas.
+        parquet_name (str): Nombre del archivo Parquet.
+        csv_name (str): Nombre del archivo CSV.
+        concurrency (int): Número de solicitudes simultáneas.
+        page_size (int): Número de Pokémon por archivo archivado.
+        cache (ResponseCache): Caché de respuestas HTTP opcional.
+        throttle (Throttle): Control de tasa, concurrencia y reintentos.
+        batch_size (int): Número máximo de filas por lote Arrow.
+        extra_fields (dict): Columnas adicionales por recurso ('pokemon', 'species').
+        outputs (list): Salidas habilitadas: 'parquet', 'csv', 'feather' y/o 'dataset'.
+        feather_name (str): Nombre del archivo Feather.
+        dataset_name (str): Directorio del dataset particionado.
+        row_group_size (int): Máximo de filas por grupo de filas Parquet.
+        partition_by (list): Columnas de partición del dataset.
+        write_metadata (bool): Escribe el resumen `_metadata` del dataset.
+        engine (sqlalchemy.engine.Engine): Motor de PostgreSQL. None no carga en la base de datos.
+        load_mode (str): Modo de carga ('replace', 'copy' o 'upsert').
+        copy_format (str): Formato de COPY: 'csv' o 'binary'.
+        raw_species_path (Path): Ruta donde archivar las especies crudas. None no archiva.
+        raw_pokemon_path (Path): Ruta donde archivar los Pokémon crudos. None no archiva.
+        raw_format (str): Formato de los archivos crudos archivados.
+        compression (str): Compresión de los archivos crudos archivados.
+        queue_size (int): Registros crudos máximos en espera de transformarse.
+        load_columns (list): Columnas de la tabla destino. None carga todas.
+    Returns:
+        dict: Filas de la tabla unida y claves sin pareja de cada lado.
+    """
+    extra_fields = extra_fields or {}
+    species_fields = SPECIES_FIELDS + extra_fields.get("species", [])
+    pokemon_fields = POKEMON_FIELDS + extra_fields.get("pokemon", [])
+    join = StreamingJoin(pokemon_fields, species_fields)
+    schema = join.schema
+    consumers = {
+        sink.kind: (lambda stream, sink=sink: sink.write_stream(stream, schema))
+        for sink in build_sinks(processed_path, outputs, parquet_name, csv_name, feather_name, dataset_name, row_group_size, partition_by, write_metadata)
+    }
+    if engine is not None:
+        table_schema = load_schema(schema, load_columns)
+        consumers["postgresql"] = lambda stream: load_batches(
+            engine, (batch.select(table_schema.names) for batch in stream), table_schema, load_mode, copy_format, TABLE_NAME
+        )
+
+    state = {"errors": [], "results": {}, "rows": 0, "failed": threading.Event()}
+    records = StageQueue(queue_size)
+    streams = {name: StageQueue(BATCH_QUEUE_SIZE) for name in consumers}
+    threads = [threading.Thread(target=_transform_stage, name="pipeline-transform",
+                                args=(records, join, pokemon_fields, species_fields, batch_size, list(streams.values()), state))]
+    threads += [threading.Thread(target=_consumer_stage, name=f"pipeline-{name}", args=(name, consume, streams[name], state))
+                for name, consume in consumers.items()]
+    for thread in threads:
+        thread.start()
+    logging.info(f"Pipeline en streaming iniciado: salidas {list(consumers)}.", extra={"phase": "ETL"})
+    extracted, error = 0, None
+    try:
+        extracted = asyncio.run(stream_extract(records, base_url, generations, concurrency, page_size, cache, throttle,
+                                               raw_species_path, raw_pokemon_path, raw_format, compression))
+    except BaseException as e:
+        error = e
+    if error is not None:
+        state["failed"].set()
+    records.close(error)
+    for thread in threads:
+        thread.join()
+    if state["errors"]:
+        stage, stage_error = state["errors"][0]
+        logging.error(f"Falló la etapa {stage} del pipeline: {stage_error!r}", extra={"phase": "ETL"})
+        raise stage_error
+    if error is not None:
+        raise error
+
+    quality = join.quality(state["rows"])
+    if join.duplicated:
+        logging.warning(f"Hay {join.duplicated} pokemon_id repetidos; se usa la primera aparición.", extra={"phase": "TRANSFORM"})
+    if join.duplicated_species:
+        logging.warning(f"Hay {join.duplicated_species} species_id repetidos; se usa la primera aparición.", extra={"phase": "TRANSFORM"})
+    if quality["species_without_pokemon"] or quality["pokemon_without_species"]:
+        logging.warning(
+            f"Claves sin pareja en la unión: {quality['species_without_pokemon']} especies sin Pokémon, "
+            f"{quality['pokemon_without_species']} Pokémon sin especie.",
+            extra={"phase": "TRANSFORM"},
+        )
+    METRICS.add_rows("EXTRACT", extracted)
+    METRICS.add_rows("TRANSFORM", quality["rows"])
+    METRICS.set("join_unmatched_keys", quality["species_without_pokemon"], side="species")
+    METRICS.set("join_unmatched_keys", quality["pokemon_without_species"], side="pokemon")
+    logging.info(f"Pipeline en streaming completado: {extracted} registros descargados, {quality['rows']} filas unidas.", extra={"phase": "ETL"})
+    return quality
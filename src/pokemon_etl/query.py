@@ -0,0 +1,136 @@
+import time
+import logging
+import threading
+from pathlib import Path
+from functools import lru_cache
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Campo de consulta -> columnas de la tabla unida que lo alimentan.
+INDEXED_FIELDS = {
+    "name": ("name_x", "name_y"),
+    "nat_pokedex_entry": ("nat_pokedex_entry",),
+    "type": ("type_1", "type_2"),
+    "generation": ("generation",),
+}
+
+
+def _normalize(value):
+    """Clave de índice: los textos se comparan sin distinguir mayúsculas ni espacios exteriores."""
+    return value.strip().lower() if isinstance(value, str) else value
+
+
+def build_indexes(table):
+    """Construye los índices secundarios de la tabla unida.
+    Args:
+        table (pa.Table): Tabla unida de Pokémon y especies.
+    Returns:
+        dict: Campo -> {valor normalizado: pa.Array con las posiciones de sus filas, en orden}.
+    """
+    indexes = {}
+    for field, columns in INDEXED_FIELDS.items():
+        positions = {}
+        for column in columns:
+            if column not in table.column_names:
+                continue
+            for row, value in enumerate(table.column(column).to_pylist()):
+                if value is not None:
+                    positions.setdefault(_normalize(value), set()).add(row)
+        indexes[field] = {key: pa.array(sorted(rows), pa.int32()) for key, rows in positions.items()}
+    return indexes
+
+
+class _Version:
+    """Tabla, índices y caché de resultados de una versión del archivo Parquet."""
+    def __init__(self, path, cache_size):
+        stat = path.stat()
+        self.key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        self.table = pq.read_table(path, memory_map=True)
+        self.indexes = build_indexes(self.table)
+        self.lookup = lru_cache(maxsize=cache_size)(self._lookup)
+
+    def _lookup(self, field, key, as_records):
+        positions = self.indexes[field].get(key)
+        rows = self.table.take(positions) if positions is not None else self.table.schema.empty_table()
+        return rows.to_pylist() if as_records else rows
+
+
+class PokemonIndex:
+    """Consultas en memoria sobre el Parquet procesado, sin pasar por PostgreSQL.
+    Abre el archivo con memory map, indexa las posiciones de las filas por nombre, número de la
+    Pokédex nacional, tipo y generación, y guarda los resultados recientes en una caché LRU.
+    Cuando aparece una nueva versión del archivo (las salidas se reemplazan de forma atómica)
+    la siguiente consulta la carga; la comprobación se hace como mucho cada `check_interval`
+    segundos para que una consulta resuelta por la caché no pague un `stat`.
+    Args:
+        path (Path): Archivo Parquet de la tabla unida.
+        cache_size (int): Máximo de resultados en la caché LRU. 0 la desactiva.
+        check_interval (float): Segundos entre comprobaciones de una nueva versión. 0 comprueba siempre.
+    """
+    def __init__(self, path, cache_size=1024, check_interval=1.0):
+        self.path = Path(path)
+        self.cache_size = cache_size
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._version = _Version(self.path, cache_size)
+        self._checked_at = time.monotonic()
+
+    @property
+    def table(self):
+        """Tabla Arrow de la versión cargada."""
+        return self._current().table
+
+    def reload(self, force=False):
+        """Carga el archivo si cambió desde la última carga.
+        Args:
+            force (bool): Lo vuelve a cargar aunque no haya cambiado.
+        Returns:
+            bool: True si se cargó una nueva versión.
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            stat = self.path.stat()
+            if not force and (stat.st_ino, stat.st_size, stat.st_mtime_ns) == self._version.key:
+                return False
+            self._version = _Version(self.path, self.cache_size)
+        logging.info(f"Índice de consultas recargado: {self._version.table.num_rows} filas de {self.path}", extra={"phase": "QUERY"})
+        return True
+
+    def _current(self):
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self.reload()
+        return self._version
+
+    def lookup(self, field, value, as_records=False):
+        """Busca las filas cuyo campo indexado coincide con `value`.
+        Args:
+            field (str): 'name', 'nat_pokedex_entry', 'type' o 'generation'.
+            value: Valor buscado; los textos no distinguen mayúsculas.
+            as_records (bool): Devuelve una lista de diccionarios en lugar de una tabla Arrow.
+                La lista sale de la caché y se comparte entre llamadas: no debe modificarse.
+        Returns:
+            pa.Table | list: Filas encontradas, en el orden de la tabla.
+        """
+        if field not in INDEXED_FIELDS:
+            raise ValueError(f"Campo de consulta no soportado: {field}. Opciones: {tuple(INDEXED_FIELDS)}")
+        return self._current().lookup(field, _normalize(value), as_records)
+
+    def by_name(self, name, as_records=False):
+        """Pokémon o especie por nombre."""
+        return self.lookup("name", name, as_records)
+
+    def by_dex(self, number, as_records=False):
+        """Especie por número de la Pokédex nacional."""
+        return self.lookup("nat_pokedex_entry", number, as_records)
+
+    def by_type(self, type_name, as_records=False):
+        """Pokémon con `type_name` como tipo principal o secundario."""
+        return self.lookup("type", type_name, as_records)
+
+    def by_generation(self, generation, as_records=False):
+        """Especies de una generación, por ejemplo 'generation-i'."""
+        return self.lookup("generation", generation, as_records)
+
+    def cache_info(self):
+        """Estadísticas de la caché LRU de la versión cargada."""
+        return self._version.lookup.cache_info()
@@ -0,0 +1,228 @@
+import time
+import random
+import asyncio
+import logging
+from email.utils import parsedate_to_datetime
+
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+OVERLOAD_STATUS = (429, 503)
+# Tolerancia de redondeo al reponer tokens: evita esperas de ~1e-17 s que no avanzan el reloj.
+TOKEN_EPSILON = 1e-9
+
+
+def parse_retry_after(value):
+    """Interpreta la cabecera Retry-After en segundos o como fecha HTTP.
+    Args:
+        value (str): Valor de la cabecera.
+    Returns:
+        float: Segundos de espera, o None si la cabecera no existe o no es válida.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, base, cap, retry_after=None):
+    """Calcula la espera antes de un reintento con backoff exponencial y jitter completo.
+    Si el servidor indica un Retry-After se respeta tal cual, aunque supere `cap`: reintentar
+    antes solo provocaría otra respuesta 429/503.
+    Args:
+        attempt (int): Número de intento fallido, empezando en 0.
+        base (float): Espera base en segundos.
+        cap (float): Espera máxima del backoff exponencial en segundos.
+        retry_after (float): Espera indicada por el servidor; tiene prioridad si existe.
+    Returns:
+        float: Segundos de espera.
+    """
+    if retry_after is not None:
+        return max(0.0, retry_after)
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class TokenBucket:
+    """Limitador de solicitudes por segundo basado en un cubo de tokens.
+    Args:
+        rate (float): Tokens repuestos por segundo. None desactiva el límite.
+        burst (int): Capacidad máxima del cubo.
+        clock (callable): Reloj monótono en segundos.
+        sleep (callable): Espera asíncrona; se sustituye junto con `clock` para simular el tiempo.
+    """
+    def __init__(self, rate=None, burst=1, clock=time.monotonic, sleep=asyncio.sleep):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds):
+        """Detiene la entrega de tokens durante `seconds` (por ejemplo, por un Retry-After)."""
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    async def acquire(self):
+        """Espera hasta disponer de un token."""
+        async with self._lock:
+            while True:
+                now = self._clock()
+                if now < self._paused_until:
+                    await self._sleep(self._paused_until - now)
+                    continue
+                if self.rate is None:
+                    return
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1 - TOKEN_EPSILON:
+                    self._tokens = max(0.0, self._tokens - 1)
+                    return
+                await self._sleep((1 - self._tokens) / self.rate)
+
+
+class AdaptiveConcurrency:
+    """Límite de concurrencia adaptativo tipo AIMD.
+    Crece de forma aditiva mientras las respuestas son sanas y se reduce de forma
+    multiplicativa ante respuestas 429/503 o cuando la latencia reciente (media móvil
+    rápida) supera `latency_factor` veces la latencia base (media móvil lenta).
+    La latencia solo reduce el límite tras `warmup_samples` respuestas (hasta entonces la
+    latencia base es la media de las muestras) y si además supera la base en más de
+    `min_latency_delta` segundos, para que el ruido de milisegundos de un servidor rápido
+    no se confunda con congestión.
+    Args:
+        initial (int): Límite inicial.
+        minimum (int): Límite mínimo.
+        maximum (int): Límite máximo.
+        decrease_factor (float): Factor multiplicativo aplicado al reducir.
+        latency_factor (float): Umbral de latencia relativo a la latencia base.
+        warmup_samples (int): Respuestas necesarias antes de reducir por latencia.
+        min_latency_delta (float): Aumento mínimo de latencia, en segundos, para reducir.
+        clock (callable): Reloj monótono en segundos.
+    """
+    def __init__(self, initial, minimum=1, maximum=None, decrease_factor=0.5, latency_factor=2.0,
+                 warmup_samples=20, min_latency_delta=0.05, clock=time.monotonic):
+        self.minimum = max(1, minimum)
+        self.maximum = maximum or initial
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.decrease_factor = decrease_factor
+        self.latency_factor = latency_factor
+        self.warmup_samples = warmup_samples
+        self.min_latency_delta = min_latency_delta
+        self.in_flight = 0
+        self._clock = clock
+        self._samples = 0
+        self._latency = None
+        self._base_latency = None
+        self._last_decrease = None
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        """Espera hasta que haya cupo bajo el límite actual."""
+        async with self._condition:
+            while self.in_flight >= int(self.limit):
+                await self._condition.wait()
+            self.in_flight += 1
+
+    async def release(self):
+        """Libera un cupo y despierta a las solicitudes en espera."""
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def _decrease(self, reason):
+        """Reduce el límite como máximo una vez por ventana de latencia."""
+        now = self._clock()
+        if self._last_decrease is not None and now - self._last_decrease < (self._latency or 0.0):
+            return
+        self._last_decrease = now
+        previous = int(self.limit)
+        self.limit = max(self.minimum, self.limit * self.decrease_factor)
+        if int(self.limit) != previous:
+            logging.info(f"Concurrencia reducida de {previous} a {int(self.limit)} ({reason}).", extra={"phase": "EXTRACT"})
+
+    def on_success(self, latency):
+        """Registra una respuesta sana y ajusta el límite según la latencia."""
+        self._samples += 1
+        if self._latency is None:
+            self._latency = self._base_latency = latency
+        self._latency = 0.8 * self._latency + 0.2 * latency
+        if self._samples <= self.warmup_samples:
+            self._base_latency += (latency - self._base_latency) / self._samples
+        else:
+            self._base_latency = 0.99 * self._base_latency + 0.01 * latency
+        congested = (
+            self._samples > self.warmup_samples
+            and self._latency > self._base_latency * self.latency_factor
+            and self._latency - self._base_latency > self.min_latency_delta
+        )
+        if congested:
+            self._decrease("latencia en aumento")
+        else:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def on_overload(self):
+        """Registra una respuesta de sobrecarga (429/503)."""
+        self._decrease("sobrecarga del servidor")
+
+
+class Throttle:
+    """Agrupa el control de tasa, la concurrencia adaptativa y la política de reintentos.
+    Args:
+        initial_concurrency (int): Concurrencia inicial.
+        min_concurrency (int): Concurrencia mínima.
+        max_concurrency (int): Concurrencia máxima.
+        requests_per_second (float): Solicitudes por segundo. None desactiva el límite.
+        burst (int): Ráfaga máxima del cubo de tokens.
+        max_retries (int): Reintentos por solicitud.
+        backoff_base (float): Espera base del backoff en segundos.
+        backoff_max (float): Espera máxima del backoff en segundos; no limita un Retry-After.
+        decrease_factor (float): Factor multiplicativo de reducción de concurrencia.
+        latency_factor (float): Umbral de latencia relativo a la latencia base.
+        warmup_samples (int): Respuestas necesarias antes de reducir la concurrencia por latencia.
+        min_latency_delta (float): Aumento mínimo de latencia, en segundos, para reducir la concurrencia.
+    """
+    def __init__(self, initial_concurrency=50, min_concurrency=1, max_concurrency=None, requests_per_second=None,
+                 burst=1, max_retries=0, backoff_base=0.5, backoff_max=30.0, decrease_factor=0.5, latency_factor=2.0,
+                 warmup_samples=20, min_latency_delta=0.05):
+        self.max_concurrency = max_concurrency or initial_concurrency
+        self.bucket = TokenBucket(requests_per_second, burst)
+        self.concurrency = AdaptiveConcurrency(
+            initial_concurrency, min_concurrency, self.max_concurrency, decrease_factor, latency_factor,
+            warmup_samples, min_latency_delta,
+        )
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def delay(self, attempt, retry_after=None):
+        """Espera antes del reintento número `attempt`."""
+        return backoff_delay(attempt, self.backoff_base, self.backoff_max, retry_after)
+
+
+def build_throttle(configuracion):
+    """Crea el control de tasa y reintentos a partir de la configuración del ETL.
+    Args:
+        configuracion (ConfigManager): Configuración del ETL.
+    Returns:
+        Throttle: Control de tasa configurado.
+    """
+    return Throttle(
+        initial_concurrency=configuracion.concurrency,
+        min_concurrency=configuracion.min_concurrency,
+        max_concurrency=configuracion.max_concurrency,
+        requests_per_second=configuracion.requests_per_second,
+        burst=configuracion.burst,
+        max_retries=configuracion.max_retries,
+        backoff_base=configuracion.backoff_base,
+        backoff_max=configuracion.backoff_max,
+        decrease_factor=configuracion.decrease_factor,
+        latency_factor=configuracion.latency_factor,
+        warmup_samples=configuracion.warmup_samples,
+        min_latency_delta=configuracion.min_latency_delta,
+    )
@@ -0,0 +1,273 @@
+import io
+import os
+import gzip
+import json
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from pokemon_etl.codec import Decoder
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+RAW_FORMATS = ("json", "ndjson")
+COMPRESSIONS = ("none", "gzip", "zstd")
+INDEX_NAME = "_index.json"
+INDEX_LOCK_NAME = "_index.lock"
+_SUFFIXES = {
+    (".ndjson", ".zst"): ("ndjson", "zstd"),
+    (".ndjson", ".gz"): ("ndjson", "gzip"),
+    (".ndjson",): ("ndjson", "none"),
+    (".json",): ("json", "none"),
+}
+
+
+def _layout(path):
+    """Obtiene el formato y la compresión de un archivo crudo a partir de su nombre.
+    Returns:
+        tuple: (stem, formato, compresión), o None si no es un archivo crudo.
+    """
+    name = Path(path).name
+    for suffixes, layout in _SUFFIXES.items():
+        suffix = "".join(suffixes)
+        if name.endswith(suffix):
+            return (name[:-len(suffix)],) + layout
+    return None
+
+
+def _open_read(path, compression):
+    """Abre un archivo crudo en modo binario aplicando la descompresión correspondiente."""
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError(f"Se requiere el paquete 'zstandard' para leer {path}")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    return open(path, "rb")
+
+
+def iter_lines(path):
+    """Recorre en streaming las líneas de un archivo NDJSON crudo, comprimido o no.
+    Args:
+        path (Path): Ruta del archivo.
+    Returns:
+        generator: Líneas no vacías en bytes.
+    """
+    _, raw_format, compression = _layout(path)
+    if raw_format != "ndjson":
+        raise ValueError(f"El archivo no está en formato NDJSON: {path}")
+    with _open_read(path, compression) as raw:
+        for line in io.BufferedReader(raw) if compression == "zstd" else raw:
+            if line.strip():
+                yield line
+
+
+def iter_records(path, decoder=None):
+    """Recorre los registros de un archivo crudo en cualquiera de sus formatos.
+    Los archivos NDJSON se leen en streaming, un registro por línea; los archivos JSON del
+    formato anterior (una lista con sangría) se cargan completos.
+    Args:
+        path (Path): Ruta del archivo.
+        decoder (Decoder): Decodificador JSON. Por defecto, el más rápido instalado.
+    Returns:
+        generator: Registros del archivo.
+    """
+    layout = _layout(path)
+    if layout is None:
+        raise ValueError(f"Formato de archivo crudo no reconocido: {path}")
+    decoder = decoder or Decoder()
+    if layout[1] == "json":
+        with open(path, "rb") as f:
+            yield from decoder.decode_array(f.read())
+        return
+    for line in iter_lines(path):
+        yield decoder.decode(line)
+
+
+class RawStore:
+    """Almacén de archivos crudos de un directorio.
+    Escribe un registro JSON compacto por línea (NDJSON) con compresión gzip o zstd y
+    mantiene un índice `_index.json` con el número de registros, el tamaño, la fecha de
+    modificación y el hash de cada archivo. Lee tanto este formato como los archivos JSON del formato anterior.
+    Args:
+        path (Path): Directorio de los archivos crudos.
+        raw_format (str): 'ndjson' o 'json' (formato anterior).
+        compression (str): 'gzip', 'zstd' o 'none'. Solo aplica a NDJSON.
+    """
+    def __init__(self, path, raw_format="ndjson", compression="gzip"):
+        if raw_format not in RAW_FORMATS:
+            raise ValueError(f"Formato crudo no soportado: {raw_format}. Opciones: {RAW_FORMATS}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Compresión no soportada: {compression}. Opciones: {COMPRESSIONS}")
+        if compression == "zstd" and zstandard is None:
+            logging.warning("Paquete 'zstandard' no instalado, se usará gzip.", extra={"phase": "EXTRACT"})
+            compression = "gzip"
+        self.path = Path(path)
+        self.raw_format = raw_format
+        self.compression = compression if raw_format == "ndjson" else "none"
+        self._lock = threading.Lock()
+
+    @property
+    def index_path(self):
+        return self.path / INDEX_NAME
+
+    @contextmanager
+    def _index_lock(self):
+        """Bloquea el índice entre hilos y, donde hay `fcntl`, entre procesos.
+        Varias tareas del DAG pueden escribir en el mismo directorio a la vez.
+        """
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            self.path.mkdir(parents=True, exist_ok=True)
+            with open(self.path / INDEX_LOCK_NAME, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def file_path(self, stem):
+        """Ruta del archivo de `stem` en el formato configurado."""
+        if self.raw_format == "json":
+            return self.path / f"{stem}.json"
+        suffix = {"none": "", "gzip": ".gz", "zstd": ".zst"}[self.compression]
+        return self.path / f"{stem}.ndjson{suffix}"
+
+    def files(self, prefix=""):
+        """Lista los archivos crudos del directorio, uno por stem.
+        Si un stem existe en varios formatos se prefiere el NDJSON.
+        Args:
+            prefix (str): Prefijo del stem, por ejemplo 'pokemon_page_'.
+        Returns:
+            list: Rutas de los archivos ordenadas por nombre.
+        """
+        chosen = {}
+        if not self.path.exists():
+            return []
+        for path in self.path.iterdir():
+            layout = _layout(path)
+            if not path.is_file() or layout is None or path.name.startswith("_"):
+                continue
+            stem, raw_format, _ = layout
+            if not stem.startswith(prefix):
+                continue
+            if stem not in chosen or raw_format == "ndjson":
+                chosen[stem] = path
+        return [chosen[stem] for stem in sorted(chosen)]
+
+    def find(self, stem):
+        """Busca el archivo de `stem` en cualquier formato.
+        Returns:
+            Path: Ruta del archivo, o None si no existe.
+        """
+        for path in self.files(stem):
+            if _layout(path)[0] == stem:
+                return path
+        return None
+
+    def exists(self, stem):
+        """Indica si el archivo de `stem` existe en el formato configurado."""
+        return self.file_path(stem).exists()
+
+    def read(self, stem):
+        """Recorre los registros de `stem` en cualquier formato."""
+        path = self.find(stem)
+        if path is None:
+            raise FileNotFoundError(f"Archivo crudo no encontrado: {self.path}/{stem}")
+        return iter_records(path)
+
+    def _open_write(self, path):
+        """Abre un archivo para escritura con la compresión configurada."""
+        raw = open(path, "wb")
+        if self.compression == "gzip":
+            return gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6, mtime=0), raw
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=False), raw
+        return raw, raw
+
+    def write(self, stem, records):
+        """Escribe los registros de `stem` de forma atómica y actualiza el índice.
+        Elimina las versiones de `stem` en otros formatos para que no se lean dos veces.
+        Args:
+            stem (str): Nombre del archivo sin extensión.
+            records (list): Registros a guardar.
+        Returns:
+            dict: Entrada del índice del archivo escrito.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        path = self.file_path(stem)
+        tmp_path = path.with_name(path.name + ".tmp")
+        if self.raw_format == "json":
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(records, f, indent=4)
+        else:
+            writer, raw = self._open_write(tmp_path)
+            try:
+                for record in records:
+                    writer.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+                    writer.write(b"\n")
+            finally:
+                writer.close()
+                raw.close()
+        os.replace(tmp_path, path)
+        for other in self.path.iterdir():
+            layout = _layout(other)
+            if layout and layout[0] == stem and other != path:
+                other.unlink(missing_ok=True)
+        stat = path.stat()
+        entry = {
+            "file": path.name,
+            "records": len(records),
+            "bytes": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_sha256(path),
+        }
+        with self._index_lock():
+            index = self.read_index()
+            index[stem] = entry
+            self._save_index(index)
+        return entry
+
+    def remove(self, stem):
+        """Elimina el archivo de `stem` en cualquier formato y su entrada del índice."""
+        for path in self.files(stem):
+            if _layout(path)[0] == stem:
+                path.unlink(missing_ok=True)
+        with self._index_lock():
+            index = self.read_index()
+            if index.pop(stem, None) is not None:
+                self._save_index(index)
+
+    def read_index(self):
+        """Carga el índice del directorio."""
+        if not self.index_path.exists():
+            return {}
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_index(self, index):
+        """Guarda el índice de forma atómica."""
+        tmp_path = self.index_path.with_name(f"{INDEX_NAME}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Calcula el hash SHA-256 de un archivo leyéndolo por bloques."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
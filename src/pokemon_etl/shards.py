@@ -0,0 +1,194 @@
+import asyncio
+import logging
+from pathlib import Path
+import pyarrow as pa
+import pyarrow.feather as feather
+from pokemon_etl.extract import ExtractionEngine, LinkCrawler, get_pokemon_gens, save_generation, save_pokemon_pages
+from pokemon_etl.raw_store import RawStore
+from pokemon_etl.manifest import ExtractManifest
+from pokemon_etl.metrics import METRICS
+from pokemon_etl.sinks import DEFAULT_OUTPUTS
+from pokemon_etl.transform import joined_schema, transform_files, write_joined
+from pokemon_etl.fields import POKEMON_FIELDS, SPECIES_FIELDS, fields_schema
+
+SHARD_KINDS = ("species", "pokemon")
+SHARDS_DIR = "shards"
+
+
+def shard_fields(kind, extra_fields=None):
+    """Especificación de campos de un tipo de fragmento, con las columnas adicionales."""
+    extra_fields = extra_fields or {}
+    if kind == "species":
+        return SPECIES_FIELDS + extra_fields.get("species", [])
+    return POKEMON_FIELDS + extra_fields.get("pokemon", [])
+
+
+async def _plan(base_url, generation_list, concurrency):
+    async with ExtractionEngine(concurrency) as engine:
+        generations = await get_pokemon_gens(engine, base_url, generation_list)
+        listing = await engine.get(f"{base_url}pokemon?limit=1")
+    return generations, listing["count"]
+
+
+def plan_shards(base_url, generation_list, page_size=50, pages_per_shard=4, concurrency=4):
+    """Divide la extracción en fragmentos independientes: uno por generación de especies y
+    uno por cada rango de `pages_per_shard` páginas de Pokémon.
+    Solo consulta la lista de generaciones y el total de Pokémon; cada fragmento es un
+    diccionario pequeño, apto para XCom, que su tarea resuelve por su cuenta. Las especies
+    siguen el orden de `generation_list`, como en la ejecución por etapas.
+    Args:
+        base_url (str): URL base de la API.
+        generation_list (list): Lista de generaciones a obtener.
+        page_size (int): Número de Pokémon por archivo crudo.
+        pages_per_shard (int): Páginas de Pokémon por fragmento.
+        concurrency (int): Solicitudes simultáneas de la planificación.
+    Returns:
+        list: Fragmentos con 'id', 'kind' y sus parámetros.
+    """
+    generations, count = asyncio.run(_plan(base_url, generation_list, concurrency))
+    generations.sort(key=lambda generation: generation_list.index(generation["nombre"]))
+    shards = [{"id": f"species_{generation['nombre']}", "kind": "species", "generation": generation["nombre"], "url": generation["url"]}
+              for generation in generations]
+    size = page_size * pages_per_shard
+    for offset in range(0, count, size):
+        limit = min(size, count - offset)
+        shards.append({
+            "id": f"pokemon_{offset + 1}_{offset + limit}",
+            "kind": "pokemon",
+            "offset": offset,
+            "limit": limit,
+            "first_page": offset // page_size + 1,
+        })
+    logging.info(f"Extracción dividida en {len(shards)} fragmentos ({len(generations)} de especies, {count} Pokémon).", extra={"phase": "EXTRACT"})
+    return shards
+
+
+def shard_manifest_path(manifest_path, shard_id):
+    """Ruta del manifiesto de extracción de un fragmento, junto al manifiesto del modo por etapas.
+    Cada fragmento tiene el suyo para que las tareas mapeadas no se sobrescriban entre sí.
+    """
+    manifest_path = Path(manifest_path)
+    return manifest_path.with_name(f"{manifest_path.stem}_{shard_id}{manifest_path.suffix}")
+
+
+async def _save_shard(engine, shard, store, base_url, page_size, crawler, manifest=None):
+    if shard["kind"] == "species":
+        await save_generation(engine, store, {"nombre": shard["generation"], "url": shard["url"]}, manifest, crawler)
+        return [shard["generation"]]
+    listing = await engine.get(f"{base_url}pokemon?limit={shard['limit']}&offset={shard['offset']}")
+    urls = [pokemon["url"] for pokemon in listing["results"]]
+    pages = {shard["first_page"] + i // page_size: urls[i:i + page_size] for i in range(0, len(urls), page_size)}
+    await save_pokemon_pages(engine, store, pages, manifest, crawler)
+    return [f"pokemon_page_{page}" for page in pages]
+
+
+async def _extract_shard(shard, store, base_url, concurrency, page_size, cache, throttle, crawl_links, linked_store, manifest):
+    async with ExtractionEngine(concurrency, cache=cache, throttle=throttle) as engine:
+        crawler = LinkCrawler(engine, crawl_links) if crawl_links else None
+        try:
+            stems = await _save_shard(engine, shard, store, base_url, page_size, crawler, manifest)
+        except BaseException:
+            if crawler:
+                await crawler.cancel()
+            raise
+        linked = await crawler.save(linked_store, f"_{shard['id']}") if crawler else []
+    return stems, linked
+
+
+def extract_shard(shard, raw_species_path, raw_pokemon_path, base_url, concurrency=50, page_size=50, cache=None, throttle=None,
+                  raw_format="ndjson", compression="gzip", crawl_links=None, raw_linked_path=None, manifest_path=None,
+                  force=False):
+    """Extrae un fragmento y guarda sus archivos crudos.
+    Con `manifest_path`, las páginas o la generación ya completas en un intento fallido
+    anterior se omiten, de modo que el reintento de una tarea solo descarga lo que falta. Al
+    terminar con éxito el avance se descarta y la siguiente ejecución revisa todo de nuevo.
+    Args:
+        shard (dict): Fragmento de `plan_shards`.
+        raw_species_path (Path): Ruta de las especies crudas.
+        raw_pokemon_path (Path): Ruta de los Pokémon crudos.
+        base_url (str): URL base de la API.
+        concurrency (int): Número de solicitudes simultáneas.
+        page_size (int): Número de Pokémon por archivo.
+        cache (ResponseCache): Caché de respuestas HTTP opcional.
+        throttle (Throttle): Control de tasa, concurrencia y reintentos.
+        raw_format (str): Formato de los archivos crudos ('ndjson' o 'json').
+        compression (str): Compresión de los archivos NDJSON ('gzip', 'zstd' o 'none').
+        crawl_links (dict): Rutas de enlace a seguir por tipo de registro (ver `LinkCrawler`).
+        raw_linked_path (Path): Ruta de los recursos enlazados; cada fragmento escribe sus propios archivos.
+        manifest_path (Path): Manifiesto de extracción del fragmento (ver `shard_manifest_path`).
+        force (bool): Descarta el avance del manifiesto y descarga el fragmento completo.
+    Returns:
+        dict: Manifiesto del fragmento: 'id', 'kind', rutas de sus archivos crudos y de sus recursos enlazados.
+    """
+    if shard["kind"] not in SHARD_KINDS:
+        raise ValueError(f"Tipo de fragmento no soportado: {shard['kind']}. Opciones: {SHARD_KINDS}")
+    store = RawStore(raw_species_path if shard["kind"] == "species" else raw_pokemon_path, raw_format, compression)
+    linked_store = RawStore(raw_linked_path, raw_format, compression) if crawl_links else None
+    manifest = ExtractManifest(manifest_path) if manifest_path else None
+    if manifest and force:
+        manifest.reset_progress()
+    stems, linked = asyncio.run(_extract_shard(shard, store, base_url, concurrency, page_size, cache, throttle, crawl_links, linked_store, manifest))
+    if manifest:
+        manifest.reset_progress()
+    files = [str(store.find(stem)) for stem in stems]
+    linked_files = [str(linked_store.find(stem)) for stem in linked]
+    logging.info(f"Fragmento {shard['id']} extraído: {len(files)} archivos y {len(linked_files)} de recursos enlazados.", extra={"phase": "EXTRACT"})
+    return {"id": shard["id"], "kind": shard["kind"], "files": files, "linked": linked_files}
+
+
+def transform_shard(manifest, processed_path, batch_size=1000, extra_fields=None, json_backend="auto", typed_decode=True):
+    """Transforma los archivos crudos de un fragmento en un archivo Arrow intermedio.
+    Args:
+        manifest (dict): Manifiesto de `extract_shard`.
+        processed_path (Path): Directorio de salida; el archivo se guarda en `shards/<id>.arrow`.
+        batch_size (int): Número máximo de filas por lote.
+        extra_fields (dict): Columnas adicionales por recurso ('pokemon', 'species').
+        json_backend (str): Decodificador JSON ('auto', 'orjson', 'msgspec' o 'json').
+        typed_decode (bool): Decodifica solo las claves usadas por la transformación si msgspec está instalado.
+    Returns:
+        dict: Manifiesto del fragmento transformado: 'id', 'kind', 'path' y 'rows'.
+    """
+    fields = shard_fields(manifest["kind"], extra_fields)
+    table = transform_files([Path(file) for file in manifest["files"]], fields, batch_size, 1, json_backend, typed_decode)
+    path = Path(processed_path) / SHARDS_DIR / f"{manifest['id']}.arrow"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    feather.write_feather(table.unify_dictionaries(), tmp_path, compression="lz4")
+    tmp_path.replace(path)
+    logging.info(f"Fragmento {manifest['id']} transformado: {table.num_rows} registros en {path}.", extra={"phase": "TRANSFORM"})
+    return {"id": manifest["id"], "kind": manifest["kind"], "path": str(path), "rows": table.num_rows, "linked": manifest.get("linked", [])}
+
+
+def _read_shards(manifests, kind, fields):
+    tables = [feather.read_table(manifest["path"]) for manifest in manifests if manifest["kind"] == kind]
+    return pa.concat_tables(tables) if tables else fields_schema(fields).empty_table()
+
+
+def merge_shards(manifests, processed_path, parquet_name, csv_name, extra_fields=None, row_group_size=None, dataset_name=None,
+                 partition_by=None, write_metadata=True, outputs=DEFAULT_OUTPUTS, feather_name=None, linked_files=None):
+    """Une los fragmentos transformados y escribe las salidas, igual que `join_species_pokemons`.
+    Los fragmentos se concatenan en el orden del plan, de modo que el resultado coincide con
+    el de la ejecución por etapas.
+    Args:
+        manifests (list): Manifiestos de `transform_shard`.
+        processed_path (Path): Directorio de las salidas.
+        parquet_name (str): Nombre del archivo Parquet.
+        csv_name (str): Nombre del archivo CSV.
+        extra_fields (dict): Columnas adicionales por recurso ('pokemon', 'species').
+        row_group_size (int): Máximo de filas por grupo de filas Parquet.
+        dataset_name (str): Directorio del dataset particionado.
+        partition_by (list): Columnas de partición del dataset.
+        write_metadata (bool): Escribe el resumen `_metadata` del dataset.
+        outputs (list): Salidas habilitadas: 'parquet', 'csv', 'feather' y/o 'dataset'.
+        feather_name (str): Nombre del archivo Feather.
+        linked_files (list): Archivos de recursos enlazados escritos por los fragmentos (su clave 'linked').
+    Returns:
+        dict: Filas de la tabla unida y claves sin pareja de cada lado.
+    """
+    species_fields, pokemon_fields = shard_fields("species", extra_fields), shard_fields("pokemon", extra_fields)
+    species = _read_shards(manifests, "species", species_fields)
+    pokemons = _read_shards(manifests, "pokemon", pokemon_fields)
+    METRICS.set("shards_merged", len(manifests))
+    logging.info(f"Uniendo {len(manifests)} fragmentos: {species.num_rows} especies y {pokemons.num_rows} Pokémon.", extra={"phase": "TRANSFORM"})
+    return write_joined(pokemons, species, joined_schema(pokemon_fields, species_fields), processed_path, parquet_name, csv_name,
+                        row_group_size, dataset_name, partition_by, write_metadata, outputs, feather_name, linked_files)
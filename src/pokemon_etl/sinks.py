@@ -0,0 +1,210 @@
+import os
+import time
+import logging
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import pyarrow.feather as feather
+from pokemon_etl.dataset import parquet_options, write_parquet, write_dataset
+
+SINK_TYPES = ("parquet", "csv", "feather", "dataset")
+DEFAULT_OUTPUTS = ("parquet", "csv")
+# Tamaño de grupo de filas por defecto de pyarrow.
+DEFAULT_ROW_GROUP_SIZE = 1024 * 1024
+
+
+def _tmp_path(path):
+    """Ruta temporal junto a `path` para escribir de forma atómica."""
+    return path.with_name(path.name + ".tmp")
+
+
+class ParquetSink:
+    """Salida en un único archivo Parquet.
+    Args:
+        path (Path): Ruta del archivo.
+        row_group_size (int): Máximo de filas por grupo de filas.
+    """
+    kind = "parquet"
+
+    def __init__(self, path, row_group_size=None):
+        self.path = Path(path)
+        self.row_group_size = row_group_size
+
+    def write(self, table):
+        tmp_path = _tmp_path(self.path)
+        write_parquet(table, tmp_path, self.row_group_size)
+        os.replace(tmp_path, self.path)
+
+    def write_stream(self, batches, schema):
+        """Escribe un flujo de lotes acumulándolos hasta completar cada grupo de filas.
+        Las opciones (columnas con diccionario) se deciden con el primer grupo de filas.
+        """
+        tmp_path = _tmp_path(self.path)
+        limit = self.row_group_size or DEFAULT_ROW_GROUP_SIZE
+        writer, pending, rows = None, [], 0
+        try:
+            for batch in batches:
+                pending.append(batch)
+                rows += batch.num_rows
+                if rows >= limit:
+                    writer = self._write_group(writer, tmp_path, pa.Table.from_batches(pending, schema), limit)
+                    pending, rows = [], 0
+            if pending or writer is None:
+                writer = self._write_group(writer, tmp_path, pa.Table.from_batches(pending, schema), limit)
+            writer.close()
+        except BaseException:
+            if writer:
+                writer.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _write_group(writer, path, table, limit):
+        if writer is None:
+            options = parquet_options(table)
+            writer = pq.ParquetWriter(path, table.schema, compression=options["compression"],
+                                      use_dictionary=options["use_dictionary"], write_statistics=True)
+        writer.write_table(table, row_group_size=limit)
+        return writer
+
+
+class CsvSink:
+    """Salida CSV con el escritor multihilo de Arrow.
+    Args:
+        path (Path): Ruta del archivo.
+    """
+    kind = "csv"
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def write(self, table):
+        tmp_path = _tmp_path(self.path)
+        pa_csv.write_csv(table, tmp_path)
+        os.replace(tmp_path, self.path)
+
+    def write_stream(self, batches, schema):
+        """Escribe un flujo de lotes a medida que llegan."""
+        tmp_path = _tmp_path(self.path)
+        try:
+            with pa_csv.CSVWriter(tmp_path, schema) as writer:
+                for batch in batches:
+                    writer.write_batch(batch)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        os.replace(tmp_path, self.path)
+
+
+class FeatherSink:
+    """Salida Arrow IPC / Feather v2 comprimida con LZ4.
+    Args:
+        path (Path): Ruta del archivo.
+    """
+    kind = "feather"
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def write(self, table):
+        tmp_path = _tmp_path(self.path)
+        feather.write_feather(table, tmp_path, compression="lz4")
+        os.replace(tmp_path, self.path)
+
+    def write_stream(self, batches, schema):
+        """Acumula el flujo y lo escribe al terminar: el formato de archivo IPC necesita un
+        único diccionario por columna, que solo se conoce con todos los lotes."""
+        self.write(pa.Table.from_batches(list(batches), schema).unify_dictionaries())
+
+
+class DatasetSink:
+    """Salida como dataset Parquet particionado al estilo Hive.
+    Args:
+        path (Path): Directorio del dataset.
+        partition_by (list): Columnas de partición.
+        row_group_size (int): Máximo de filas por grupo de filas.
+        write_metadata (bool): Escribe el resumen `_metadata`.
+    """
+    kind = "dataset"
+
+    def __init__(self, path, partition_by=None, row_group_size=None, write_metadata=True):
+        self.path = Path(path)
+        self.partition_by = partition_by
+        self.row_group_size = row_group_size
+        self.write_metadata = write_metadata
+
+    def write(self, table):
+        write_dataset(table, self.path, self.partition_by, self.row_group_size, self.write_metadata)
+
+    def write_stream(self, batches, schema):
+        """Acumula el flujo y lo escribe al terminar, para repartir cada partición en archivos
+        completos y generar el resumen `_metadata` de una vez."""
+        self.write(pa.Table.from_batches(list(batches), schema))
+
+
+def build_sinks(processed_path, outputs, parquet_name=None, csv_name=None, feather_name=None, dataset_name=None,
+                row_group_size=None, partition_by=None, write_metadata=True):
+    """Crea las salidas habilitadas de la transformación.
+    Args:
+        processed_path (Path): Directorio de salida.
+        outputs (list): Salidas habilitadas: 'parquet', 'csv', 'feather' y/o 'dataset'.
+        parquet_name (str): Nombre del archivo Parquet.
+        csv_name (str): Nombre del archivo CSV.
+        feather_name (str): Nombre del archivo Feather.
+        dataset_name (str): Nombre del directorio del dataset particionado.
+        row_group_size (int): Máximo de filas por grupo de filas Parquet.
+        partition_by (list): Columnas de partición del dataset.
+        write_metadata (bool): Escribe el resumen `_metadata` del dataset.
+    Returns:
+        list: Salidas configuradas.
+    """
+    processed_path = Path(processed_path)
+    names = {"parquet": parquet_name, "csv": csv_name, "feather": feather_name, "dataset": dataset_name}
+    sinks = []
+    for output in outputs:
+        if output not in SINK_TYPES:
+            raise ValueError(f"Salida no soportada: {output}. Opciones: {SINK_TYPES}")
+        if not names[output]:
+            raise ValueError(f"La salida '{output}' está habilitada pero no tiene nombre de archivo.")
+        path = processed_path / names[output]
+        if output == "parquet":
+            sinks.append(ParquetSink(path, row_group_size))
+        elif output == "csv":
+            sinks.append(CsvSink(path))
+        elif output == "feather":
+            sinks.append(FeatherSink(path))
+        else:
+            sinks.append(DatasetSink(path, partition_by, row_group_size, write_metadata))
+    return sinks
+
+
+def output_paths(processed_path, outputs, parquet_name=None, csv_name=None, feather_name=None, dataset_name=None):
+    """Rutas de las salidas habilitadas, en el orden de `outputs`."""
+    return [sink.path for sink in build_sinks(processed_path, outputs, parquet_name, csv_name, feather_name, dataset_name)]
+
+
+def _timed_write(sink, table):
+    """Escribe una salida y devuelve los segundos empleados."""
+    start = time.perf_counter()
+    sink.write(table)
+    return time.perf_counter() - start
+
+
+def write_sinks(table, sinks):
+    """Escribe la misma tabla Arrow en todas las salidas a la vez.
+    Cada salida se escribe en su propio hilo; los escritores de Arrow liberan el GIL, de modo
+    que la serialización y la compresión de las distintas salidas se solapan.
+    Args:
+        table (pa.Table): Tabla a escribir.
+        sinks (list): Salidas creadas con `build_sinks`.
+    """
+    if not sinks:
+        return
+    with ThreadPoolExecutor(max_workers=len(sinks)) as executor:
+        futures = [(sink, executor.submit(_timed_write, sink, table)) for sink in sinks]
+    for sink, future in futures:
+        elapsed = future.result()
+        logging.info(f"Salida {sink.kind} guardada en {sink.path} en {elapsed:.2f} s.", extra={"phase": "TRANSFORM"})
@@ -0,0 +1,182 @@
+import os
+import json
+import hashlib
+import logging
+from pathlib import Path
+from datetime import datetime
+from pokemon_etl.metrics import METRICS
+from pokemon_etl.raw_store import INDEX_NAME, file_sha256
+from pokemon_etl.fields import POKEMON_FIELDS, SPECIES_FIELDS
+from pokemon_etl.load import TABLE_NAME, table_state
+
+# Cambia al modificar cómo se calculan las huellas, para invalidar los estados anteriores.
+STATE_VERSION = 1
+
+
+def _indexed_hashes(directory):
+    """Hashes del índice `_index.json` de un directorio crudo, si existe."""
+    index_path = Path(directory) / INDEX_NAME
+    if not index_path.exists():
+        return {}
+    with open(index_path, "r", encoding="utf-8") as f:
+        return {entry["file"]: entry for entry in json.load(f).values()}
+
+
+def files_digest(paths):
+    """Calcula el hash del contenido de cada archivo.
+    Para los archivos crudos reutiliza el hash SHA-256 del índice del `RawStore` cuando el
+    tamaño y la fecha de modificación coinciden, de modo que no hace falta releerlos; un
+    archivo reescrito fuera del `RawStore` (o de un índice sin fecha) se vuelve a leer, igual
+    que el resto, por bloques.
+    Los directorios (por ejemplo un dataset particionado) se recorren completos.
+    Args:
+        paths (list): Rutas de archivos o directorios.
+    Returns:
+        dict: Ruta -> SHA-256 del contenido, o None si no existe.
+    """
+    digests = {}
+    indexes = {}
+    for path in map(Path, paths):
+        if not path.exists():
+            digests[str(path)] = None
+            continue
+        if path.is_dir():
+            digests.update(files_digest(sorted(p for p in path.rglob("*") if p.is_file())))
+            continue
+        if path.parent not in indexes:
+            indexes[path.parent] = _indexed_hashes(path.parent)
+        entry = indexes[path.parent].get(path.name)
+        stat = path.stat()
+        if entry and entry["bytes"] == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            digests[str(path)] = entry["sha256"]
+        else:
+            digests[str(path)] = file_sha256(path)
+    return digests
+
+
+def fingerprint(files=(), config=None, state=None):
+    """Huella de una etapa: contenido de sus archivos de entrada, configuración relevante y
+    estado externo (por ejemplo el de la tabla destino).
+    Args:
+        files (list): Archivos o directorios de entrada.
+        config (dict): Parámetros que afectan al resultado de la etapa.
+        state (dict): Estado externo serializable a JSON.
+    Returns:
+        str: SHA-256 hexadecimal.
+    """
+    payload = {"version": STATE_VERSION, "files": files_digest(files), "config": config, "state": state}
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def transform_fingerprint(files, extra_fields=None, **settings):
+    """Huella de la transformación: archivos de entrada, especificación completa de campos
+    (un cambio en POKEMON_FIELDS o SPECIES_FIELDS también invalida la etapa) y parámetros de salida.
+    Args:
+        files (list): Archivos de entrada de la transformación.
+        extra_fields (dict): Columnas adicionales por recurso ('pokemon', 'species').
+        **settings: Parámetros que afectan a las salidas (nombres, formatos, particiones...).
+    Returns:
+        str: SHA-256 hexadecimal.
+    """
+    extra_fields = extra_fields or {}
+    fields = {
+        "pokemon": POKEMON_FIELDS + extra_fields.get("pokemon", []),
+        "species": SPECIES_FIELDS + extra_fields.get("species", []),
+    }
+    return fingerprint(files, {"fields": fields, **settings})
+
+
+def load_fingerprint(engine, parquet_path, load_mode, copy_format, table_name=TABLE_NAME, columns=None):
+    """Huella de la carga: contenido del Parquet, modo de carga, columnas cargadas y estado de la tabla destino.
+    Args:
+        engine (sqlalchemy.engine.Engine): Motor de conexión a la base de datos.
+        parquet_path (Path): Archivo Parquet que se carga.
+        load_mode (str): Modo de carga.
+        copy_format (str): Formato de COPY.
+        table_name (str): Tabla destino.
+        columns (list): Columnas cargadas. None carga todas.
+    Returns:
+        str: SHA-256 hexadecimal.
+    """
+    config = {"load_mode": load_mode, "copy_format": copy_format, "table": table_name, "columns": columns}
+    return fingerprint([parquet_path], config, table_state(engine, table_name))
+
+
+class StageCache:
+    """Estado local de las últimas ejecuciones correctas de cada etapa.
+    Guarda en un JSON la huella con la que terminó bien cada etapa. Si al volver a ejecutarla
+    la huella coincide y sus salidas existen, la etapa se omite.
+    Args:
+        path (Path): Ruta del archivo JSON de estado.
+        force (bool): Ejecuta todas las etapas aunque su huella no haya cambiado.
+        enabled (bool): Si es False, `run` ejecuta siempre la etapa sin calcular huellas ni guardar estado.
+    """
+    def __init__(self, path, force=False, enabled=True):
+        self.path = Path(path)
+        self.force = force
+        self.enabled = enabled
+        self.data = self._load() if enabled else {}
+
+    def _load(self) -> dict:
+        """Carga el estado si existe; en caso contrario, crea uno vacío."""
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            logging.error(f"Estado de etapas corrupto, se ignora: {self.path}", extra={"phase": "ETL"})
+            return {}
+
+    def save(self) -> None:
+        """Guarda el estado de forma atómica."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def matches(self, stage, stage_fingerprint) -> bool:
+        """Indica si la última ejecución correcta de `stage` tuvo la misma huella."""
+        entry = self.data.get(stage)
+        return bool(entry) and entry["fingerprint"] == stage_fingerprint
+
+    def record(self, stage, stage_fingerprint) -> None:
+        """Registra una ejecución correcta de `stage` y guarda el estado."""
+        self.data[stage] = {"fingerprint": stage_fingerprint, "finished_at": datetime.now().isoformat(timespec="seconds")}
+        self.save()
+
+    def invalidate(self, stage) -> None:
+        """Olvida la última ejecución de `stage`."""
+        if self.data.pop(stage, None) is not None:
+            self.save()
+
+    def run(self, stage, fingerprint_fn, func, *args, outputs=(), **kwargs):
+        """Ejecuta `func` salvo que la huella de la etapa coincida con la última ejecución correcta.
+        La huella se vuelve a calcular al terminar, porque la etapa puede cambiar parte de su
+        propia entrada (la carga modifica el estado de la tabla destino). Antes de ejecutar se
+        olvida la huella anterior: si la etapa falla a medias, la siguiente ejecución la repite.
+        Args:
+            stage (str): Nombre de la etapa.
+            fingerprint_fn (callable): Función sin argumentos que calcula la huella de la etapa.
+            func (callable): Función de la etapa.
+            outputs (list): Rutas que deben existir para poder omitir la etapa.
+        Returns:
+            El resultado de `func`, o None si la etapa se omite.
+        """
+        if not self.enabled:
+            return func(*args, **kwargs)
+        stage_fingerprint = fingerprint_fn()
+        missing = [str(path) for path in outputs if not Path(path).exists()]
+        if not self.force and not missing and self.matches(stage, stage_fingerprint):
+            logging.info(f"Etapa {stage} sin cambios (huella {stage_fingerprint[:12]}), se omite.", extra={"phase": "ETL"})
+            METRICS.set("stage_skipped", 1, stage=stage)
+            return None
+        reason = "forzada" if self.force else f"faltan salidas {missing}" if missing else "entradas o configuración modificadas"
+        logging.info(f"Se ejecuta la etapa {stage}: {reason}.", extra={"phase": "ETL"})
+        METRICS.set("stage_skipped", 0, stage=stage)
+        self.invalidate(stage)
+        result = func(*args, **kwargs)
+        self.record(stage, fingerprint_fn())
+        return result
@@ -1,150 +1,293 @@
+import os
 import json
 import logging
 from pathlib import Path
-import pandas as pd
+from itertools import repeat
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 import pyarrow as pa
-import pyarrow.parquet as pq
+import pyarrow.compute as pc
+from pokemon_etl.raw_store import RawStore, iter_records
+from pokemon_etl.codec import Decoder, DECODE_ERRORS
+from pokemon_etl.metrics import METRICS
+from pokemon_etl.sinks import DEFAULT_OUTPUTS, build_sinks, write_sinks
+from pokemon_etl.fields import POKEMON_FIELDS, SPECIES_FIELDS, compile_fields, fields_schema
+from pokemon_etl.linked import join_linked
 
-def load_species(raw_species_path, generations):
-    """Carga las especies de Pokémon desde archivos JSON crudos.
+def build_batches(records, extractor, schema, batch_size=1000):
+    """Convierte un flujo de registros crudos en RecordBatches de Arrow de tamaño acotado.
+    Cada columna se acumula en su propio buffer y se convierte al tipo del esquema al
+    cerrar el lote, de modo que la memoria de la conversión depende de `batch_size` y no
+    del total; quien consume los lotes decide si los acumula.
+    Args:
+        records (iterable): Registros crudos.
+        extractor (callable): Extractor compilado que convierte un registro crudo en un diccionario de columnas.
+        schema (pa.Schema): Esquema de los lotes.
+        batch_size (int): Número máximo de filas por lote.
+    Returns:
+        generator: RecordBatches de Arrow.
+    """
+    names = schema.names
+    columns = {name: [] for name in names}
+    rows = 0
+    for record in records:
+        extracted = extractor(record)
+        if extracted is None:
+            logging.error("Error al procesar el registro: El objeto no es un diccionario.", extra={"phase": "TRANSFORM"})
+            continue
+        for name in names:
+            columns[name].append(extracted[name])
+        rows += 1
+        if rows == batch_size:
+            yield pa.RecordBatch.from_arrays([pa.array(columns[field.name], type=field.type) for field in schema], schema=schema)
+            columns = {name: [] for name in names}
+            rows = 0
+    if rows:
+        yield pa.RecordBatch.from_arrays([pa.array(columns[field.name], type=field.type) for field in schema], schema=schema)
+
+@lru_cache(maxsize=8)
+def _compiled(fields_key):
+    """Compila una especificación de campos una sola vez por proceso."""
+    return compile_fields(json.loads(fields_key))
+
+@lru_cache(maxsize=8)
+def _decoder(json_backend, fields_key, typed_decode):
+    """Crea el decodificador JSON una sola vez por proceso."""
+    return Decoder(json_backend, json.loads(fields_key) if typed_decode else None)
+
+def transform_file(path, fields, batch_size=1000, json_backend="auto", typed_decode=True):
+    """Transforma un archivo crudo en un buffer Arrow IPC.
+    Se ejecuta dentro de los procesos del pool: devuelve columnas compactas en lugar de
+    listas de diccionarios para que el paso de resultados entre procesos sea barato. El
+    buffer contiene el archivo completo.
+    Args:
+        path (Path): Ruta del archivo crudo.
+        fields (list): Especificación declarativa de las columnas a extraer.
+        batch_size (int): Número máximo de filas por lote.
+        json_backend (str): Decodificador JSON ('auto', 'orjson', 'msgspec' o 'json').
+        typed_decode (bool): Decodifica solo las claves que usa `fields` si msgspec está instalado.
+    Returns:
+        bytes: Tabla del archivo serializada en formato Arrow IPC stream.
+    """
+    schema = fields_schema(fields)
+    fields_key = json.dumps(fields, sort_keys=True)
+    extractor = _compiled(fields_key)
+    decoder = _decoder(json_backend, fields_key, typed_decode)
+    sink = pa.BufferOutputStream()
+    rows = 0
+    with pa.ipc.new_stream(sink, schema) as writer:
+        try:
+            for batch in build_batches(iter_records(path, decoder), extractor, schema, batch_size):
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        except DECODE_ERRORS:
+            logging.error(f"Error al decodificar JSON en el archivo: {path}", extra={"phase": "TRANSFORM"})
+    logging.info(f"Se han transformado {rows} registros de {Path(path).name}.", extra={"phase": "TRANSFORM"})
+    return sink.getvalue().to_pybytes()
+
+def transform_files(files, fields, batch_size=1000, workers=1, json_backend="auto", typed_decode=True):
+    """Transforma varios archivos crudos, en paralelo si `workers` es mayor que 1.
+    Cada archivo se procesa en un proceso del pool y el resultado se concatena en orden. El
+    buffer IPC de cada archivo se lee en cuanto llega y no se conserva aparte de su tabla,
+    pero la tabla devuelta contiene todos los archivos: la memoria del modo `staged` crece
+    con el total de datos transformados (el modo `fused` la mantiene acotada).
+    Args:
+        files (list): Rutas de los archivos crudos.
+        fields (list): Especificación declarativa de las columnas a extraer.
+        batch_size (int): Número máximo de filas por lote.
+        workers (int): Número de procesos. 0 usa todos los núcleos disponibles.
+        json_backend (str): Decodificador JSON ('auto', 'orjson', 'msgspec' o 'json').
+        typed_decode (bool): Decodifica solo las claves que usa `fields` si msgspec está instalado.
+    Returns:
+        pa.Table: Tabla con los registros transformados.
+    """
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(files)) or 1
+    decoder = _decoder(json_backend, json.dumps(fields, sort_keys=True), typed_decode)
+    logging.info(f"Decodificación JSON en modo {decoder.mode} con {workers} procesos.", extra={"phase": "TRANSFORM"})
+    args = (repeat(fields), repeat(batch_size), repeat(json_backend), repeat(typed_decode))
+    if workers == 1:
+        tables = [pa.ipc.open_stream(buffer).read_all() for buffer in map(transform_file, files, *args)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            tables = [pa.ipc.open_stream(buffer).read_all() for buffer in executor.map(transform_file, files, *args)]
+    return pa.concat_tables(tables) if tables else fields_schema(fields).empty_table()
+
+def species_files(raw_species_path, generations):
+    """Obtiene los archivos crudos de las generaciones indicadas.
     Args:
         raw_species_path (Path): Ruta donde se encuentran los archivos crudos de especies.
-        generations (list): Lista de generaciones a cargar.
+        generations (list): Lista de generaciones.
     Returns:
-        list: Lista de especies de Pokémon.
+        list: Rutas de los archivos existentes.
     """
-    species = []
+    store = RawStore(raw_species_path)
+    files = []
     for generation in generations:
-        try:
-            with open(f"{raw_species_path}/{generation}.json", "r", encoding="utf-8") as file:
-                pokemon_gens = json.load(file)
-                species.extend(pokemon_gens)
-            logging.info(f"Se han cargado {len(pokemon_gens)} especies de la generación {generation}.", extra={"phase": "TRANSFORM"})
-        except FileNotFoundError:
-            logging.error(f"Archivo no encontrado: {raw_species_path}/{generation}.json", extra={"phase": "TRANSFORM"})
-            continue
-        except json.JSONDecodeError:
-            logging.error(f"Error al decodificar JSON en el archivo: {raw_species_path}/{generation}.json", extra={"phase": "TRANSFORM"})
+        path = store.find(generation)
+        if path is None:
+            logging.error(f"Archivo no encontrado: {raw_species_path}/{generation}", extra={"phase": "TRANSFORM"})
             continue
-    return species
+        files.append(path)
+    return files
 
-def transform_species(raw_species_path, generations):
-    """Transforma las especies de Pokémon cargadas desde archivos JSON crudos.
+def species_table(raw_species_path, generations, batch_size=1000, fields=SPECIES_FIELDS, workers=1, json_backend="auto", typed_decode=True):
+    """Transforma las especies de Pokémon cargadas desde archivos crudos en una tabla Arrow.
     Args:
         raw_species_path (Path): Ruta donde se encuentran los archivos crudos de especies.
         generations (list): Lista de generaciones a transformar.
+        batch_size (int): Número máximo de filas por lote.
+        fields (list): Especificación declarativa de las columnas a extraer.
+        workers (int): Número de procesos para transformar los archivos en paralelo.
+        json_backend (str): Decodificador JSON ('auto', 'orjson', 'msgspec' o 'json').
+        typed_decode (bool): Decodifica solo las claves que usa `fields` si msgspec está instalado.
     Returns:
-        pd.DataFrame: DataFrame con las especies transformadas.
-    """    
-    pokemon_species= load_species(raw_species_path, generations)
-    species_data = []
-    for species in pokemon_species:
-        try:
-            if not isinstance(species, dict):
-                raise ValueError("El objeto no es un diccionario.")
-        except ValueError as e:
-            logging.error(f"Error al procesar la especie: {e}", extra={"phase": "TRANSFORM"})
-            continue
-        extracted_data = {
-            "species_id": species["id"],
-            "name": species["name"],
-            "color": species["color"]["name"],
-            "habitat": species["habitat"]["name"] if species.get("habitat") else None,
-            "generation": species["generation"]["name"],
-            "previous_evolution": species["evolves_from_species"]["name"] if species.get("evolves_from_species") else None,
-            "is_mythical": species["is_mythical"],
-            "is_baby": species["is_baby"],
-            "is_legendary": species["is_legendary"],
-            "nat_pokedex_entry" : next(
-                (entry["entry_number"] for entry in species["pokedex_numbers"] if entry["pokedex"]["name"] == "national"),
-                None
-            )
-        }
-        species_data.append(extracted_data)
-    df_species = pd.DataFrame(species_data)
-    return df_species
+        pa.Table: Tabla con las especies transformadas.
+    """
+    files = species_files(raw_species_path, generations)
+    return transform_files(files, fields, batch_size, workers, json_backend, typed_decode)
 
-def load_pokemons(raw_pokemon_path):
-    """Carga los Pokémon desde archivos JSON crudos.
+def pokemon_table(raw_pokemon_path, batch_size=1000, fields=POKEMON_FIELDS, workers=1, json_backend="auto", typed_decode=True):
+    """Transforma los Pokémon cargados desde archivos crudos en una tabla Arrow.
     Args:
         raw_pokemon_path (Path): Ruta donde se encuentran los archivos crudos de Pokémon.
+        batch_size (int): Número máximo de filas por lote.
+        fields (list): Especificación declarativa de las columnas a extraer.
+        workers (int): Número de procesos para transformar los archivos en paralelo.
+        json_backend (str): Decodificador JSON ('auto', 'orjson', 'msgspec' o 'json').
+        typed_decode (bool): Decodifica solo las claves que usa `fields` si msgspec está instalado.
     Returns:
-        list: Lista de Pokémon.
+        pa.Table: Tabla con los Pokémon transformados.
     """
-    pokemons = []
-    ruta = Path(raw_pokemon_path)
-    files = [f.name for f in ruta.iterdir() if f.is_file()]
-    for file in files:
-        try:
-            with open(f"{raw_pokemon_path}/{file}", "r", encoding="utf-8") as file:
-                page_data = json.load(file)
-                pokemons.extend(page_data)
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Archivo no encontrado: {file}")
-        except json.JSONDecodeError:
-            logging.error(f"Error al decodificar JSON en el archivo: {file}")
-            continue
-    logging.info(f"Se han cargado {len(pokemons)} Pokémon desde los archivos crudos.", extra={"phase": "TRANSFORM"}) 
-    return pokemons
+    files = RawStore(raw_pokemon_path).files("pokemon_page_")
+    return transform_files(files, fields, batch_size, workers, json_backend, typed_decode)
 
-def transform_pokemones(raw_pokemon_path):
-    """Transforma los Pokémon cargados desde archivos JSON crudos.
+def joined_schema(pokemon_fields, species_fields):
+    """Esquema compacto de la tabla unida de Pokémon y especies.
+    Las columnas presentes en ambos lados llevan los sufijos `_x` (Pokémon) e `_y` (especies).
     Args:
-        raw_pokemon_path (Path): Ruta donde se encuentran los archivos crudos de Pokémon.
+        pokemon_fields (list): Especificación de campos de Pokémon.
+        species_fields (list): Especificación de campos de especies.
     Returns:
-        pd.DataFrame: DataFrame con los Pokémon transformados.
+        pa.Schema: Esquema de la tabla unida.
     """
-    pokemons= load_pokemons(raw_pokemon_path)
-    pokemons_data = []
-    for pokemon in pokemons:
-        extracted_data = {
-            "pokemon_id": pokemon["id"],
-            "name": pokemon["name"],
-            "hp_base_stat" : next(
-                (stats["base_stat"] for stats in pokemon["stats"] if stats["stat"]["name"] == "hp"),
-                None
-            ),
-            "attack_base_stat" : next(
-                (stats["base_stat"] for stats in pokemon["stats"] if stats["stat"]["name"] == "attack"),
-                None
-            ),
-            "defense_base_stat" : next(
-                (stats["base_stat"] for stats in pokemon["stats"] if stats["stat"]["name"] == "defense"),
-                None
-            ),
-            "special_attack_base_stat" : next(
-                (stats["base_stat"] for stats in pokemon["stats"] if stats["stat"]["name"] == "special-attack"),
-                None
-            ),
-            "special_defense_base_stat" : next(
-                (stats["base_stat"] for stats in pokemon["stats"] if stats["stat"]["name"] == "special-defense"),
-                None
-            ),
-            "speed_base_stat" : next(
-                (stats["base_stat"] for stats in pokemon["stats"] if stats["stat"]["name"] == "speed"),
-                None
-            ),
-            "type_1": pokemon["types"][0]["type"]["name"] if pokemon["types"] else None,
-            "type_2": pokemon["types"][1]["type"]["name"] if len(pokemon["types"]) > 1 else None
-        }
-        pokemons_data.append(extracted_data)
-    df_pokemons = pd.DataFrame(pokemons_data)
-    return df_pokemons
+    left, right = fields_schema(pokemon_fields), fields_schema(species_fields)
+    shared = set(left.names) & set(right.names)
+    return pa.schema(
+        [field.with_name(f"{field.name}_x") if field.name in shared else field for field in left]
+        + [field.with_name(f"{field.name}_y") if field.name in shared else field for field in right]
+    )
 
-def join_species_pokemons(raw_species_path, raw_pokemon_path, generations, processed_path, parquet_name, csv_name):
-    """Une los DataFrames de especies y Pokémon, y guarda el resultado en un archivo Parquet.
+def join_tables(pokemons, species, schema):
+    """Une las tablas Arrow de Pokémon y especies con un hash join nativo de Arrow.
+    Conserva todas las especies, en el mismo orden en que se leyeron (left outer join sobre
+    `species_id` = `pokemon_id`): `index_in` busca cada especie en una tabla hash de los
+    `pokemon_id` y `take` alinea las columnas de Pokémon, sin pasar por pandas ni ordenar.
+    Si un `pokemon_id` está repetido se toma su primera aparición. Las especies con un
+    `species_id` repetido también se reducen a su primera aparición: la tabla unida tiene
+    como máximo una fila por `species_id`, invariante del que depende el índice único de la
+    carga en PostgreSQL.
+    Args:
+        pokemons (pa.Table): Pokémon transformados.
+        species (pa.Table): Especies transformadas.
+        schema (pa.Schema): Esquema de la tabla unida (ver `joined_schema`).
+    Las claves sin pareja se registran con una muestra de hasta 10 claves de cada lado.
+    Returns:
+        tuple: (pa.Table unida, dict con las filas y las claves sin pareja de cada lado).
+    """
+    species_ids = species.column("species_id")
+    first = pc.index_in(species_ids, value_set=species_ids)
+    keep = pc.or_(pc.equal(first, pa.array(range(species.num_rows), first.type)), pc.is_null(species_ids))
+    repeated_species = species.num_rows - pc.sum(keep).as_py() if species.num_rows else 0
+    if repeated_species:
+        logging.warning(f"Hay {repeated_species} species_id repetidos; se usa la primera aparición.", extra={"phase": "TRANSFORM"})
+        species = species.filter(keep)
+    pokemon_ids = pokemons.column("pokemon_id")
+    duplicated = pokemons.num_rows - pc.count_distinct(pokemon_ids).as_py()
+    if duplicated:
+        logging.warning(f"Hay {duplicated} pokemon_id repetidos; se usa la primera aparición.", extra={"phase": "TRANSFORM"})
+    positions = pc.index_in(species.column("species_id"), value_set=pokemon_ids)
+    matched = pokemons.take(positions)
+    columns = matched.columns + species.columns
+    joined = pa.Table.from_arrays(columns, schema=schema)
+    quality = {
+        "rows": joined.num_rows,
+        "species_without_pokemon": positions.null_count,
+        "pokemon_without_species": pokemons.num_rows - duplicated - (len(positions) - positions.null_count),
+    }
+    if quality["species_without_pokemon"] or quality["pokemon_without_species"]:
+        species_sample = species.column("species_id").filter(pc.is_null(positions)).slice(0, 10).to_pylist()
+        orphans = pc.invert(pc.is_in(pokemon_ids, value_set=species.column("species_id")))
+        pokemon_sample = pokemon_ids.filter(orphans).slice(0, 10).to_pylist()
+        logging.warning(
+            f"Claves sin pareja en la unión: {quality['species_without_pokemon']} especies sin Pokémon "
+            f"(por ejemplo {species_sample}), {quality['pokemon_without_species']} Pokémon sin especie "
+            f"(por ejemplo {pokemon_sample}).",
+            extra={"phase": "TRANSFORM"},
+        )
+    return joined, quality
+
+def join_species_pokemons(raw_species_path, raw_pokemon_path, generations, processed_path, parquet_name, csv_name, batch_size=1000, extra_fields=None, workers=1, json_backend="auto", typed_decode=True,
+                          row_group_size=None, dataset_name=None, partition_by=None, write_metadata=True, outputs=DEFAULT_OUTPUTS,
+                          feather_name=None, linked_files=None):
+    """Une las tablas de especies y Pokémon, y guarda el resultado en las salidas habilitadas.
+    Todas las salidas (Parquet, CSV, Feather y dataset particionado) se escriben a la vez a
+    partir de la misma tabla Arrow.
     Args:
         raw_species_path (Path): Ruta donde se encuentran los archivos crudos de especies.
         raw_pokemon_path (Path): Ruta donde se encuentran los archivos crudos de Pokémon.
         generations (list): Lista de generaciones a procesar para las especies.
         processed_path (Path): Ruta donde se guardará el archivo Parquet resultante.
+        batch_size (int): Número máximo de filas por lote durante la transformación.
+        extra_fields (dict): Columnas adicionales por recurso ('pokemon', 'species') con el mismo formato que POKEMON_FIELDS.
+        workers (int): Número de procesos para transformar los archivos crudos en paralelo.
+        json_backend (str): Decodificador JSON ('auto', 'orjson', 'msgspec' o 'json').
+        typed_decode (bool): Decodifica solo las claves usadas por la transformación si msgspec está instalado.
+        row_group_size (int): Máximo de filas por grupo de filas Parquet. None usa el valor por defecto.
+        dataset_name (str): Directorio del dataset particionado dentro de `processed_path`.
+        partition_by (list): Columnas de partición del dataset, por ejemplo ['generation'].
+        write_metadata (bool): Escribe el resumen `_metadata` del dataset.
+        outputs (list): Salidas habilitadas: 'parquet', 'csv', 'feather' y/o 'dataset'.
+        feather_name (str): Nombre del archivo Feather (Arrow IPC).
+        linked_files (list): Archivos de recursos enlazados (cadenas evolutivas, tipos) de esta extracción a unir.
+    Returns:
+        dict: Filas de la tabla unida y claves sin pareja de cada lado.
+    """
+    extra_fields = extra_fields or {}
+    species_fields = SPECIES_FIELDS + extra_fields.get("species", [])
+    pokemon_fields = POKEMON_FIELDS + extra_fields.get("pokemon", [])
+    species = species_table(raw_species_path, generations, batch_size, species_fields, workers, json_backend, typed_decode)
+    pokemons = pokemon_table(raw_pokemon_path, batch_size, pokemon_fields, workers, json_backend, typed_decode)
+    return write_joined(pokemons, species, joined_schema(pokemon_fields, species_fields), processed_path, parquet_name, csv_name,
+                        row_group_size, dataset_name, partition_by, write_metadata, outputs, feather_name, linked_files)
+
+def write_joined(pokemons, species, schema, processed_path, parquet_name, csv_name, row_group_size=None, dataset_name=None,
+                 partition_by=None, write_metadata=True, outputs=DEFAULT_OUTPUTS, feather_name=None, linked_files=None):
+    """Une las tablas Arrow de Pokémon y especies y guarda el resultado en las salidas habilitadas.
+    Args:
+        pokemons (pa.Table): Pokémon transformados.
+        species (pa.Table): Especies transformadas.
+        schema (pa.Schema): Esquema de la tabla unida (ver `joined_schema`).
+        processed_path (Path): Directorio de las salidas.
+        parquet_name (str): Nombre del archivo Parquet.
+        csv_name (str): Nombre del archivo CSV.
+        row_group_size (int): Máximo de filas por grupo de filas Parquet.
+        dataset_name (str): Directorio del dataset particionado.
+        partition_by (list): Columnas de partición del dataset.
+        write_metadata (bool): Escribe el resumen `_metadata` del dataset.
+        outputs (list): Salidas habilitadas: 'parquet', 'csv', 'feather' y/o 'dataset'.
+        feather_name (str): Nombre del archivo Feather.
+        linked_files (list): Archivos de recursos enlazados a unir; None o vacío no añade columnas.
     Returns:
-        None
+        dict: Filas de la tabla unida y claves sin pareja de cada lado.
     """
-    df_species= transform_species(raw_species_path, generations)
-    df_pokemons = transform_pokemones(raw_pokemon_path)
-    df_combined = pd.merge(df_pokemons, df_species, left_on="pokemon_id", right_on="species_id", how="right")
-    table = pa.Table.from_pandas(df_combined)
-    pq.write_table(table, f"{processed_path}/{parquet_name}", compression="snappy")
-    df_combined.to_csv(f"{processed_path}/{csv_name}", index=False)
-    logging.info(f"Se ha guardado el DataFrame en formato parquet y CSV con {len(df_combined)} registros en {processed_path}", extra={"phase": "TRANSFORM"})
+    table, quality = join_tables(pokemons, species, schema)
+    if linked_files:
+        table = join_linked(table, linked_files)
+    METRICS.add_rows("TRANSFORM", table.num_rows)
+    METRICS.set("join_unmatched_keys", quality["species_without_pokemon"], side="species")
+    METRICS.set("join_unmatched_keys", quality["pokemon_without_species"], side="pokemon")
+    sinks = build_sinks(processed_path, outputs, parquet_name, csv_name, feather_name, dataset_name, row_group_size, partition_by, write_metadata)
+    write_sinks(table, sinks)
+    logging.info(f"Se ha guardado la tabla en {', '.join(outputs)} con {table.num_rows} registros en {processed_path}", extra={"phase": "TRANSFORM"})
+    return quality
@@ -0,0 +1,30 @@
+import asyncio
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+from benchmarks.mock_pokeapi import MockPokeAPI
+
+
+@contextmanager
+def serve_mock_api(**options):
+    """PokeAPI sintética servida desde un hilo, para poder contar sus solicitudes."""
+    api = MockPokeAPI(**{"count": 30, "generations": 2, "payload_kb": 0, **options})
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(api.start(), loop).result()
+    try:
+        yield api
+    finally:
+        asyncio.run_coroutine_threadsafe(api.stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+@pytest.fixture
+def mock_api():
+    with serve_mock_api() as api:
+        yield api
@@ -0,0 +1,106 @@
+import os
+import asyncio
+import sqlite3
+
+import pytest
+from aiohttp import web, ClientSession
+from aiohttp.test_utils import TestServer
+
+from pokemon_etl.cache import ResponseCache, CacheMissError
+from pokemon_etl.extract import fetch, read_cache
+
+
+def stored_urls(path):
+    with sqlite3.connect(path) as conn:
+        return {row[0] for row in conn.execute("SELECT url FROM responses")}
+
+
+def test_revalidates_stale_entry_with_304(tmp_path):
+    seen = []
+
+    async def handler(request):
+        seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.json_response({"name": "bulbasaur"}, headers={"ETag": '"v1"'})
+
+    async def run(cache):
+        app = web.Application()
+        app.router.add_get("/pokemon/1", handler)
+        async with TestServer(app) as server, ClientSession() as session:
+            url = str(server.make_url("/pokemon/1"))
+            first = await fetch(session, url, cache)
+            fetched_at = cache.get(url)["fetched_at"]
+            second = await fetch(session, url, cache)
+            return url, first, second, fetched_at
+
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttl_seconds=0)
+    url, first, second, fetched_at = asyncio.run(run(cache))
+    assert first == second == {"name": "bulbasaur"}
+    assert seen == [None, '"v1"']
+    assert cache.get(url)["fetched_at"] >= fetched_at
+    cache.close()
+    assert stored_urls(tmp_path / "cache.sqlite") == {url}
+
+
+def test_cache_only_serves_stale_entries_and_raises_on_miss(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    cache = ResponseCache(path, ttl_seconds=0)
+    cache.put("https://api/pokemon/1", b'{"id": 1}')
+    cache.close()
+
+    offline = ResponseCache(path, ttl_seconds=0, mode="cache_only")
+    data, _ = read_cache(offline, "https://api/pokemon/1")
+    assert data == {"id": 1}
+    with pytest.raises(CacheMissError):
+        read_cache(offline, "https://api/pokemon/2")
+    offline.close()
+
+
+def test_writes_are_buffered_until_commit_every(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    cache = ResponseCache(path, commit_every=3)
+    cache.put("u1", b"a")
+    cache.put("u2", b"b")
+    assert cache.get("u1")["body"] == b"a"
+    assert stored_urls(path) == set()
+    cache.put("u3", b"c")
+    assert stored_urls(path) == {"u1", "u2", "u3"}
+    cache.close()
+
+
+def test_processes_share_the_file(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    caches = [ResponseCache(path, commit_every=5, lock_timeout=5) for _ in range(3)]
+    for number in range(30):
+        caches[number % 3].put(f"u{number}", b"x" * number)
+    for cache in caches:
+        cache.close()
+    assert stored_urls(path) == {f"u{number}" for number in range(30)}
+
+
+def test_evicts_least_recently_used(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    cache = ResponseCache(path, max_size_mb=3000 / (1024 * 1024), commit_every=1)
+    for number in range(3):
+        cache.put(f"u{number}", os.urandom(900))
+    cache.get("u0")
+    cache.flush()
+    cache.put("u3", os.urandom(900))
+    cache.close()
+    assert stored_urls(path) == {"u0", "u3"}
+
+
+def test_purges_old_entries_on_open_except_offline(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    cache = ResponseCache(path)
+    cache.put("old", b"a")
+    cache.put("new", b"b")
+    cache.close()
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE responses SET fetched_at = fetched_at - 1000 WHERE url = 'old'")
+
+    ResponseCache(path, mode="cache_only", purge_after_seconds=500).close()
+    assert stored_urls(path) == {"old", "new"}
+    ResponseCache(path, purge_after_seconds=500).close()
+    assert stored_urls(path) == {"new"}
@@ -0,0 +1,66 @@
+import json
+import logging
+
+import pytest
+
+from pokemon_etl import codec
+from pokemon_etl.codec import Decoder, resolve_backend
+from pokemon_etl.raw_store import RawStore
+
+FIELDS = [{"name": "species_id", "path": "id"}, {"name": "color", "path": "color.name"}]
+RECORDS = [
+    {"id": 1, "name": "bulbasaur", "color": {"name": "green"}, "flavor_text_entries": [{"flavor_text": "..."}]},
+    {"id": 4, "name": "charmander", "color": {"name": "red"}, "flavor_text_entries": []},
+]
+
+
+@pytest.fixture
+def no_fast_backends(monkeypatch):
+    monkeypatch.setattr(codec, "orjson", None)
+    monkeypatch.setattr(codec, "msgspec", None)
+    monkeypatch.setattr(codec, "_typed_fallback_warned", False)
+
+
+def test_resolve_backend_prefers_the_fastest_installed(monkeypatch):
+    monkeypatch.setattr(codec, "orjson", object())
+    assert resolve_backend("auto") == "orjson"
+    monkeypatch.setattr(codec, "orjson", None)
+    monkeypatch.setattr(codec, "msgspec", object())
+    assert resolve_backend("auto") == "msgspec"
+    monkeypatch.setattr(codec, "msgspec", None)
+    assert resolve_backend("auto") == "json"
+    assert resolve_backend("json") == "json"
+
+
+def test_resolve_backend_rejects_unknown_and_missing(no_fast_backends):
+    with pytest.raises(ValueError, match="no soportado"):
+        resolve_backend("simdjson")
+    for backend in ("orjson", "msgspec"):
+        with pytest.raises(ImportError, match=backend):
+            resolve_backend(backend)
+
+
+def test_typed_decode_without_msgspec_warns_once(no_fast_backends, caplog):
+    with caplog.at_level(logging.WARNING):
+        decoders = [Decoder("auto", FIELDS), Decoder("auto", FIELDS)]
+    assert len([record for record in caplog.records if "msgspec" in record.message]) == 1
+    assert all(not decoder.typed and decoder.mode == "json" for decoder in decoders)
+    assert decoders[0].decode(json.dumps(RECORDS[0]).encode()) == RECORDS[0]
+
+
+def test_decode_array_reads_legacy_json_files(tmp_path):
+    path = tmp_path / "generation-i.json"
+    path.write_text(json.dumps(RECORDS, indent=4), encoding="utf-8")
+    assert list(RawStore(tmp_path).read("generation-i")) == RECORDS
+
+    full = Decoder("json")
+    assert full.mode == "json" and full.decode_array(path.read_bytes()) == RECORDS
+
+
+def test_typed_decode_keeps_only_used_keys(tmp_path):
+    pytest.importorskip("msgspec")
+    decoder = Decoder("auto", FIELDS)
+    assert decoder.mode == "typed"
+    expected = [{"id": 1, "color": {"name": "green"}}, {"id": 4, "color": {"name": "red"}}]
+    assert decoder.decode_array(json.dumps(RECORDS, indent=4).encode()) == expected
+    assert decoder.decode(json.dumps(RECORDS[1]).encode()) == expected[1]
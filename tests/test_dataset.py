@@ -0,0 +1,70 @@
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import pytest
+
+from pokemon_etl import dataset
+from pokemon_etl.dataset import METADATA_NAME, open_dataset, read_dataset, write_dataset
+
+
+def pokemon_table(generations=("generation-i", "generation-ii")):
+    types = ["fire", "grass", "water"]
+    rows = [
+        {"species_id": i, "name": f"pokemon-{i}", "generation": generation, "type_1": types[i % 3]}
+        for i, generation in enumerate([g for g in generations for _ in range(6)], 1)
+    ]
+    rows.sort(key=lambda row: (row["generation"], row["type_1"]))
+    return pa.Table.from_pylist(rows)
+
+
+def test_write_dataset_uses_hive_layout_and_metadata(tmp_path):
+    table = pokemon_table()
+    write_dataset(table, tmp_path / "pokemon", ["generation"], row_group_size=2)
+
+    path = tmp_path / "pokemon"
+    assert sorted(p.name for p in path.iterdir() if p.is_dir()) == ["generation=generation-i", "generation=generation-ii"]
+    metadata = pq.read_metadata(path / METADATA_NAME)
+    assert metadata.num_rows == table.num_rows
+    assert metadata.num_row_groups == 6
+    assert "generation" not in metadata.schema.names
+    assert read_dataset(path).num_rows == table.num_rows
+
+
+def test_read_dataset_prunes_partitions_and_row_groups(tmp_path):
+    write_dataset(pokemon_table(), tmp_path / "pokemon", ["generation"], row_group_size=2)
+    path = tmp_path / "pokemon"
+    filters = [("generation", "=", "generation-ii"), ("type_1", "=", "fire")]
+
+    table = read_dataset(path, filters, columns=["species_id", "generation", "type_1"])
+    assert table.num_rows == 2
+    assert set(table.column("generation").to_pylist()) == {"generation-ii"}
+    assert set(table.column("type_1").to_pylist()) == {"fire"}
+
+    expression = pq.filters_to_expression(filters)
+    fragments = list(open_dataset(path).get_fragments(filter=expression))
+    assert len(fragments) == 1
+    assert fragments[0].num_row_groups == 3
+    row_groups = fragments[0].split_by_row_group(pc.field("type_1") == "fire")
+    assert len(row_groups) == 1
+
+
+def test_rewrite_replaces_old_partitions(tmp_path):
+    path = tmp_path / "pokemon"
+    write_dataset(pokemon_table(), path, ["generation"])
+    write_dataset(pokemon_table(("generation-iii",)), path, ["generation"])
+
+    assert sorted(p.name for p in path.iterdir() if p.is_dir()) == ["generation=generation-iii"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["pokemon"]
+
+
+def test_failed_write_keeps_previous_dataset(tmp_path, monkeypatch):
+    path = tmp_path / "pokemon"
+    write_dataset(pokemon_table(), path, ["generation"])
+
+    def fail(*args, **kwargs):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(dataset.ds, "write_dataset", fail)
+    with pytest.raises(OSError):
+        write_dataset(pokemon_table(("generation-iii",)), path, ["generation"])
+    assert read_dataset(path).num_rows == 12
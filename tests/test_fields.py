@@ -0,0 +1,91 @@
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from pokemon_etl.fields import POKEMON_FIELDS, SPECIES_FIELDS, compile_fields, fields_schema, parse_path, to_pandas
+from pokemon_etl.transform import build_batches
+
+
+def pokemon(**overrides):
+    record = {
+        "id": 25,
+        "name": "pikachu",
+        "stats": [{"base_stat": 35, "stat": {"name": "hp"}}, {"base_stat": 90, "stat": {"name": "speed"}}],
+        "types": [{"slot": 1, "type": {"name": "electric"}}],
+    }
+    record.update(overrides)
+    return record
+
+
+def test_parse_path_steps():
+    assert parse_path("types[1].type.name") == [("key", "types"), ("index", 1), ("key", "type"), ("key", "name")]
+    assert parse_path("stats[stat.name=special-attack].base_stat") == [
+        ("key", "stats"), ("lookup", ["stat", "name"], "special-attack"), ("key", "base_stat"),
+    ]
+    with pytest.raises(ValueError):
+        parse_path("stats[")
+
+
+def test_missing_keys_and_list_indexes():
+    extract = compile_fields(POKEMON_FIELDS)
+    row = extract(pokemon())
+    assert row["pokemon_id"] == 25
+    assert (row["hp_base_stat"], row["speed_base_stat"], row["attack_base_stat"]) == (35, 90, None)
+    assert (row["type_1"], row["type_2"]) == ("electric", None)
+    row = extract({"id": 1})
+    assert set(row.values()) == {1, None}
+    assert extract(["not", "a", "dict"]) is None
+
+
+def test_null_intermediates_and_defaults():
+    fields = SPECIES_FIELDS + [{"name": "shape", "path": "shape.name", "dtype": "string", "default": "unknown"}]
+    extract = compile_fields(fields)
+    row = extract({"id": 7, "habitat": None, "shape": None, "evolves_from_species": None, "pokedex_numbers": None})
+    assert (row["habitat"], row["previous_evolution"], row["nat_pokedex_entry"]) == (None, None, None)
+    assert row["shape"] == "unknown"
+    row = extract({"id": 7, "pokedex_numbers": [{"entry_number": 3, "pokedex": None}, {"entry_number": 7, "pokedex": {"name": "national"}}]})
+    assert row["nat_pokedex_entry"] == 7
+
+
+def test_malformed_values_do_not_raise():
+    extract = compile_fields(POKEMON_FIELDS)
+    row = extract(pokemon(stats="oops", types=[None, 5]))
+    assert row["hp_base_stat"] is None
+    assert (row["type_1"], row["type_2"]) == (None, None)
+
+
+def test_rejects_bad_specs():
+    with pytest.raises(ValueError):
+        compile_fields([{"name": "a", "path": "id"}, {"name": "a", "path": "name"}])
+    with pytest.raises(ValueError):
+        compile_fields([{"name": "a", "path": "id", "dtype": "uint8"}])
+    with pytest.raises(ValueError):
+        compile_fields([{"name": "a", "path": "x[k=1].y[k=2]"}])
+
+
+def test_int16_overflow_fails_instead_of_wrapping():
+    extract = compile_fields(POKEMON_FIELDS)
+    schema = fields_schema(POKEMON_FIELDS)
+    assert list(build_batches([pokemon(id=32767)], extract, schema))[0].column("pokemon_id").to_pylist() == [32767]
+    with pytest.raises(pa.ArrowInvalid):
+        list(build_batches([pokemon(id=32768)], extract, schema))
+
+
+def test_category_columns_are_dictionaries():
+    extract = compile_fields(POKEMON_FIELDS)
+    schema = fields_schema(POKEMON_FIELDS)
+    records = [pokemon(), pokemon(id=4, types=[{"type": {"name": "fire"}}, {"type": {"name": "electric"}}]), pokemon(id=5, types=[])]
+    batch = next(build_batches(records, extract, schema))
+    assert batch.schema.field("type_1").type == pa.dictionary(pa.int16(), pa.string())
+    frame = to_pandas(batch)
+    assert isinstance(frame["type_1"].dtype, pd.CategoricalDtype)
+    assert set(frame["type_1"].cat.categories) == {"electric", "fire"}
+    assert frame["type_1"].isna().tolist() == [False, False, True]
+    assert frame["pokemon_id"].dtype == pd.Int16Dtype()
+
+
+def test_lookup_skips_malformed_elements():
+    extract = compile_fields(POKEMON_FIELDS)
+    stats = [{"base_stat": 1, "stat": None}, {"base_stat": 35, "stat": {"name": "hp"}}, {"base_stat": 90, "stat": {"name": "speed"}}]
+    row = extract(pokemon(stats=stats))
+    assert (row["hp_base_stat"], row["speed_base_stat"]) == (35, 90)
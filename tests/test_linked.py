@@ -0,0 +1,40 @@
+import pyarrow as pa
+
+from pokemon_etl.extract import run_extraction
+from pokemon_etl.linked import join_linked, linked_records
+from pokemon_etl.raw_store import RawStore
+
+
+def type_record(type_id, name, weak_to=()):
+    relations = {"double_damage_from": [{"name": attacker} for attacker in weak_to], "half_damage_from": [], "no_damage_from": []}
+    return {"id": type_id, "name": name, "damage_relations": relations}
+
+
+def test_reads_only_the_files_of_this_run(tmp_path):
+    store = RawStore(tmp_path)
+    store.write("type", [type_record(1, "stale")])
+    store.write("type_pokemon_1_50", [type_record(1, "fire", ["water"])])
+    store.write("type_pokemon_51_100", [type_record(1, "fire"), type_record(2, "water", ["grass"])])
+    store.write("type_pokemon_101_150", [type_record(3, "leftover")])
+    fresh = [store.find("type_pokemon_1_50"), store.find("type_pokemon_51_100")]
+
+    records = linked_records(fresh, "type")
+    assert [record["name"] for record in records] == ["fire", "water"]
+
+    table = pa.table({"type_1": ["fire", "water", "leftover"], "type_2": pa.array([None, None, None], pa.string())})
+    joined = join_linked(table, fresh)
+    assert joined.column("weak_to").to_pylist() == ["water", "grass", None]
+    assert join_linked(table, []).column_names == ["type_1", "type_2"]
+
+
+def test_crawler_requests_each_linked_url_once(tmp_path, mock_api):
+    crawl_links = {"species": ["evolution_chain.url"], "pokemon": ["types[].type.url"]}
+    linked_files = run_extraction(tmp_path / "species", tmp_path / "pokemon", mock_api.base_url, mock_api.generations,
+                                  page_size=5, crawl_links=crawl_links, raw_linked_path=tmp_path / "linked")
+
+    linked = {path: hits for path, hits in mock_api.paths.items() if "/type/" in path or "/evolution-chain/" in path}
+    assert set(linked.values()) == {1}
+    assert sum("/type/" in path for path in linked) == 10
+    assert sum("/evolution-chain/" in path for path in linked) == 10
+    assert len(linked_records(linked_files, "type")) == 10
+    assert len(linked_records(linked_files, "evolution-chain")) == 10
@@ -0,0 +1,158 @@
+import io
+import os
+import csv
+import struct
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from pokemon_etl import load
+from pokemon_etl.load import HASH_COLUMN, _changed_rows, binary_chunks, csv_chunks, load_batches, load_schema, with_row_hash
+from pokemon_etl.transform import join_tables, joined_schema
+from pokemon_etl.fields import POKEMON_FIELDS, SPECIES_FIELDS, fields_schema
+
+TEST_DB_URL = os.environ.get("POKEMON_ETL_TEST_DB_URL")
+
+TEXTS = ['comillas "dobles"', "", None, "línea\nnueva", "coma, y \\barra", "ñandú"]
+
+
+def sample_batch():
+    return pa.record_batch({
+        "species_id": pa.array([1, 2, 3, 4, 5, 6], pa.int16()),
+        "name": pa.array(TEXTS, pa.string()),
+        "color": pa.array(["red", None, "", "red", "blue", None]).dictionary_encode(),
+        "weight": pa.array([10, None, 30, 40, -50, 32767], pa.int16()),
+        "is_baby": pa.array([True, False, None, True, False, None]),
+        "ratio": pa.array([0.5, None, 1.0, -2.25, 0.0, 1e10], pa.float64()),
+    })
+
+
+def test_csv_distinguishes_null_from_empty_string():
+    data = b"".join(csv_chunks([sample_batch()])).decode("utf-8")
+    rows = data.split("\n")
+    assert rows[0] == '1,"comillas ""dobles""","red",10,true,0.5'
+    assert rows[1] == '2,"",,,false,'
+    assert rows[2] == '3,,"",30,,1'
+    parsed = list(csv.reader(io.StringIO(data)))
+    assert [row[1] for row in parsed] == ['comillas "dobles"', "", "", "línea\nnueva", "coma, y \\barra", "ñandú"]
+    assert b"".join(csv_chunks([])) == b""
+
+
+def decode_binary(data, types):
+    assert data.startswith(b"PGCOPY\n\xff\r\n\x00") and data.endswith(struct.pack(">h", -1))
+    offset, rows = 19, []
+    formats = {"h": ">h", "?": ">?", "d": ">d"}
+    while True:
+        (count,) = struct.unpack_from(">h", data, offset)
+        offset += 2
+        if count == -1:
+            return rows
+        row = []
+        for kind in types:
+            (size,) = struct.unpack_from(">i", data, offset)
+            offset += 4
+            if size == -1:
+                row.append(None)
+                continue
+            value = data[offset:offset + size]
+            offset += size
+            row.append(value.decode("utf-8") if kind == "s" else struct.unpack(formats[kind], value)[0])
+        rows.append(row)
+
+
+def test_binary_encodes_nulls_empty_strings_and_types():
+    batch = sample_batch()
+    data = b"".join(binary_chunks([batch.slice(0, 3), batch.slice(3)], batch.schema))
+    rows = decode_binary(data, ["h", "s", "s", "h", "?", "d"])
+    assert rows == [list(row.values()) for row in batch.to_pylist()]
+    assert [row[1] for row in rows] == TEXTS
+    assert decode_binary(b"".join(binary_chunks([], batch.schema)), []) == []
+
+
+def test_changed_rows_counts_inserts_updates_and_unchanged():
+    batch = sample_batch()
+    counts = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    first = list(_changed_rows([batch], {}, counts, set()))
+    assert counts["inserted"] == 6 and sum(part.num_rows for part in first) == 6
+    stored = dict(zip(first[0].column("species_id").to_pylist(), first[0].column(HASH_COLUMN).to_pylist()))
+
+    changed = batch.to_pydict()
+    changed["name"][2] = "nuevo"
+    changed["species_id"][5] = 7
+    counts = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    seen = set()
+    written = list(_changed_rows([pa.record_batch(changed, schema=batch.schema)], stored, counts, seen))
+    assert counts == {"inserted": 1, "updated": 1, "deleted": 0, "unchanged": 4}
+    assert [row["species_id"] for part in written for row in part.to_pylist()] == [3, 7]
+    assert stored.keys() - seen == {6}
+
+
+def test_row_hash_distinguishes_null_from_empty_string():
+    hashes = with_row_hash(pa.record_batch({"species_id": pa.array([1, 1], pa.int16()), "name": ["", None]})).column(HASH_COLUMN)
+    assert hashes[0] != hashes[1]
+
+
+def test_join_keeps_one_row_per_species_id():
+    schema = fields_schema(SPECIES_FIELDS)
+    species = pa.table({field.name: pa.nulls(5, field.type) for field in schema}, schema=schema)
+    species = species.set_column(0, "species_id", pa.array([1, 2, 1, None, None], pa.int16()))
+    species = species.set_column(1, "name", pa.array(["a", "b", "a-dup", None, None]))
+    joined, quality = join_tables(fields_schema(POKEMON_FIELDS).empty_table(), species, joined_schema(POKEMON_FIELDS, SPECIES_FIELDS))
+    assert joined.column("species_id").to_pylist() == [1, 2, None, None]
+    assert joined.column("name_y").to_pylist() == ["a", "b", None, None]
+    assert quality["rows"] == 4
+
+
+def test_load_reads_only_the_table_columns(tmp_path, monkeypatch):
+    batch = sample_batch()
+    pq.write_table(pa.Table.from_batches([batch]), tmp_path / "pokemon.parquet")
+    captured = {}
+
+    def fake_load(engine, batches, schema, *args):
+        captured["schema"] = schema
+        captured["columns"] = {tuple(part.schema.names) for part in batches}
+
+    monkeypatch.setattr(load, "connect_to_postgresql", lambda *args: None)
+    monkeypatch.setattr(load, "load_batches", fake_load)
+    load.load_pokemons_to_db(tmp_path, "pokemon.parquet", "u", "p", "h", "db", 5432, "copy", columns=["name", "species_id"])
+    assert captured["schema"].names == ["name", "species_id"]
+    assert captured["columns"] == {("name", "species_id")}
+
+    load.load_pokemons_to_db(tmp_path, "pokemon.parquet", "u", "p", "h", "db", 5432, "copy")
+    assert captured["schema"].names == batch.schema.names
+    with pytest.raises(ValueError):
+        load_schema(batch.schema, ["name", "weak_to"])
+
+
+@pytest.mark.postgres
+@pytest.mark.skipif(not TEST_DB_URL, reason="POKEMON_ETL_TEST_DB_URL no definida")
+@pytest.mark.parametrize("copy_format", ["csv", "binary"])
+def test_copy_and_upsert_round_trip(copy_format):
+    from sqlalchemy import create_engine, text
+
+    table_name = f"pokemons_test_{copy_format}"
+    engine = create_engine(TEST_DB_URL)
+    batch = sample_batch()
+    try:
+        load_batches(engine, [batch], batch.schema, "copy", copy_format, table_name)
+        with engine.connect() as conn:
+            rows = conn.execute(text(f'SELECT species_id, name, color, weight, is_baby, ratio FROM "{table_name}" ORDER BY species_id')).fetchall()
+        assert [list(row) for row in rows] == [list(row.values()) for row in batch.to_pylist()]
+
+        with engine.begin() as conn:
+            conn.execute(text(f'DROP TABLE "{table_name}"'))
+        assert load_batches(engine, [batch], batch.schema, "upsert", copy_format, table_name)["inserted"] == 6
+        assert load_batches(engine, [batch], batch.schema, "upsert", copy_format, table_name)["unchanged"] == 6
+        changed = batch.to_pydict()
+        changed["name"][2] = "nuevo"
+        changed["species_id"][5] = 7
+        counts = load_batches(engine, [pa.record_batch(changed, schema=batch.schema)], batch.schema, "upsert", copy_format, table_name)
+        assert counts == {"inserted": 1, "updated": 1, "deleted": 1, "unchanged": 3}
+        with engine.connect() as conn:
+            rows = conn.execute(text(f'SELECT species_id, name FROM "{table_name}" ORDER BY species_id')).fetchall()
+        assert [list(row) for row in rows] == [[1, TEXTS[0]], [2, ""], [3, "nuevo"], [4, TEXTS[3]], [5, TEXTS[4]], [7, None]]
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f'DROP TABLE IF EXISTS "{table_name}"'))
+        engine.dispose()
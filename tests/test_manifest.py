@@ -0,0 +1,43 @@
+import pytest
+
+from pokemon_etl.cache import ResponseCache
+from pokemon_etl.extract import run_extraction
+from pokemon_etl.manifest import ExtractManifest
+
+from tests.conftest import serve_mock_api
+
+
+def extract(api, tmp_path, cache=None):
+    manifest = ExtractManifest(tmp_path / "manifest.json")
+    before = api.requests
+    run_extraction(tmp_path / "species", tmp_path / "pokemon", api.base_url, api.generations, page_size=5,
+                   cache=cache, manifest=manifest)
+    return manifest, api.requests - before
+
+
+def test_second_run_revalidates_pages_through_cache(tmp_path, mock_api):
+    cache = ResponseCache(tmp_path / "cache.db", ttl_seconds=0)
+    try:
+        first, requests = extract(mock_api, tmp_path, cache)
+        assert first.data["pokemon"]["pages"] == {} and first.data["species"]["generations"] == {}
+        assert first.changed == 60
+
+        second, again = extract(mock_api, tmp_path, cache)
+    finally:
+        cache.close()
+    assert again == requests
+    assert mock_api.not_modified == requests
+    assert second.changed == 0
+
+
+def test_failed_run_resumes_and_success_resets_progress(tmp_path):
+    with serve_mock_api(error_rate=0.1, seed=3) as api:
+        with pytest.raises(RuntimeError):
+            extract(api, tmp_path)
+        pages = ExtractManifest(tmp_path / "manifest.json").data["pokemon"]["pages"]
+        assert 0 < len(pages) < 6
+
+        manifest, retry = extract(api, tmp_path)
+        assert manifest.data["pokemon"]["pages"] == {}
+        _, full = extract(api, tmp_path)
+    assert retry < full
@@ -0,0 +1,58 @@
+import json
+
+from pokemon_etl.metrics import Metrics, task_path
+
+
+def recorded():
+    metrics = Metrics()
+    with metrics.phase("EXTRACT"):
+        metrics.observe_request(200, 1000, 0.004)
+        metrics.observe_request(200, 500, 0.2)
+        metrics.observe_request(503, 0, 20.0)
+        metrics.inc("cache_hits_total")
+        metrics.add_rows("EXTRACT", 30)
+    metrics.set("join_unmatched_keys", 5, side="species")
+    return metrics
+
+
+def test_write_report_json_keys(tmp_path):
+    metrics = recorded()
+    metrics.write_report(tmp_path / "reports" / "run.json", tmp_path / "reports" / "run.prom")
+    report = json.loads((tmp_path / "reports" / "run.json").read_text(encoding="utf-8"))
+
+    assert set(report) == {"started_at", "phases", "counters", "gauges", "histograms"}
+    assert set(report["phases"]["EXTRACT"]) == {"wall_seconds", "cpu_seconds", "peak_rss_bytes", "rows", "rows_per_second"}
+    assert report["phases"]["EXTRACT"]["rows"] == 30
+    counters = {(counter["name"], json.dumps(counter["labels"])): counter["value"] for counter in report["counters"]}
+    assert counters[("http_requests_total", '{"status": "200"}')] == 2
+    assert counters[("http_requests_total", '{"status": "503"}')] == 1
+    assert counters[("http_response_bytes_total", "{}")] == 1500
+    assert report["gauges"] == [{"name": "join_unmatched_keys", "labels": {"side": "species"}, "value": 5}]
+    histogram = report["histograms"][0]
+    assert histogram["name"] == "http_request_duration_seconds" and histogram["count"] == 3
+    assert (tmp_path / "reports" / "run.prom").read_text(encoding="utf-8") == metrics.to_prometheus()
+    assert not list((tmp_path / "reports").glob("*.tmp"))
+
+
+def test_prometheus_textfile_format():
+    lines = recorded().to_prometheus().splitlines()
+
+    assert "# TYPE pokemon_etl_http_requests_total counter" in lines
+    assert 'pokemon_etl_http_requests_total{status="200"} 2' in lines
+    assert 'pokemon_etl_http_requests_total{status="503"} 1' in lines
+    assert 'pokemon_etl_join_unmatched_keys{side="species"} 5' in lines
+    assert any(line.startswith('pokemon_etl_phase_wall_seconds{phase="EXTRACT"} ') for line in lines)
+    assert "# TYPE pokemon_etl_http_request_duration_seconds histogram" in lines
+    buckets = [line for line in lines if line.startswith("pokemon_etl_http_request_duration_seconds_bucket")]
+    assert buckets[0] == 'pokemon_etl_http_request_duration_seconds_bucket{le="0.005"} 1'
+    assert 'pokemon_etl_http_request_duration_seconds_bucket{le="0.25"} 2' in buckets
+    assert buckets[-2:] == ['pokemon_etl_http_request_duration_seconds_bucket{le="10.0"} 2',
+                            'pokemon_etl_http_request_duration_seconds_bucket{le="+Inf"} 3']
+    assert "pokemon_etl_http_request_duration_seconds_count 3" in lines
+    help_lines = [line for line in lines if line.startswith("# HELP pokemon_etl_http_requests_total ")]
+    assert len(help_lines) == 1
+
+
+def test_task_path():
+    assert task_path("reports/run.json", "extract_pokemon_1").name == "run_extract_pokemon_1.json"
+    assert task_path(None, "extract") is None
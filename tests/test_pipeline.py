@@ -0,0 +1,50 @@
+import pyarrow.parquet as pq
+
+from pokemon_etl.extract import run_extraction
+from pokemon_etl.pipeline import StreamingJoin, join_records, run_pipeline
+from pokemon_etl.fields import POKEMON_FIELDS, SPECIES_FIELDS, compile_fields
+from pokemon_etl.transform import join_species_pokemons
+
+from tests.conftest import serve_mock_api
+
+
+def sorted_rows(path):
+    rows = pq.read_table(path).to_pylist()
+    return sorted(rows, key=lambda row: (row["species_id"], row["pokemon_id"] is None, row["pokemon_id"] or 0))
+
+
+def test_fused_output_matches_staged(tmp_path):
+    # Generaciones de 10 especies y solo 25 Pokémon: sin la generación ii quedan Pokémon sin
+    # especie (11-20) y las especies 26-30 quedan sin Pokémon.
+    for name in ("staged", "fused"):
+        (tmp_path / name).mkdir()
+    with serve_mock_api(generations=3, pokemon_count=25) as api:
+        generations = [api.generations[0], api.generations[2]]
+        run_extraction(tmp_path / "species", tmp_path / "pokemon", api.base_url, generations, page_size=7)
+        staged = join_species_pokemons(tmp_path / "species", tmp_path / "pokemon", generations, tmp_path / "staged",
+                                       "pokemon.parquet", "pokemon.csv", batch_size=4, outputs=["parquet"])
+        fused = run_pipeline(api.base_url, generations, tmp_path / "fused", "pokemon.parquet", "pokemon.csv",
+                             page_size=7, batch_size=4, outputs=["parquet"])
+
+    assert staged == fused == {"rows": 20, "species_without_pokemon": 5, "pokemon_without_species": 10}
+    assert pq.read_schema(tmp_path / "fused" / "pokemon.parquet") == pq.read_schema(tmp_path / "staged" / "pokemon.parquet")
+    rows = sorted_rows(tmp_path / "fused" / "pokemon.parquet")
+    assert rows == sorted_rows(tmp_path / "staged" / "pokemon.parquet")
+    assert [row["species_id"] for row in rows if row["pokemon_id"] is None] == [26, 27, 28, 29, 30]
+
+
+def test_streaming_join_waits_for_both_sides():
+    join = StreamingJoin(POKEMON_FIELDS, SPECIES_FIELDS)
+    records = [
+        ("species", {"id": 2, "name": "ivysaur"}),
+        ("pokemon", {"id": 1, "name": "bulbasaur"}),
+        ("pokemon", {"id": 2, "name": "ivysaur"}),
+        ("species", {"id": 1, "name": "bulbasaur"}),
+        ("species", {"id": 1, "name": "repetida"}),
+        ("species", {"id": 3, "name": "venusaur"}),
+        ("pokemon", {"id": 9, "name": "blastoise"}),
+    ]
+    rows = list(join_records(records, join, compile_fields(POKEMON_FIELDS), compile_fields(SPECIES_FIELDS)))
+    assert [(row["species_id"], row["pokemon_id"]) for row in rows] == [(2, 2), (1, 1), (3, None)]
+    assert join.quality(len(rows)) == {"rows": 3, "species_without_pokemon": 1, "pokemon_without_species": 1}
+    assert join.duplicated_species == 1
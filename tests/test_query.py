@@ -0,0 +1,78 @@
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from pokemon_etl.query import PokemonIndex
+
+ROWS = [
+    {"pokemon_id": 1, "name_x": "bulbasaur", "name_y": "bulbasaur", "nat_pokedex_entry": 1,
+     "type_1": "grass", "type_2": "poison", "generation": "generation-i"},
+    {"pokemon_id": 4, "name_x": "charmander", "name_y": "charmander", "nat_pokedex_entry": 4,
+     "type_1": "fire", "type_2": None, "generation": "generation-i"},
+    {"pokemon_id": 152, "name_x": "chikorita", "name_y": "chikorita", "nat_pokedex_entry": 152,
+     "type_1": "grass", "type_2": None, "generation": "generation-ii"},
+    {"pokemon_id": 23, "name_x": "ekans", "name_y": "ekans", "nat_pokedex_entry": 23,
+     "type_1": "poison", "type_2": None, "generation": "generation-i"},
+]
+
+
+def write(path, rows):
+    tmp_path = path.with_name(path.name + ".tmp")
+    pq.write_table(pa.Table.from_pylist(rows), tmp_path)
+    os.replace(tmp_path, path)
+
+
+@pytest.fixture
+def parquet(tmp_path):
+    path = tmp_path / "pokemon.parquet"
+    write(path, ROWS)
+    return path
+
+
+def ids(rows):
+    return [row["pokemon_id"] for row in rows]
+
+
+def test_lookups_ignore_case_and_spaces(parquet):
+    index = PokemonIndex(parquet)
+    assert ids(index.by_name(" Bulbasaur ", as_records=True)) == [1]
+    assert ids(index.by_generation("GENERATION-II", as_records=True)) == [152]
+    assert index.by_dex(4).column("name_x").to_pylist() == ["charmander"]
+    assert index.by_name("mew").num_rows == 0
+    with pytest.raises(ValueError, match="no soportado"):
+        index.lookup("color", "red")
+
+
+def test_by_type_matches_either_type_column(parquet):
+    index = PokemonIndex(parquet)
+    assert ids(index.by_type("poison", as_records=True)) == [1, 23]
+    assert ids(index.by_type("Grass", as_records=True)) == [1, 152]
+
+
+def test_reloads_after_the_parquet_is_replaced(parquet):
+    index = PokemonIndex(parquet, check_interval=0)
+    assert ids(index.by_type("fire", as_records=True)) == [4]
+
+    write(parquet, ROWS + [{**ROWS[1], "pokemon_id": 5, "name_x": "charmeleon", "name_y": "charmeleon", "nat_pokedex_entry": 5}])
+    assert ids(index.by_type("fire", as_records=True)) == [4, 5]
+    assert index.table.num_rows == 5
+    assert index.reload() is False
+
+
+def test_keeps_old_version_until_the_check_interval(parquet):
+    index = PokemonIndex(parquet, check_interval=3600)
+    write(parquet, ROWS[:1])
+    assert index.table.num_rows == 4
+    assert index.reload() is True
+    assert index.table.num_rows == 1
+
+
+def test_cache_info_counts_hits_and_misses(parquet):
+    index = PokemonIndex(parquet, cache_size=2, check_interval=3600)
+    for name in ("bulbasaur", "BULBASAUR", "ekans", "chikorita", "bulbasaur"):
+        index.by_name(name)
+    info = index.cache_info()
+    assert (info.hits, info.misses, info.maxsize, info.currsize) == (1, 4, 2, 2)
+    assert index.by_name("ekans", as_records=True) is index.by_name("ekans", as_records=True)
@@ -0,0 +1,109 @@
+import asyncio
+import random
+
+import pytest
+
+from pokemon_etl.ratelimit import AdaptiveConcurrency, Throttle, TokenBucket, backoff_delay, parse_retry_after
+
+
+class FakeClock:
+    """Reloj simulado: `sleep` avanza el tiempo sin esperar."""
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_bucket_allows_burst_then_paces_to_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, burst=5, clock=clock, sleep=clock.sleep)
+
+    async def take(count):
+        for _ in range(count):
+            await bucket.acquire()
+
+    asyncio.run(take(5))
+    assert clock.now == 0.0
+    asyncio.run(take(10))
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_bucket_pause_delays_next_token():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=None, clock=clock, sleep=clock.sleep)
+    bucket.pause(3)
+    asyncio.run(bucket.acquire())
+    assert clock.now == pytest.approx(3.0)
+
+
+def test_additive_increase_is_one_per_window():
+    limiter = AdaptiveConcurrency(4, maximum=100, clock=FakeClock())
+    for _ in range(4):
+        limiter.on_success(0.1)
+    assert limiter.limit == pytest.approx(5, abs=0.1)
+    assert AdaptiveConcurrency(4, maximum=4).limit == 4
+
+
+def test_overload_decreases_once_per_latency_window():
+    clock = FakeClock()
+    limiter = AdaptiveConcurrency(40, minimum=2, maximum=40, clock=clock)
+    limiter.on_success(0.5)
+    limiter.on_overload()
+    limiter.on_overload()
+    assert int(limiter.limit) == 20
+    clock.now += 1
+    limiter.on_overload()
+    limiter.on_overload()
+    assert int(limiter.limit) == 10
+    for _ in range(5):
+        clock.now += 1
+        limiter.on_overload()
+    assert int(limiter.limit) == 2
+
+
+def test_jitter_on_fast_server_does_not_decrease():
+    rng = random.Random(0)
+    limiter = AdaptiveConcurrency(50, minimum=2, maximum=50, clock=FakeClock())
+    for _ in range(2000):
+        limiter.on_success(rng.choice([0.001, 0.002, 0.003, 0.008, 0.015]))
+    assert limiter.limit == 50
+
+
+def test_no_latency_decrease_during_warmup():
+    limiter = AdaptiveConcurrency(50, maximum=50, warmup_samples=20, clock=FakeClock())
+    limiter.on_success(0.01)
+    for _ in range(19):
+        limiter.on_success(1.0)
+    assert limiter.limit == 50
+
+
+def test_sustained_latency_increase_decreases():
+    clock = FakeClock()
+    limiter = AdaptiveConcurrency(50, minimum=2, maximum=50, warmup_samples=20, min_latency_delta=0.05, clock=clock)
+    for _ in range(100):
+        limiter.on_success(0.1)
+    assert limiter.limit == 50
+    for _ in range(20):
+        clock.now += 1
+        limiter.on_success(0.6)
+    assert limiter.limit < 50
+
+
+def test_backoff_delay_and_retry_after():
+    assert backoff_delay(3, 0.5, 30, retry_after=2) == 2
+    assert all(0 <= backoff_delay(attempt, 0.5, 3) <= min(3, 0.5 * 2 ** attempt) for attempt in range(10))
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("not a date") is None
+    assert parse_retry_after(None) is None
+
+
+def test_retry_after_is_not_capped_by_backoff_max():
+    assert backoff_delay(0, 0.5, 30, retry_after=120) == 120
+    assert backoff_delay(0, 0.5, 30, retry_after=-5) == 0
+    assert Throttle(backoff_max=1).delay(5, retry_after=60) == 60
@@ -0,0 +1,34 @@
+import pytest
+
+from pokemon_etl.manifest import ExtractManifest
+from pokemon_etl.shards import extract_shard, plan_shards, shard_manifest_path
+
+from tests.conftest import serve_mock_api
+
+
+def test_shard_manifest_path_is_per_shard(tmp_path):
+    path = shard_manifest_path(tmp_path / "manifest.json", "pokemon_1_10")
+    assert path == tmp_path / "manifest_pokemon_1_10.json"
+
+
+def test_retry_only_fetches_missing_pages(tmp_path):
+    # Con esta semilla falla una solicitud de la página 1 del primer fragmento; la página 2 se completa.
+    with serve_mock_api(error_rate=0.1, seed=1) as api:
+        shards = plan_shards(api.base_url, api.generations, page_size=5, pages_per_shard=2)
+        shard = next(shard for shard in shards if shard["kind"] == "pokemon")
+        manifest_path = shard_manifest_path(tmp_path / "manifest.json", shard["id"])
+
+        def extract(current):
+            before = api.requests
+            result = extract_shard(current, tmp_path / "species", tmp_path / "pokemon", api.base_url, page_size=5,
+                                   manifest_path=shard_manifest_path(tmp_path / "manifest.json", current["id"]))
+            return result, api.requests - before
+
+        with pytest.raises(RuntimeError):
+            extract(shard)
+        assert list(ExtractManifest(manifest_path).data["pokemon"]["pages"]) == ["2"]
+
+        first, requests = extract(shard)
+        assert requests == 1 + 5
+        assert ExtractManifest(manifest_path).data["pokemon"]["pages"] == {}
+        assert extract(shard) == (first, 1 + 10)
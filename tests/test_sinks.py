@@ -0,0 +1,76 @@
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import pytest
+
+from pokemon_etl.dataset import read_dataset
+from pokemon_etl.sinks import build_sinks, output_paths, write_sinks
+
+NAMES = {"parquet_name": "pokemon.parquet", "csv_name": "pokemon.csv", "feather_name": "pokemon.feather", "dataset_name": "pokemon"}
+
+
+def pokemon_table():
+    return pa.table({
+        "species_id": pa.array([1, 2, 3, 4], pa.int16()),
+        "name": ["bulbasaur", "ivysaur", "venusaur", "charmander"],
+        "generation": ["generation-i", "generation-i", "generation-i", "generation-ii"],
+    })
+
+
+class FailingSink:
+    kind = "failing"
+    path = "nowhere"
+
+    def write(self, table):
+        raise OSError("disco lleno")
+
+
+def test_every_enabled_output_is_written_from_the_same_table(tmp_path):
+    table = pokemon_table()
+    sinks = build_sinks(tmp_path, ["parquet", "csv", "feather", "dataset"], partition_by=["generation"], **NAMES)
+    assert [sink.kind for sink in sinks] == ["parquet", "csv", "feather", "dataset"]
+    write_sinks(table, sinks)
+
+    assert pq.read_table(tmp_path / "pokemon.parquet").equals(table)
+    assert feather.read_table(tmp_path / "pokemon.feather").equals(table)
+    csv = pa_csv.read_csv(tmp_path / "pokemon.csv", convert_options=pa_csv.ConvertOptions(column_types=table.schema))
+    assert csv.equals(table)
+    dataset = read_dataset(tmp_path / "pokemon").sort_by("species_id")
+    assert dataset.column("name").equals(table.column("name"))
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_only_enabled_outputs_are_written(tmp_path):
+    write_sinks(pokemon_table(), build_sinks(tmp_path, ["csv"], **NAMES))
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["pokemon.csv"]
+    assert output_paths(tmp_path, ["parquet", "csv"], **{k: v for k, v in NAMES.items() if k != "dataset_name"}) == [
+        tmp_path / "pokemon.parquet", tmp_path / "pokemon.csv"]
+
+
+def test_sink_error_is_raised(tmp_path):
+    sinks = build_sinks(tmp_path, ["parquet"], **NAMES) + [FailingSink()]
+    with pytest.raises(OSError, match="disco lleno"):
+        write_sinks(pokemon_table(), sinks)
+    assert (tmp_path / "pokemon.parquet").exists()
+
+
+def test_build_sinks_rejects_invalid_outputs(tmp_path):
+    with pytest.raises(ValueError, match="no tiene nombre de archivo"):
+        build_sinks(tmp_path, ["parquet", "feather"], parquet_name="pokemon.parquet")
+    with pytest.raises(ValueError, match="no soportada"):
+        build_sinks(tmp_path, ["excel"], **NAMES)
+
+
+def test_streamed_outputs_match_table_writes(tmp_path):
+    table = pokemon_table()
+    streamed, written = tmp_path / "streamed", tmp_path / "written"
+    streamed.mkdir()
+    written.mkdir()
+    write_sinks(table, build_sinks(written, ["parquet", "csv"], **NAMES))
+    for sink in build_sinks(streamed, ["parquet", "csv"], row_group_size=3, **NAMES):
+        sink.write_stream(table.to_batches(max_chunksize=1), table.schema)
+
+    assert pq.read_table(streamed / "pokemon.parquet").equals(pq.read_table(written / "pokemon.parquet"))
+    assert pq.ParquetFile(streamed / "pokemon.parquet").metadata.num_row_groups == 2
+    assert (streamed / "pokemon.csv").read_bytes() == (written / "pokemon.csv").read_bytes()
@@ -0,0 +1,94 @@
+import os
+
+import pytest
+
+from pokemon_etl.raw_store import RawStore
+from pokemon_etl.stage_cache import StageCache, files_digest, transform_fingerprint
+
+
+class Stage:
+    """Etapa simulada que cuenta sus ejecuciones y escribe su salida."""
+    def __init__(self, output):
+        self.output = output
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        self.output.write_text(str(self.calls))
+        return self.calls
+
+
+@pytest.fixture
+def raw(tmp_path):
+    store = RawStore(tmp_path / "raw")
+    store.write("pokemon_page_1", [{"id": 1, "name": "bulbasaur"}])
+    return store
+
+
+def run(tmp_path, stage, files, force=False, enabled=True, **settings):
+    cache = StageCache(tmp_path / "stages.json", force, enabled)
+    return cache.run("transform", lambda: transform_fingerprint(files, None, **settings), stage, outputs=[stage.output])
+
+
+def test_skips_unchanged_and_reruns_on_input_change(tmp_path, raw):
+    stage = Stage(tmp_path / "out.parquet")
+    files = [raw.find("pokemon_page_1")]
+    assert run(tmp_path, stage, files) == 1
+    assert run(tmp_path, stage, files) is None
+    raw.write("pokemon_page_1", [{"id": 1, "name": "ivysaur"}])
+    assert run(tmp_path, stage, files) == 2
+    assert run(tmp_path, stage, files) is None
+
+
+def test_reruns_on_config_change(tmp_path, raw):
+    stage = Stage(tmp_path / "out.parquet")
+    files = [raw.find("pokemon_page_1")]
+    run(tmp_path, stage, files, row_group_size=100)
+    assert run(tmp_path, stage, files, row_group_size=100) is None
+    assert run(tmp_path, stage, files, row_group_size=200) == 2
+    cache = StageCache(tmp_path / "stages.json")
+    extra = {"pokemon": [{"name": "height", "path": "height", "dtype": "int16"}]}
+    assert cache.run("transform", lambda: transform_fingerprint(files, extra, row_group_size=200), stage, outputs=[stage.output]) == 3
+
+
+def test_reruns_when_outputs_are_missing_or_forced(tmp_path, raw):
+    stage = Stage(tmp_path / "out.parquet")
+    files = [raw.find("pokemon_page_1")]
+    run(tmp_path, stage, files)
+    stage.output.unlink()
+    assert run(tmp_path, stage, files) == 2
+    assert run(tmp_path, stage, files, force=True) == 3
+    assert run(tmp_path, stage, files, enabled=False) == 4
+    assert run(tmp_path, stage, files) is None
+
+
+def test_failed_run_is_repeated(tmp_path, raw):
+    files = [raw.find("pokemon_page_1")]
+    stage = Stage(tmp_path / "out.parquet")
+    run(tmp_path, stage, files)
+
+    def failing():
+        raise RuntimeError("fallo a medias")
+
+    cache = StageCache(tmp_path / "stages.json", force=True)
+    with pytest.raises(RuntimeError):
+        cache.run("transform", lambda: transform_fingerprint(files), failing)
+    assert run(tmp_path, stage, files) == 2
+
+
+def test_index_hash_reused_only_while_file_is_untouched(tmp_path, raw):
+    path = raw.find("pokemon_page_1")
+    digest = files_digest([path])[str(path)]
+    index = raw.read_index()
+    index["pokemon_page_1"]["sha256"] = "indexado"
+    raw._save_index(index)
+    assert files_digest([path])[str(path)] == "indexado"
+
+    data = path.read_bytes()
+    path.write_bytes(bytes(byte ^ 0xFF for byte in data))
+    mtime_ns = index["pokemon_page_1"]["mtime_ns"] + 10 ** 9
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    assert path.stat().st_size == index["pokemon_page_1"]["bytes"]
+    changed = files_digest([path])[str(path)]
+    assert changed not in ("indexado", digest)
+    assert files_digest([tmp_path / "missing"]) == {str(tmp_path / "missing"): None}
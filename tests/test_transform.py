@@ -0,0 +1,45 @@
+import logging
+
+import pyarrow as pa
+
+from pokemon_etl.extract import run_extraction
+from pokemon_etl.fields import POKEMON_FIELDS, SPECIES_FIELDS, fields_schema
+from pokemon_etl.raw_store import RawStore
+from pokemon_etl.transform import join_tables, joined_schema, transform_files
+
+
+def keyed_table(fields, key, ids):
+    schema = fields_schema(fields)
+    table = pa.table({field.name: pa.nulls(len(ids), field.type) for field in schema}, schema=schema)
+    return table.set_column(schema.get_field_index(key), key, pa.array(ids, pa.int16()))
+
+
+def test_unmatched_keys_are_sampled_on_both_sides(caplog):
+    pokemons = keyed_table(POKEMON_FIELDS, "pokemon_id", [1, 2, 3, 40, 41])
+    species = keyed_table(SPECIES_FIELDS, "species_id", [3, 1, 2, 90, 91, 92])
+    with caplog.at_level(logging.WARNING):
+        joined, quality = join_tables(pokemons, species, joined_schema(POKEMON_FIELDS, SPECIES_FIELDS))
+    assert quality == {"rows": 6, "species_without_pokemon": 3, "pokemon_without_species": 2}
+    assert joined.column("pokemon_id").to_pylist() == [3, 1, 2, None, None, None]
+    message = caplog.records[-1].getMessage()
+    assert "3 especies sin Pokémon (por ejemplo [90, 91, 92])" in message
+    assert "2 Pokémon sin especie (por ejemplo [40, 41])" in message
+
+
+def test_matched_join_logs_nothing(caplog):
+    with caplog.at_level(logging.WARNING):
+        _, quality = join_tables(keyed_table(POKEMON_FIELDS, "pokemon_id", [1, 2]), keyed_table(SPECIES_FIELDS, "species_id", [2, 1]),
+                                 joined_schema(POKEMON_FIELDS, SPECIES_FIELDS))
+    assert quality == {"rows": 2, "species_without_pokemon": 0, "pokemon_without_species": 0}
+    assert not caplog.records
+
+
+def test_parallel_transform_matches_serial(tmp_path, mock_api):
+    run_extraction(tmp_path / "species", tmp_path / "pokemon", mock_api.base_url, mock_api.generations, page_size=4)
+    files = RawStore(tmp_path / "pokemon").files("pokemon_page_")
+    assert len(files) == 8
+
+    serial = transform_files(files, POKEMON_FIELDS, batch_size=3, workers=1)
+    assert serial.column("pokemon_id").to_pylist() == list(range(1, 31))
+    for workers in (2, 0):
+        assert transform_files(files, POKEMON_FIELDS, batch_size=3, workers=workers).equals(serial)